@@ -1 +1,11 @@
 from Analysis.Experiment.experiment import *
+from Analysis.Experiment.parser import *
+from Analysis.Experiment.cache import set_cache
+from Analysis.Experiment.stream import *
+from Analysis.Experiment.collection import *
+from Analysis.Experiment.rangeindex import *
+from Analysis.Experiment.uncertainty import propagate, derivative, register_derivative
+from Analysis.Experiment.differentiate import savgol_weights, clear_weights
+from Analysis.Experiment.binning import *
+from Analysis.Experiment.container import load, read_header
+from Analysis.Experiment.live import *
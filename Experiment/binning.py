@@ -0,0 +1,189 @@
+import numpy as np
+from Analysis.Experiment.experiment import DataSet
+
+
+def bin_edges(edges_or_width, range=None):
+    """
+    Edges of the bins, edges_or_width is either an array of edges
+    or the width of the bins, which then start at the multiple
+    of width just below range[0] and cover range=(min, max)
+    """
+
+    if np.ndim(edges_or_width) != 0:
+        edges = np.asarray(edges_or_width, dtype=np.float64)
+        assert edges.ndim == 1 and edges.shape[0] >= 2, "At least two edges are needed"
+        assert np.all(np.diff(edges) > 0), "Edges must be strictly increasing"
+        return edges
+
+    width = float(edges_or_width)
+    assert width > 0, "The width of the bins must be positive"
+    assert range is not None, "range must be given with a width"
+    start = np.floor(range[0]/width)*width
+    n = max(int(np.ceil((range[1]-start)/width)), 1)
+    edges = start+width*np.arange(n+1)
+    if edges[-1] < range[1]:
+        edges = np.append(edges, edges[-1]+width)
+    return edges
+
+
+class BinAccumulator():
+    """
+    Accumulates the count, mean, variance, minimum and maximum of
+    measurements in bins of a parameter, chunk by chunk, so that a
+    file read with readfile_chunks is binned without being loaded.
+    Every chunk is reduced with one np.bincount per statistic
+    for all the measurements together (and ufunc.at for the
+    extrema), without sorting, the chunks are merged with the pairwise variance update of Chan
+    et al. so the variance stays accurate for any number of chunks.
+
+    Usage:
+        acc = BinAccumulator(bin_edges(0.01, (0, 1)))
+        for chunk in readfile_chunks("sweep.txt",("V","V"),[("I","A")]):
+            acc.add(chunk)
+        binned = acc.dataset()
+    """
+
+    def __init__(self, edges):
+        """
+        Parameters:
+        --------------------------------
+        edges:  np.ndarray of the edges of the bins (see bin_edges),
+                the last bin includes its right edge like np.histogram
+        """
+
+        self.edges = bin_edges(edges)
+        steps = np.diff(self.edges)
+        self._width = steps[0] if np.all(np.abs(steps-steps[0]) <= 1e-12*steps[0]) else None
+        self.count = np.zeros(self.edges.shape[0]-1, dtype=np.int64)
+        self.mean = None
+        self.m2 = None
+        self.min = None
+        self.max = None
+        self._parameter = None
+        self._measurements = None
+        return
+
+    def _allocate(self, m):
+        n_bins = self.count.shape[0]
+        self.mean = np.zeros((m, n_bins))
+        self.m2 = np.zeros((m, n_bins))
+        self.min = np.full((m, n_bins), np.inf)
+        self.max = np.full((m, n_bins), -np.inf)
+        return
+
+    def add_arrays(self, x, Ys):
+        """
+        Adds the points of x (1d) and of the measurements Ys,
+        a list of arrays or an array of shape (measurements, points).
+        Points with a non finite x or outside the edges are ignored.
+        """
+
+        x = np.asarray(x, dtype=np.float64)
+        Ys = np.asarray(Ys, dtype=np.float64).reshape(-1, x.shape[0])
+        if self.mean is None:
+            self._allocate(Ys.shape[0])
+        assert Ys.shape[0] == self.mean.shape[0], "Every chunk must have the same number of measurements"
+
+        n_bins = self.count.shape[0]
+        if self._width is not None:
+            # Equal bins, the index is computed instead of searched
+            # Non finite x are sent below the first bin before the cast
+            bins = np.floor(np.where(np.isfinite(x), (x-self.edges[0])/self._width, -1)).astype(np.int64)
+            bins[(bins == n_bins) & (x <= self.edges[-1])] = n_bins-1
+        else:
+            bins = np.searchsorted(self.edges, x, side="right")-1
+            bins[x == self.edges[-1]] = n_bins-1
+        valid = (bins >= 0) & (bins < n_bins) & np.isfinite(x)
+        if not np.all(valid):
+            bins, Ys = bins[valid], Ys[:, valid]
+        if bins.shape[0] == 0:
+            return
+
+        # One flat index over (measurement, bin) reduces every
+        # measurement with a single bincount per quantity
+        m = Ys.shape[0]
+        flat = (bins+n_bins*np.arange(m)[:, None]).ravel()
+        counts = np.bincount(bins, minlength=n_bins)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean = np.bincount(flat, Ys.ravel(), m*n_bins).reshape(m, n_bins)/counts
+        deviation = Ys-mean[:, bins]
+        m2 = np.bincount(flat, (deviation*deviation).ravel(), m*n_bins).reshape(m, n_bins)
+        np.minimum.at(self.min.reshape(-1), flat, Ys.ravel())
+        np.maximum.at(self.max.reshape(-1), flat, Ys.ravel())
+
+        # Merge with the previous chunks
+        present = np.flatnonzero(counts)
+        before, counts = self.count[present], counts[present]
+        total = before+counts
+        delta = mean[:, present]-self.mean[:, present]
+        self.mean[:, present] += delta*(counts/total)
+        self.m2[:, present] += m2[:, present]+delta*delta*(before*counts/total)
+        self.count[present] = total
+        return
+
+    def add(self, dataset, parameter=0, measurements=None):
+        """
+        Adds the points of a DataSet, binned along its parameter,
+        the names and units of the first DataSet are kept
+        """
+
+        if measurements is None:
+            measurements = range(len(dataset.measurements))
+        measurements = [dataset.measurements[i] for i in measurements]
+        parameter = dataset.parameters[parameter]
+        if self._parameter is None:
+            # Only the names are kept, not the data of the chunk
+            self._parameter = (parameter.name, parameter.unit)
+            self._measurements = [(meas.name, meas.unit, meas.label) for meas in measurements]
+        self.add_arrays(parameter.data, [meas.data for meas in measurements])
+        return
+
+    def centers(self):
+        return (self.edges[1:]+self.edges[:-1])/2
+
+    def std(self):
+        """
+        Standard deviation (ddof=1) in every bin, nan below 2 points
+        """
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.sqrt(self.m2/(self.count-1))
+
+    def sem(self):
+        """
+        Standard error of the mean in every bin
+        """
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return self.std()/np.sqrt(self.count)
+
+    def dataset(self, empty=False):
+        """
+        Returns a DataSet whose parameter is the center of the
+        bins and with, for every measurement, its mean (with the
+        standard error as err) then its minimum and maximum
+        ("name_min", "name_max"), and a last "count" measurement.
+        Empty bins are dropped unless empty is True (their
+        statistics are then nan).
+        """
+
+        assert self._parameter is not None, "No DataSet was added"
+        keep = np.arange(self.count.shape[0]) if empty else np.flatnonzero(self.count)
+        m = len(self._measurements)
+        count = self.count[keep]
+        filled = count != 0
+
+        block = np.empty((2+3*m, keep.shape[0]))
+        block[0] = self.centers()[keep]
+        sem = self.sem()[:, keep]
+        names_units = []
+        for i, (name, unit, label) in enumerate(self._measurements):
+            for j, (values, suffix) in enumerate(((self.mean, ""), (self.min, "_min"), (self.max, "_max"))):
+                block[1+3*i+j] = np.where(filled, values[i, keep], np.nan)
+                names_units.append((name+suffix, unit))
+        block[-1] = count
+        names_units.append(("count", ""))
+
+        labels = [meas[2] for meas in self._measurements for j in range(3)]+[None]
+        res = DataSet.from_block(block, self._parameter, names_units, labels)
+        for i in range(m):
+            res.measurements[3*i].add_err(sem[i])
+        return res
@@ -0,0 +1,163 @@
+import os
+import json
+import hashlib
+import numpy as np
+
+
+# Where the sidecars are written and how much disk they may use (in bytes)
+CACHE_DIR = os.environ.get("ANALYSIS_CACHE_DIR",
+                           os.path.join(os.path.expanduser("~"), ".cache", "Analysis"))
+CACHE_MAX_SIZE = 2*1024**3
+
+
+def set_cache(directory=None, max_size=None):
+    """
+    Changes the readfile cache settings
+
+    Parameters:
+    ---------------------------------------------------------
+    directory:  str
+                The directory where the binary sidecars are stored
+    max_size:   int
+                The maximum total size of the sidecars in bytes,
+                least recently used ones are evicted past this size
+    """
+
+    global CACHE_DIR, CACHE_MAX_SIZE
+    if directory is not None:
+        CACHE_DIR = directory
+    if max_size is not None:
+        CACHE_MAX_SIZE = int(max_size)
+    evict()
+    return
+
+
+def _file_hash(filename, blocksize=1 << 24):
+    h = hashlib.blake2b(digest_size=20)
+    with open(filename, "rb") as f:
+        block = f.read(blocksize)
+        while block:
+            h.update(block)
+            block = f.read(blocksize)
+    return h.hexdigest()
+
+
+def _paths(filename, delimiter):
+    key = "%s|%r" % (os.path.abspath(filename), delimiter)
+    key = hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+    base = os.path.join(CACHE_DIR, key)
+    return base+".npy", base+".json"
+
+
+def _signature(filename):
+    stat = os.stat(filename)
+    return {"size": stat.st_size, "mtime": stat.st_mtime_ns}
+
+
+def load(filename, delimiter=None):
+    """
+    Returns the memory-mapped columns of filename if a valid
+    sidecar exists, None otherwise. A sidecar is valid if the
+    size, modification time and content hash of the source
+    are those recorded when it was written.
+    """
+
+    data_path, meta_path = _paths(filename, delimiter)
+    try:
+        with open(meta_path) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    signature = _signature(filename)
+    if meta["size"] != signature["size"] or meta["mtime"] != signature["mtime"]:
+        return None
+    if meta["hash"] != _file_hash(filename):
+        return None
+
+    try:
+        columns = np.load(data_path, mmap_mode="r")
+    except (OSError, ValueError):
+        return None
+
+    # The metadata file's mtime is the last access used for eviction
+    os.utime(meta_path)
+
+    return columns
+
+
+def store(filename, columns, delimiter=None):
+    """
+    Writes columns to the sidecar of filename and
+    evicts old sidecars if the cache is too large
+    """
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    data_path, meta_path = _paths(filename, delimiter)
+
+    meta = _signature(filename)
+    meta["hash"] = _file_hash(filename)
+    meta["source"] = os.path.abspath(filename)
+
+    # Write then rename so concurrent readers never see partial files
+    tmp = "%s.%i.tmp" % (data_path, os.getpid())
+    with open(tmp, "wb") as f:
+        np.save(f, np.ascontiguousarray(columns))
+    os.replace(tmp, data_path)
+
+    tmp = "%s.%i.tmp" % (meta_path, os.getpid())
+    with open(tmp, "w") as f:
+        json.dump(meta, f)
+    os.replace(tmp, meta_path)
+
+    evict()
+    return
+
+
+def evict(max_size=None):
+    """
+    Removes the least recently used sidecars until
+    the cache is smaller than max_size (CACHE_MAX_SIZE by default)
+    """
+
+    if max_size is None:
+        max_size = CACHE_MAX_SIZE
+    if not os.path.isdir(CACHE_DIR):
+        return
+
+    entries = []
+    total = 0
+    for name in os.listdir(CACHE_DIR):
+        if not name.endswith(".json"):
+            continue
+        meta_path = os.path.join(CACHE_DIR, name)
+        data_path = meta_path[:-5]+".npy"
+        try:
+            size = os.path.getsize(data_path)+os.path.getsize(meta_path)
+            last_access = os.path.getmtime(meta_path)
+        except OSError:
+            continue
+        entries.append((last_access, size, data_path, meta_path))
+        total += size
+
+    entries.sort()
+    for last_access, size, data_path, meta_path in entries:
+        if total <= max_size:
+            break
+        for path in (meta_path, data_path):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        total -= size
+
+    return
+
+
+def clear():
+    """
+    Removes every sidecar from the cache
+    """
+
+    evict(0)
+    return
@@ -0,0 +1,224 @@
+import os
+import re
+import glob
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from Analysis.Experiment.parser import parse_columns
+from Analysis import Functions as F
+from Analysis.Fit.parallel import fit_many
+from Analysis.Experiment.experiment import DataSet, _check_names
+
+
+# Any int or float, the last one found in the filename is used
+VALUE_PATTERN = r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?"
+
+
+def _value(filename, pattern):
+    """
+    Extracts the sweep value from the name of a file
+    """
+
+    name = os.path.splitext(os.path.basename(filename))[0]
+    if callable(pattern):
+        return float(pattern(name))
+
+    matches = list(re.finditer(pattern, name))
+    if len(matches) == 0:
+        return np.nan
+    match = matches[-1]
+    if match.groups():
+        return float(match.group(1))
+    return float(match.group(0))
+
+
+def _parse(args):
+    filename, delimiter = args
+    return parse_columns(filename, delimiter=delimiter, workers=1)
+
+
+class DataSetCollection():
+    """
+    This object contains the DataSets of many files
+    sharing the same columns, stored in a single contiguous
+    array of shape (files, columns, rows). Files shorter than
+    the longest one are padded with nan.
+    """
+
+    def __init__(self, data, lengths, filenames, values, parameter_name_unit, measurement_names_units, measurement_labels=None):
+        """
+        Parameters:
+        -----------------------------
+        data:       np.ndarray (3d)
+                    The columns of every file, parameter first
+        lengths:    np.ndarray (1d)
+                    Number of valid rows of every file
+        filenames:  list of str
+        values:     np.ndarray (1d)
+                    The sweep value of every file
+        """
+
+        assert data.ndim == 3, "data must be of shape (files, columns, rows)"
+        self.data = data
+        self.lengths = np.asarray(lengths)
+        self.filenames = list(filenames)
+        self.values = np.asarray(values, dtype=np.float64)
+        self.parameter_name_unit = parameter_name_unit
+        self.measurement_names_units = measurement_names_units
+        if measurement_labels is None:
+            measurement_labels = [None for i in range(data.shape[1]-1)]
+        self.measurement_labels = measurement_labels
+
+        return
+
+    def __repr__(self):
+        string = "%s files from %s=%s to %s, %s measurements" % (
+            len(self), self.parameter_name_unit[0], np.nanmin(self.values), np.nanmax(self.values), self.data.shape[1]-1)
+        return string
+
+    def __len__(self):
+        return self.data.shape[0]
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+        return
+
+    def __getitem__(self, index):
+        """
+        An int returns the DataSet of one file, a slice,
+        an array of indices or a mask returns a new collection
+        """
+
+        if isinstance(index, (int, np.integer)):
+            return self.dataset(index)
+        if type(index) is not slice:
+            index = np.asarray(index)
+        return DataSetCollection(self.data[index], self.lengths[index], np.array(self.filenames, dtype=object)[index].tolist(),
+                                 self.values[index], self.parameter_name_unit, self.measurement_names_units, self.measurement_labels)
+
+    def dataset(self, index):
+        """
+        Returns the DataSet of one file, its
+        columns are views of the collection
+        """
+
+        n = self.lengths[index]
+        return DataSet.from_block(self.data[index, :, :n], self.parameter_name_unit,
+                                  self.measurement_names_units, self.measurement_labels)
+
+    def parameter(self):
+        """
+        Returns the parameter of every file as
+        an array of shape (files, rows)
+        """
+        return self.data[:, 0]
+
+    def measurement(self, measurement=0):
+        """
+        Returns a measurement of every file as
+        an array of shape (files, rows)
+        """
+        return self.data[:, measurement+1]
+
+    def select(self, value, closest=True):
+        """
+        Returns the DataSet of the file whose value is
+        value, or the closest one if closest is True
+        """
+
+        diff = np.abs(self.values-value)
+        index = np.nanargmin(diff)
+        if closest is not True and diff[index] != 0:
+            return None
+        return self.dataset(index)
+
+    def where(self, start=None, stop=None):
+        """
+        Returns the collection of the files whose
+        value is within [start, stop]
+        """
+
+        mask = np.ones(len(self), dtype=bool)
+        if start is not None:
+            mask &= self.values >= start
+        if stop is not None:
+            mask &= self.values <= stop
+        return self[mask]
+
+    def sort(self):
+        """
+        Returns the collection sorted by value
+        """
+        return self[np.argsort(self.values, kind="stable")]
+
+    def fit_all(self, model, measurement=0, p0=None, bounds=(-np.inf, np.inf),
+                workers=None, chunksize=None, executor="process"):
+        """
+        Fits model to one measurement of every file on a pool
+        of workers, see Analysis.Fit.fit_many
+
+        Returns:
+        -----------------------------------------------------
+        table:      np.ndarray structured with the fields "name"
+                    (the filename), "params", "err", "converged" and "message",
+                    in the order of the collection
+        """
+
+        if type(model) is str:
+            assert callable(F.__dict__.get(model)), "%s not a fit function" % (model)
+            model = F.__dict__[model]
+
+        return fit_many(model, self.parameter(), self.measurement(measurement), p0=p0, bounds=bounds,
+                        names=self.filenames, workers=workers, chunksize=chunksize, executor=executor)
+
+
+def readfiles(files, parameter_name_unit, measurement_names_units, measurement_labels=None,
+              delimiter=None, value_pattern=VALUE_PATTERN, workers=None):
+    """
+    Reads many files with the same columns on a process
+    pool and returns them as one DataSetCollection
+
+    Parameters:
+    ---------------------------------------------------------
+    files:      str or list of str
+                A glob pattern (Ex. "data/sweep_*.txt") or a list of files
+    parameter_name_unit:    tuple("name","unit")
+    measurement_names_units:    list(tuple("name","unit") for number of measurements)
+    value_pattern:  str or callable
+                    Regex used on the filename to get the sweep value
+                    (its first group if it has one, else the last match)
+                    or a function of the filename without extension
+    workers:    Int
+                Number of processes, defaults to os.cpu_count(),
+                1 parses in the current process
+    """
+
+    measurement_names_units = _check_names(parameter_name_unit, measurement_names_units)
+
+    if type(files) is str:
+        files = sorted(glob.glob(files))
+    assert len(files) > 0, "No files to read"
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    jobs = [(filename, delimiter) for filename in files]
+    if workers == 1:
+        columns = [_parse(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(min(workers, len(jobs))) as executor:
+            columns = list(executor.map(_parse, jobs, chunksize=max(len(jobs)//(4*workers), 1)))
+
+    n_columns = columns[0].shape[0]
+    for filename, column in zip(files, columns):
+        if column.shape[0] != n_columns:
+            raise ValueError("%s has %s columns instead of %s" % (filename, column.shape[0], n_columns))
+
+    lengths = np.array([column.shape[1] for column in columns])
+    data = np.full((len(files), n_columns, lengths.max()), np.nan)
+    for i in range(len(columns)):
+        data[i, :, :lengths[i]] = columns[i]
+        columns[i] = None
+
+    values = np.array([_value(filename, value_pattern) for filename in files])
+
+    return DataSetCollection(data, lengths, files, values, parameter_name_unit, measurement_names_units, measurement_labels)
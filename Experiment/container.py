@@ -0,0 +1,239 @@
+import os
+import json
+import zlib
+import lzma
+import struct
+import numpy as np
+from Analysis.Experiment.experiment import Variable, Parameter, Measurement, DataSet
+
+
+# File layout: MAGIC, the offset and length of the JSON header
+# (written after the columns so they can be streamed), then the
+# columns, each starting on a multiple of ALIGNMENT bytes
+MAGIC = b"ANDATA01"
+PREAMBLE = struct.Struct("<8sQQ")
+ALIGNMENT = 64
+VERSION = 1
+COMPRESSORS = {
+    "zlib": (zlib.compress, zlib.decompress),
+    "lzma": (lzma.compress, lzma.decompress),
+}
+# Rows per compressed chunk, and rows written at a time otherwise
+CHUNK_ROWS = 1 << 16
+
+
+def _pad(f):
+    position = f.tell()
+    padding = -position % ALIGNMENT
+    f.write(b"\0"*padding)
+    return position+padding
+
+
+def _write_column(f, data, compression=None, level=None, chunk_rows=CHUNK_ROWS):
+    """
+    Writes data at the next aligned offset and returns its
+    description, raw or as independently compressed chunks
+    """
+
+    entry = {"offset": _pad(f), "length": int(data.shape[0]), "dtype": data.dtype.str}
+    if compression is None:
+        for start in range(0, data.shape[0], chunk_rows):
+            f.write(np.ascontiguousarray(data[start:start+chunk_rows]).data)
+        entry["nbytes"] = f.tell()-entry["offset"]
+        return entry
+
+    compress = COMPRESSORS[compression][0]
+    chunks = []
+    for start in range(0, data.shape[0], chunk_rows):
+        raw = np.ascontiguousarray(data[start:start+chunk_rows]).tobytes()
+        if level is None:
+            chunk = compress(raw)
+        elif compression == "zlib":
+            chunk = zlib.compress(raw, level)
+        else:
+            chunk = lzma.compress(raw, preset=level)
+        chunks.append([f.tell(), len(chunk)])
+        f.write(chunk)
+    entry["chunks"] = chunks
+    entry["chunk_rows"] = chunk_rows
+    entry["nbytes"] = f.tell()-entry["offset"]
+    return entry
+
+
+def _describe(variable):
+    err = variable.err
+    description = {"name": variable.name, "unit": variable.unit, "label": variable.label, "err": None}
+    if err is not None:
+        err = np.asarray(err)
+        if err.ndim == 0 or (err.ndim == 1 and err.shape[0] > 0 and
+                             (err.strides[0] == 0 or np.all(err == err[0]))):
+            # A scalar uncertainty, Variable stores it broadcast or
+            # repeated over the data
+            description["err"] = float(err.reshape(-1)[0]) if err.size > 0 else float(err)
+        else:
+            description["err"] = "column"
+    return description
+
+
+def save(dataset, filename, compression=None, level=None, chunk_rows=CHUNK_ROWS):
+    """
+    Writes a DataSet (names, units, labels, data and err of every
+    parameter, measurement and variable) to a binary file read
+    back with load
+
+    Parameters:
+    ---------------------------------------------------------
+    dataset:        DataSet
+    filename:       str
+    compression:    None, "zlib" or "lzma"
+                    Compresses the columns by chunks of chunk_rows
+                    rows, that load decompresses independently
+    level:          Int, the compression level (preset for lzma)
+    chunk_rows:     Int
+    """
+
+    assert compression is None or compression in COMPRESSORS, "compression must be None, 'zlib' or 'lzma'"
+    assert chunk_rows > 0, "chunk_rows must be positive"
+    groups = {"parameters": dataset.parameters, "measurements": dataset.measurements,
+              "variables": dataset.variables if dataset.variables is not None else []}
+
+    # Write then rename so that readers never see a partial file
+    tmp = "%s.%i.tmp" % (filename, os.getpid())
+    try:
+        with open(tmp, "wb") as f:
+            f.write(PREAMBLE.pack(MAGIC, 0, 0))
+            header = {"version": VERSION, "compression": compression}
+            for group, variables in groups.items():
+                descriptions = []
+                for variable in variables:
+                    data = variable.data
+                    assert isinstance(data, np.ndarray) and data.dtype.kind in "biuf", \
+                        "Only numerical data can be saved (%s)" % variable.name
+                    description = _describe(variable)
+                    description["data"] = _write_column(f, data, compression, level, chunk_rows)
+                    if description["err"] == "column":
+                        err = np.asarray(variable.err, dtype=np.float64)
+                        description["err"] = _write_column(f, err, compression, level, chunk_rows)
+                    descriptions.append(description)
+                header[group] = descriptions
+
+            offset = _pad(f)
+            encoded = json.dumps(header).encode("utf-8")
+            f.write(encoded)
+            f.seek(0)
+            f.write(PREAMBLE.pack(MAGIC, offset, len(encoded)))
+        os.replace(tmp, filename)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+    return
+
+
+def read_header(filename):
+    """
+    Returns the JSON header of a file written by save, with the
+    names, units, labels and the position of every column
+    """
+
+    with open(filename, "rb") as f:
+        magic, offset, length = PREAMBLE.unpack(f.read(PREAMBLE.size))
+        assert magic == MAGIC, "%s is not a DataSet file" % filename
+        f.seek(offset)
+        header = json.loads(f.read(length).decode("utf-8"))
+    assert header["version"] <= VERSION, "%s was written by a newer version" % filename
+    return header
+
+
+def _read_column(filename, f, entry, compression, start, stop, mmap):
+    """
+    Rows start:stop of a column, a view of an np.memmap for raw
+    columns (if mmap) or the decompressed chunks that overlap
+    the rows for compressed ones. Nothing is cached, every call
+    reads and decompresses its chunks again.
+    """
+
+    dtype = np.dtype(entry["dtype"])
+    if compression is None:
+        if mmap:
+            if stop <= start:
+                return np.empty(0, dtype=dtype)
+            return np.memmap(filename, dtype=dtype, mode="r", offset=entry["offset"], shape=(entry["length"],))[start:stop]
+        f.seek(entry["offset"]+start*dtype.itemsize)
+        return np.fromfile(f, dtype=dtype, count=max(stop-start, 0))
+
+    decompress = COMPRESSORS[compression][1]
+    chunk_rows = entry["chunk_rows"]
+    out = np.empty(max(stop-start, 0), dtype=dtype)
+    for i in range(start//chunk_rows, -(-stop//chunk_rows)):
+        offset, nbytes = entry["chunks"][i]
+        f.seek(offset)
+        chunk = np.frombuffer(decompress(f.read(nbytes)), dtype=dtype)
+        first = i*chunk_rows
+        lo, hi = max(start, first), min(stop, first+chunk.shape[0])
+        out[lo-start:hi-start] = chunk[lo-first:hi-first]
+    return out
+
+
+def _select(descriptions, selection):
+    if selection is None:
+        return list(range(len(descriptions)))
+    if type(selection) is not list:
+        selection = [selection]
+    names = [description["name"] for description in descriptions]
+    return [names.index(i) if type(i) is str else i for i in selection]
+
+
+def load(filename, parameters=None, measurements=None, start=None, stop=None, mmap=True):
+    """
+    Reads a DataSet written by DataSet.save. Only the requested
+    columns and rows are read: raw columns are memory-mapped (so
+    pages are only read when accessed) and compressed columns
+    are decompressed chunk by chunk.
+
+    Parameters:
+    ---------------------------------------------------------
+    parameters, measurements:   list of Int or str (names),
+                                None for all of them
+    start, stop:    Int, the rows of the parameters and
+                    measurements to read, variables are read whole
+    mmap:           Memory-maps raw columns, else they are read
+                    in memory
+
+    A per-point err is a column of its own, so the chunks of the
+    rows are decompressed once for the data and once for err, and
+    again at each load: keep the DataSet rather than loading the
+    same rows repeatedly.
+
+    Usage:
+        ds.save("sweep.dat")
+        ds = load("sweep.dat", measurements=["I"], start=0, stop=1000)
+    """
+
+    header = read_header(filename)
+    compression = header["compression"]
+
+    lengths = [description["data"]["length"] for description in header["parameters"]+header["measurements"]]
+    n = lengths[0] if len(lengths) > 0 else 0
+    start, stop = slice(start, stop).indices(n)[:2]
+
+    def read(descriptions, selection, cls, f, rows):
+        variables = []
+        for i in _select(descriptions, selection):
+            description = descriptions[i]
+            lo, hi = rows if rows is not None else (0, description["data"]["length"])
+            data = _read_column(filename, f, description["data"], compression, lo, hi, mmap)
+            err = description["err"]
+            if type(err) is dict:
+                err = _read_column(filename, f, err, compression, lo, hi, mmap)
+            variables.append(cls(data, description["name"], description["unit"], err, description["label"]))
+        return variables
+
+    with open(filename, "rb") as f:
+        res = DataSet(read(header["parameters"], parameters, Parameter, f, (start, stop)),
+                      read(header["measurements"], measurements, Measurement, f, (start, stop)))
+        variables = read(header["variables"], None, Variable, f, None)
+    if len(variables) > 0:
+        res.variables = variables
+
+    return res
@@ -0,0 +1,234 @@
+from collections import OrderedDict
+from math import factorial
+import numpy as np
+
+
+# Points differentiated at once when the inputs are memory-mapped
+CHUNK_SIZE = 1 << 20
+# Points whose weights are solved at once on non-uniform grids
+SOLVE_SIZE = 1 << 15
+# Number of uniform grid kernels kept, each is a (window, window) table
+WEIGHT_CACHE_SIZE = 64
+_WEIGHTS = OrderedDict()
+
+
+def clear_weights():
+    """
+    Empties the cache of uniform grid kernels
+    """
+    _WEIGHTS.clear()
+    return
+
+
+def _cached(key, compute):
+    if key in _WEIGHTS:
+        _WEIGHTS.move_to_end(key)
+        return _WEIGHTS[key]
+    value = compute()
+    _WEIGHTS[key] = value
+    while len(_WEIGHTS) > WEIGHT_CACHE_SIZE:
+        _WEIGHTS.popitem(last=False)
+    return value
+
+
+def local_weights(offsets, order=1, polyorder=2):
+    """
+    Weights w such that sum(w*y) is the order-th derivative, at
+    offset 0, of the least squares polynomial of degree polyorder
+    through the points (offsets, y), for a stack of windows.
+    The offsets are scaled to [-1,1] and the normal equations
+    are solved for every window at once.
+
+    Parameters:
+    --------------------------------
+    offsets:    np.ndarray (k, window), x of the window minus x
+                of the point where the derivative is taken
+    """
+
+    offsets = np.asarray(offsets, dtype=np.float64)
+    scale = np.abs(offsets).max(axis=1, keepdims=True)
+    scale[scale == 0] = 1
+    u = offsets/scale
+    V = np.empty(u.shape+(polyorder+1,))
+    V[..., 0] = 1
+    for d in range(1, polyorder+1):
+        V[..., d] = V[..., d-1]*u
+    # Only the row order of (V^T V)^-1 V^T is needed, and V^T V is symmetric
+    unit = np.zeros((u.shape[0], polyorder+1, 1))
+    unit[:, order] = 1
+    row = np.linalg.solve(V.transpose(0, 2, 1)@V, unit)
+    return factorial(order)*(V@row)[..., 0]/scale**order
+
+
+def _starts(lo, hi, n, window):
+    """
+    First point of the window of every point in lo..hi, centered
+    except at the ends where it stays inside the data
+    """
+    return np.clip(np.arange(lo, hi)-window//2, 0, n-window)
+
+
+def uniform_kernel(xs, window, order=1, polyorder=2):
+    """
+    Returns None if the grid xs is not uniform, else the table
+    whose row j holds the weights of the j-th point of a window
+    (row window//2 is the convolution kernel of the inner points).
+    The table only depends on the spacing, it is cached per spacing.
+    """
+
+    h = (xs[-1]-xs[0])/(xs.shape[0]-1)
+    if not np.all(np.abs(np.diff(xs)-h) <= 1e-9*abs(h)):
+        return None
+    key = (float("%.12g" % h), window, order, polyorder)
+    position = np.arange(window)
+    return _cached(key, lambda: local_weights(h*(position[None, :]-position[:, None]), order, polyorder))
+
+
+def savgol_weights(x, window, order=1, polyorder=2, lo=0, hi=None):
+    """
+    Savitzky-Golay weights of the order-th derivative for every
+    point lo..hi of the grid x, uniform or not. The weights of
+    non-uniform grids are recomputed at each call, only the
+    (window, window) kernels of uniform grids are cached.
+
+    Returns:
+    --------------------------------
+    weights:    np.ndarray (hi-lo, window)
+    starts:     np.ndarray (hi-lo,) first point of each window
+    """
+
+    n = x.shape[0]
+    hi = n if hi is None else hi
+    starts = _starts(lo, hi, n, window)
+    xs = np.asarray(x[starts[0]:starts[-1]+window], dtype=np.float64)
+    table = uniform_kernel(xs, window, order, polyorder)
+    if table is not None:
+        return table[np.arange(lo, hi)-starts], starts
+    offsets = xs[(starts-starts[0])[:, None]+np.arange(window)]-xs[np.arange(lo, hi)-starts[0], None]
+    return local_weights(offsets, order, polyorder), starts
+
+
+def _stack(Ys, lo, hi):
+    return np.stack([np.asarray(y[lo:hi], dtype=np.float64) for y in Ys])
+
+
+def _apply(Y, weights, rows):
+    """
+    sum_j weights[:, j]*Y[:, rows+j] for every measurement, with
+    slices instead of gathers when the windows are consecutive
+    """
+
+    k, window = weights.shape
+    result = np.zeros((Y.shape[0], k))
+    consecutive = k > 0 and rows[-1]-rows[0] == k-1
+    for j in range(window):
+        if consecutive:
+            result += weights[:, j]*Y[:, rows[0]+j:rows[0]+j+k]
+        else:
+            result += weights[:, j]*Y[:, rows+j]
+    return result
+
+
+def _savgol(x, Ys, window, order, polyorder, lo, hi):
+    n = x.shape[0]
+    starts = _starts(lo, hi, n, window)
+    first = starts[0]
+    xs = np.asarray(x[first:starts[-1]+window], dtype=np.float64)
+    Y = _stack(Ys, first, starts[-1]+window)
+    rows = starts-first
+    positions = np.arange(lo, hi)-first
+
+    table = uniform_kernel(xs, window, order, polyorder)
+    if table is None:
+        # Per point weights, solved by blocks to bound the memory
+        result = np.empty((len(Ys), hi-lo))
+        for i in range(0, hi-lo, SOLVE_SIZE):
+            block = slice(i, min(i+SOLVE_SIZE, hi-lo))
+            offsets = xs[rows[block, None]+np.arange(window)]-xs[positions[block], None]
+            result[:, block] = _apply(Y, local_weights(offsets, order, polyorder), rows[block])
+        return result
+
+    # A single kernel for every point centered in its window, the
+    # (window, window) table gives the few points at the ends
+    half = window//2
+    result = np.empty((len(Ys), hi-lo))
+    inner = np.flatnonzero(rows == positions-half)
+    if inner.shape[0] > 0:
+        from scipy.ndimage import correlate1d
+        a, b = inner[0], inner[-1]+1
+        span = Y[:, rows[a]:rows[a]+b-a+window-1]
+        result[:, a:b] = correlate1d(span, table[half], axis=1)[:, half:half+b-a]
+    outer = np.flatnonzero(rows != positions-half)
+    result[:, outer] = _apply(Y, table[positions[outer]-rows[outer]], rows[outer])
+    return result
+
+
+def _gradient(x, Ys, order, lo, hi):
+    # Each np.gradient only uses the neighbours, order points of
+    # overlap on each side give the same values as the whole array
+    a, b = max(lo-order, 0), min(hi+order, x.shape[0])
+    xs = np.asarray(x[a:b], dtype=np.float64)
+    result = _stack(Ys, a, b)
+    for i in range(order):
+        result = np.gradient(result, xs, axis=1)
+    return result[:, lo-a:hi-a]
+
+
+def differentiate(x, Ys, order=1, window=None, polyorder=None, out=None, chunk_size=None):
+    """
+    order-th derivative of every measurement of Ys with respect to
+    x in one vectorized call. Without window np.gradient is applied
+    order times, else every point is the derivative of the least
+    squares polynomial of degree polyorder over window points
+    (Savitzky-Golay), which smooths the noise and handles
+    non-uniform grids. Memory-mapped inputs are differentiated
+    chunk by chunk, with the overlap the windows need.
+
+    Parameters:
+    ---------------------------------------------------------
+    x:          np.ndarray (n,), strictly monotonic for window
+    Ys:         list of np.ndarray (n,) or np.ndarray (m, n)
+    order:      Int, order of the derivative
+    window:     Int, odd number of points of the local fits
+    polyorder:  Int, degree of the local polynomials, by
+                default order+1 (at most window-1)
+    out:        None, np.ndarray (m, n) or str
+                Where to write the derivatives, a str is the
+                filename of a new np.memmap
+    chunk_size: Int, number of points per chunk, by default
+                CHUNK_SIZE for memory-mapped inputs or out and
+                everything at once otherwise
+
+    Returns:
+    ---------------------------------------------------------
+    np.ndarray (m, n), row i is the derivative of Ys[i]
+    """
+
+    n, m = x.shape[0], len(Ys)
+    assert order >= 1, "order must be at least 1"
+    for y in Ys:
+        assert y.shape[0] == n, "The measurements must have the length of the parameter"
+    if window is not None:
+        if polyorder is None:
+            polyorder = min(order+1, window-1)
+        assert window % 2 == 1, "window must be odd"
+        assert order <= polyorder < window, "polyorder must be at least order and less than window"
+        assert window <= n, "window must not exceed the number of points"
+
+    if type(out) is str:
+        out = np.memmap(out, dtype=np.float64, mode="w+", shape=(m, n))
+    elif out is None:
+        out = np.empty((m, n), dtype=np.float64)
+
+    if chunk_size is None:
+        mapped = isinstance(x, np.memmap) or any([isinstance(y, np.memmap) for y in Ys]) or isinstance(out, np.memmap)
+        chunk_size = CHUNK_SIZE if mapped else max(n, 1)
+
+    for lo in range(0, n, chunk_size):
+        hi = min(lo+chunk_size, n)
+        if window is None:
+            out[:, lo:hi] = _gradient(x, Ys, order, lo, hi)
+        else:
+            out[:, lo:hi] = _savgol(x, Ys, window, order, polyorder, lo, hi)
+
+    return out
@@ -1,7 +1,73 @@
 import numpy as np
-import scipy as sp
 from Analysis import Functions as F
 from Analysis import Plot as P
+from Analysis.Fit.parallel import fit_many
+from Analysis.Experiment.parser import parse_columns
+from Analysis.Experiment import cache as C
+from Analysis.Experiment.rangeindex import RangeIndex
+from Analysis.Experiment import uncertainty as U
+from Analysis.Experiment import differentiate as D
+
+
+# Memory-mapped data is scanned in chunks of this many elements
+CHUNK_SIZE = 1 << 20
+
+
+def _chunks(n, chunk_size=None):
+    """
+    Yields the (start, stop) bounds of the chunks of an array of length n
+    """
+    if chunk_size is None:
+        chunk_size = CHUNK_SIZE
+    for start in range(0, n, chunk_size):
+        yield start, min(start+chunk_size, n)
+
+
+def _compose(index, sub, n):
+    """
+    Composes two index maps, index selects from an array of
+    length n (None for the whole array) and sub selects from
+    the result. Slices stay slices and arrays are only gathered
+    between themselves so that no data is copied.
+    """
+
+    if type(sub) is np.ndarray and sub.dtype == bool:
+        sub = np.flatnonzero(sub)
+    if index is None:
+        return sub
+
+    if type(index) is slice:
+        r = range(*index.indices(n))
+        if type(sub) is slice:
+            r = r[sub]
+            stop = r.stop if r.stop >= 0 else None
+            return slice(r.start, stop, r.step)
+        sub = np.asarray(sub)
+        sub = np.where(sub < 0, sub+len(r), sub)
+        return r.start+sub*r.step
+
+    return index[sub]
+
+
+# value, d/da and d/db of the arithmetic operations of Variable
+_OPERATIONS = {
+    "+": (lambda a, b: a+b, lambda a, b: 1, lambda a, b: 1),
+    "-": (lambda a, b: a-b, lambda a, b: 1, lambda a, b: -1),
+    "*": (lambda a, b: a*b, lambda a, b: b, lambda a, b: a),
+    "/": (lambda a, b: a/b, lambda a, b: 1/b, lambda a, b: -a/b**2),
+    "**": (lambda a, b: a**b, lambda a, b: b*a**(b-1), lambda a, b: a**b*np.log(a)),
+}
+
+
+def _unit(unit_a, unit_b, op):
+    """
+    Unit of a*b or a/b
+    """
+    if unit_b == "":
+        return unit_a
+    if unit_a == "":
+        return unit_b if op == "*" else "1/%s" % (unit_b)
+    return "%s%s%s" % (unit_a, op, unit_b)
 
 
 class Variable():
@@ -15,7 +81,8 @@ class Variable():
         Parameters:
         -----------------------------
         data:   list or np.ndarray (1d)
-                The values of the parameter
+                The values of the parameter, an np.memmap
+                is wrapped without being loaded in memory
         name:   str
                 The name of the parameter
         unit:   str
@@ -28,20 +95,25 @@ class Variable():
         self.unit = unit
         self.type = Type
         self.label = label
+        self._range_block = None
+        self._index = None
 
         if type(data) is list:
             self.data = np.array(data)
-        elif type(data) is np.ndarray:
+        elif isinstance(data, np.ndarray):
             self.data = data
         else:
             raise Exception("Data must be a string or a 1D array")
 
         if err is not None:
             if type(err) is float or type(err) is int or type(err) is np.float64:
-                self.err = self.data*0+err
+                if isinstance(self.data, np.memmap):
+                    self.err = np.broadcast_to(np.float64(err), self.data.shape)
+                else:
+                    self.err = self.data*0+err
             elif type(err) is list:
                 self.err = np.array(err)
-            elif type(err) is np.ndarray:
+            elif isinstance(err, np.ndarray):
                 self.err = err
             else:
                 raise ValueError("Err must be a float,int or a list or array of floats and ints")
@@ -50,6 +122,143 @@ class Variable():
 
         return
 
+    @classmethod
+    def from_file(cls, filename, name, unit, err=None, label=None, dtype=np.float64, offset=0, shape=None, mode="r"):
+        """
+        Wraps a raw binary file in an np.memmap, pages are
+        only read from disk when they are accessed
+
+        Parameters:
+        -----------------------------
+        filename:   str
+                    The binary file
+        dtype:      The type of the values in the file
+        offset:     Int
+                    Number of bytes before the first value
+        shape:      Int
+                    Number of values, the whole file by default
+        mode:       The np.memmap mode, read-only by default
+        """
+
+        data = np.memmap(filename, dtype=dtype, mode=mode, offset=offset, shape=shape)
+        return cls(data, name, unit, err, label)
+
+    @property
+    def data(self):
+        if self._index is None:
+            return self._data
+        if type(self._index) is slice:
+            data = self._data[self._index]
+        else:
+            # An index array gathers a copy, kept until
+            # invalidate_index so repeated reads do not gather again
+            if self._gathered is None:
+                self._gathered = self._data[self._index]
+            data = self._gathered
+        # Views are read-only, materialize() gives a writable copy
+        data.flags.writeable = False
+        return data
+
+    @data.setter
+    def data(self, data):
+        if self._index is not None:
+            self._err = self.err
+            self._index = None
+        self._data = data
+        self.invalidate_index()
+        return
+
+    @property
+    def err(self):
+        if self._index is None or self._err is None:
+            return self._err
+        if type(self._index) is slice:
+            err = self._err[self._index]
+        else:
+            if self._gathered_err is None:
+                self._gathered_err = self._err[self._index]
+            err = self._gathered_err
+        err.flags.writeable = False
+        return err
+
+    @err.setter
+    def err(self, err):
+        if self._index is not None:
+            self.materialize()
+        self._err = err
+        return
+
+    def is_view(self):
+        """
+        Returns True if the object shares the buffer of the
+        object it was taken from through a lazy index map
+        """
+        return self._index is not None
+
+    def materialize(self):
+        """
+        Copies the data (and err) of a view in its own buffer,
+        does nothing if the object is not a view
+        """
+
+        if self._index is not None:
+            data = np.array(self._data[self._index])
+            err = self._err
+            if err is not None:
+                err = np.array(err[self._index])
+            self._index = None
+            self._err = err
+            self.data = data
+        return self
+
+    def _view(self, index):
+        """
+        Returns an object of the same type sharing the buffer of
+        this one, index is composed with the index map of self
+        """
+
+        result = self._like(self._data, self._err)
+        result._index = _compose(self._index, index, self._data.shape[0])
+        result.invalidate_index()
+        return result
+
+    def _like(self, data, err):
+        if self.type == "Parameter":
+            result = Parameter(data, self.name, self.unit,err,self.label)
+        elif self.type == "Measurement":
+            result = Measurement(data, self.name, self.unit,err,self.label)
+        else:
+            result = Variable(data, self.name, self.unit,err,self.label)
+        return result
+
+    def invalidate_index(self):
+        """
+        Drops the cached lookup index (and the gathered data of
+        a view), it is done automatically when data is replaced
+        but must be called after modifying data in place,
+        on the views of a buffer too
+        """
+        self._monotonic = None
+        self._sorted = None
+        self._range = None
+        self._gathered = None
+        self._gathered_err = None
+        return
+
+    def _range_index(self, Slice):
+        """
+        Returns the RangeIndex if one was requested with
+        build_range_index and Slice is a contiguous slice
+        """
+
+        if self._range_block is None or type(Slice) is not slice:
+            return None
+        if Slice.step is not None and Slice.step != 1:
+            return None
+        if self._range is None:
+            self._range = RangeIndex(self.data, self._range_block)
+        return self._range
+
     def __call__(self):
         return self.data
 
@@ -66,17 +275,25 @@ class Variable():
         self.label = label
         return
 
-    def rescale(self, function,*args,new_name=None,new_unit=None,new_label=None,Type=None):
+    def rescale(self, function,*args,new_name=None,new_unit=None,new_label=None,Type=None,
+                derivative=None,method="linear",samples=1000,seed=None):
         """
         Rescales the parameter using the specified
         function and parameter, also changes the name
-        and unit
+        and unit.
+
+        The uncertainty is propagated to first order with the
+        derivative of function (analytic if given or registered
+        with Analysis.Experiment.register_derivative, else central
+        differences), or with Monte Carlo draws if method is
+        "montecarlo", see Analysis.Experiment.propagate
         """
         assert callable(function), "Function must be callable"
         data = function(self.data, *args)
 
         if self.err is not None:
-            err = function(self.err, *args)
+            err = U.propagate(function, self.data, self.err, *args, method=method,
+                              dfdx=derivative, samples=samples, seed=seed)
         else:
             err = self.err
 
@@ -96,15 +313,96 @@ class Variable():
         else:
             return Variable(data, new_name, new_unit,err,new_label)
 
-    def subset(self, start, stop=None, step=1, single=False):
+    # Arithmetic with other Variables, numbers or arrays propagates
+    # uncorrelated uncertainties to first order (an operation of a
+    # Variable with itself is treated as fully correlated).
+    # numpy defers to these methods instead of broadcasting over them
+    __array_ufunc__ = None
+
+    def _arithmetic(self, other, op, reflected=False):
+        if isinstance(other, Variable):
+            b, eb, name, unit = other.data, other.err, other.name, other.unit
+        else:
+            b, eb, name, unit = np.asarray(other), None, None, None
+        a, ea = self.data, self.err
+
+        value, da, db = _OPERATIONS[op]
+        if reflected:
+            a, ea, b, eb = b, eb, a, ea
+        data = value(a, b)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            if other is self:
+                err = None if ea is None else np.abs(da(a, b)+db(a, b))*ea
+            else:
+                err = U.combine(None if ea is None else da(a, b)*ea,
+                                None if eb is None else db(a, b)*eb)
+
+        result = self._like(data, err)
+        result.name, result.unit = self.name, self.unit
+        if name is not None:
+            names, units = ((name, self.name), (unit, self.unit)) if reflected else ((self.name, name), (self.unit, unit))
+            result.name = "%s%s%s" % (names[0], op, names[1])
+            if op in ("*", "/"):
+                result.unit = _unit(units[0], units[1], op)
+            elif op == "**":
+                result.unit = ""
+        elif op == "/" and reflected:
+            result.unit = _unit("", self.unit, op)
+        elif op == "**":
+            result.unit = "%s^%s" % (self.unit, other) if self.unit != "" and not reflected else ""
+        return result
+
+    def __add__(self, other):
+        return self._arithmetic(other, "+")
+
+    def __radd__(self, other):
+        return self._arithmetic(other, "+", True)
+
+    def __sub__(self, other):
+        return self._arithmetic(other, "-")
+
+    def __rsub__(self, other):
+        return self._arithmetic(other, "-", True)
+
+    def __mul__(self, other):
+        return self._arithmetic(other, "*")
+
+    def __rmul__(self, other):
+        return self._arithmetic(other, "*", True)
+
+    def __truediv__(self, other):
+        return self._arithmetic(other, "/")
+
+    def __rtruediv__(self, other):
+        return self._arithmetic(other, "/", True)
+
+    def __pow__(self, other):
+        return self._arithmetic(other, "**")
+
+    def __rpow__(self, other):
+        return self._arithmetic(other, "**", True)
+
+    def __neg__(self):
+        return self._like(-self.data, self.err)
+
+    def subset(self, start, stop=None, step=1, single=False, view=False):
         """
         This function returns another object
         of the same type but with a subset
         of the data. The slice shoud be
         a slice of an array Ex. [1:5:1]
+
+        If view is True the result shares the buffer of
+        self even when start is an array of indices
         """
 
-        if single is False:
+        if single is False and view is True:
+            if type(start) is np.ndarray:
+                result = self._view(start)
+            else:
+                result = self._view(slice(start,stop,step))
+
+        elif single is False:
             if type(start) is np.ndarray:
                 data = self.data[start]
                 if self.err is not None:
@@ -136,7 +434,11 @@ class Variable():
 
         return result
 
-    def delete(self,start,stop,step):
+    def delete(self,start,stop,step,view=False):
+
+        if view is True:
+            keep = np.delete(np.arange(self.data.shape[0]),slice(start,stop,step))
+            return self._view(keep)
 
         data = np.delete(self.data,slice(start,stop,step))
         if self.err is not None:
@@ -155,37 +457,40 @@ class Variable():
 
 
 
-    def sort(self,index_array=None,kind="stable",Index=False):
+    def sort(self,index_array=None,kind="stable",Index=False,view=False):
         """
-        Sorts the data using np.argsort
+        Sorts the data (and err) using np.argsort,
+        if view is True the sorted object shares
+        the buffer of self
         """
         data = self.data
         if index_array is None:
             index_array = np.argsort(data)
-        sorted_data = data[index_array]
 
-        if self.type == "Parameter":
-            result = Parameter(sorted_data,self.name,self.unit,self.err,self.label)
-        elif self.type == "Measurement":
-            result = Measurement(sorted_data,self.name,self.unit,self.err,self.label)
+        if view is True:
+            result = self._view(index_array)
         else:
-            result = Variable(sorted_data,self.name,self.unit,self.err,self.label)
+            err = self.err
+            if err is not None:
+                err = err[index_array]
+            result = self._like(data[index_array],err)
 
         if Index is True:
             return result,index_array
         else:
             return result
 
-    def sort_unique(self,Index=True):
+    def sort_unique(self,Index=True,view=False):
         data = self.data
         sorted_data, index_array = np.unique(data,True)
 
-        if self.type == "Parameter":
-            result = Parameter(sorted_data,self.name,self.unit,self.err,self.label)
-        elif self.type == "Measurement":
-            result = Measurement(sorted_data,self.name,self.unit,self.err,self.label)
+        if view is True:
+            result = self._view(index_array)
         else:
-            result = Variable(sorted_data,self.name,self.unit,self.err,self.label)
+            err = self.err
+            if err is not None:
+                err = err[index_array]
+            result = self._like(sorted_data,err)
 
         if Index is True:
             return result,index_array
@@ -198,6 +503,10 @@ class Variable():
         a slice
         """
 
+        index = self._range_index(Slice)
+        if index is not None:
+            return index.min(Slice.start, Slice.stop)
+
         if Slice is not None:
             data = self.data[Slice]
         else:
@@ -212,6 +521,10 @@ class Variable():
         whole array or a slice
         """
 
+        index = self._range_index(Slice)
+        if index is not None:
+            return index.argmin(Slice.start, Slice.stop)
+
         if Slice is not None:
             data = self.data[Slice]
         else:
@@ -229,6 +542,10 @@ class Variable():
         a slice
         """
 
+        index = self._range_index(Slice)
+        if index is not None:
+            return index.max(Slice.start, Slice.stop)
+
         if Slice is not None:
             data = self.data[Slice]
         else:
@@ -243,6 +560,10 @@ class Variable():
         whole array or a slice
         """
 
+        index = self._range_index(Slice)
+        if index is not None:
+            return index.argmax(Slice.start, Slice.stop)
+
         if Slice is not None:
             data = self.data[Slice]
         else:
@@ -262,22 +583,133 @@ class Variable():
         """
 
         data = self.data
-        index = np.where(data==value)[0]
 
-        if index.shape[0] == 0:
-            if closest is True:
-                index = np.where(data>=value)[0]
-                if index.shape[0] == 0:
-                    res = None
-                else:
-                    res = index[0]
+        if self.is_monotonic():
+            lo = np.searchsorted(data, value, "left")
+            hi = np.searchsorted(data, value, "right")
+        elif isinstance(data, np.memmap):
+            return self._where_chunked(value, closest)
+        else:
+            order, sorted_data, first, n_valid = self._sorted_index()
+            lo = min(np.searchsorted(sorted_data, value, "left"), n_valid)
+            hi = min(np.searchsorted(sorted_data, value, "right"), n_valid)
+
+        if hi > lo:
+            if self.is_monotonic():
+                res = np.arange(lo, hi)
+            else:
+                res = order[lo:hi].copy()
+        elif closest is True:
+            if self.is_monotonic():
+                res = lo if lo < data.shape[0] else None
             else:
-                res = None
+                res = first[lo] if lo < n_valid else None
         else:
-            res = index
+            res = None
 
         return res
 
+    def where_array(self, values, closest=True):
+        """
+        Vectorized where, returns for every value the
+        index of its first occurence in the array or of the
+        first value greater or equal if closest is True,
+        -1 when there is none
+        """
+
+        values = np.asarray(values)
+        data = self.data
+
+        if self.is_monotonic():
+            lo = np.searchsorted(data, values, "left")
+            hi = np.searchsorted(data, values, "right")
+            found = hi > lo
+            res = np.where(lo < data.shape[0], lo, -1)
+        elif isinstance(data, np.memmap):
+            res = np.full(values.shape, -1, dtype=np.int64)
+            for i, value in np.ndenumerate(values):
+                index = self._where_chunked(value, closest)
+                if index is not None:
+                    res[i] = np.min(index)
+            return res
+        else:
+            order, sorted_data, first, n_valid = self._sorted_index()
+            lo = np.minimum(np.searchsorted(sorted_data, values, "left"), n_valid)
+            hi = np.minimum(np.searchsorted(sorted_data, values, "right"), n_valid)
+            found = hi > lo
+            valid = lo < n_valid
+            res = np.full(values.shape, -1, dtype=np.int64)
+            res[valid] = first[lo[valid]]
+            res[found] = order[lo[found]]
+
+        if closest is not True:
+            res = np.where(found, res, -1)
+
+        return res
+
+    def is_monotonic(self):
+        """
+        Returns True if data is sorted in growing order,
+        the result is cached until data changes
+        """
+
+        if self._monotonic is None:
+            data = self.data
+            if isinstance(data, np.memmap):
+                monotonic = True
+                for start, stop in _chunks(data.shape[0]):
+                    chunk = np.asarray(data[max(start-1, 0):stop])
+                    if not np.all(chunk[1:] >= chunk[:-1]):
+                        monotonic = False
+                        break
+            else:
+                monotonic = bool(np.all(data[1:] >= data[:-1]))
+            # A single nan would pass the comparisons
+            if data.shape[0] != 0 and not data[0] == data[0]:
+                monotonic = False
+            self._monotonic = monotonic
+        return self._monotonic
+
+    def _sorted_index(self):
+        """
+        Builds and caches the argsort of data along with, for
+        every position k in sorted order, the smallest original
+        index among the values sorted from k onwards. nan are
+        sorted last and excluded through n_valid.
+        """
+
+        if self._sorted is None:
+            data = self.data
+            order = np.argsort(data, kind="stable")
+            sorted_data = data[order]
+            n_valid = sorted_data.shape[0]-np.count_nonzero(np.isnan(sorted_data))
+            first = np.minimum.accumulate(order[:n_valid][::-1])[::-1]
+            self._sorted = (order, sorted_data, first, n_valid)
+        return self._sorted
+
+    def _where_chunked(self, value, closest=True):
+        """
+        Same as where but scans memory-mapped data
+        one chunk at a time
+        """
+
+        data = self.data
+        index = [np.flatnonzero(data[start:stop]==value)+start
+                 for start, stop in _chunks(data.shape[0])]
+        index = np.concatenate(index) if len(index) > 0 else np.array([], dtype=np.int64)
+
+        if index.shape[0] != 0:
+            return index
+        if closest is not True:
+            return None
+
+        for start, stop in _chunks(data.shape[0]):
+            chunk = np.flatnonzero(data[start:stop]>=value)
+            if chunk.shape[0] != 0:
+                return chunk[0]+start
+
+        return None
+
 
 class Parameter(Variable):
 
@@ -294,6 +726,22 @@ class Measurement(Variable):
             data, name, unit, err, label, Type="Measurement")
         return
 
+    def build_range_index(self, block_size=64):
+        """
+        Builds a RangeIndex used by min, max, argmin and argmax
+        (and so by the DataSet interval methods) for contiguous
+        slices. It is rebuilt lazily if data changes.
+        """
+
+        self._range_block = block_size
+        self._range = RangeIndex(self.data, block_size)
+        return self._range
+
+    def drop_range_index(self):
+        self._range_block = None
+        self._range = None
+        return
+
 
 
 class DataSet():
@@ -323,38 +771,150 @@ class DataSet():
         self.parameters = parameters
         self.measurements = measurements
         self.variables = variables
+        self.block = None
+        self._block_rows = []
+
+        return
+
+    @classmethod
+    def from_block(cls, block, parameter_names_units, measurement_names_units, measurement_labels=None):
+        """
+        Builds a DataSet whose columns are the rows of a single
+        2D array, parameters first, each Parameter and Measurement
+        is a view of its row. sort, subset and delete then gather
+        every column with one indexing operation on the block.
+
+        Parameters:
+        ---------------------------------------------------------
+        block:      np.ndarray (2d)
+                    The columns, shape (columns, rows)
+        parameter_names_units:  tuple("name","unit") or a list of them
+        measurement_names_units:    list(tuple("name","unit") for number of measurements)
+        measurement_labels:     list of str
+        """
+
+        if type(parameter_names_units) is tuple:
+            parameter_names_units = [parameter_names_units]
+        n_parameters = len(parameter_names_units)
+        if block.ndim != 2:
+            raise ValueError("block must be of shape (columns, rows)")
+        if block.shape[0] != n_parameters+len(measurement_names_units):
+            raise ValueError("block has %i rows for %i parameters and %i measurements"
+                             % (block.shape[0], n_parameters, len(measurement_names_units)))
+        if measurement_labels is None:
+            measurement_labels = [None for i in measurement_names_units]
+
+        parameters = [Parameter(block[i], *parameter_names_units[i]) for i in range(n_parameters)]
+        measurements = [Measurement(block[n_parameters+i], *measurement_names_units[i], label=measurement_labels[i])
+                        for i in range(len(measurement_names_units))]
+
+        res = cls(parameters, measurements)
+        res._set_block(block)
+        return res
 
+    def _set_block(self, block):
+        self.block = block
+        self._block_rows = [column._data for column in self.parameters+self.measurements]
         return
 
-    def sort(self,parameter=None,measurements=None,unique=False):
+    def _valid_block(self):
+        """
+        Returns the block if every column is still the row of
+        the block it was built with (not replaced, not a view),
+        None otherwise
+        """
+
+        if self.block is None:
+            return None
+        columns = self.parameters+self.measurements
+        if len(columns) != len(self._block_rows):
+            return None
+        for column, row in zip(columns, self._block_rows):
+            if column._data is not row or column._index is not None:
+                return None
+        return self.block
+
+    def _block_gather(self, parameters, measurements, index):
+        """
+        Returns the DataSet of parameters and measurements (columns
+        of self) at index (a slice or an array) gathered from the
+        block with a single indexing operation, or None if self
+        is not backed by a valid block
+        """
+
+        block = self._valid_block()
+        if block is None:
+            return None
+
+        positions = [id(column) for column in self.parameters+self.measurements]
+        columns = parameters+measurements
+        try:
+            rows = [positions.index(id(column)) for column in columns]
+        except ValueError:
+            return None
+
+        every_row = rows == list(range(block.shape[0]))
+        if type(index) is slice:
+            new_block = block[:, index] if every_row else block[rows, index]
+        else:
+            take = np.asarray(index)
+            if take.dtype == bool:
+                take = np.flatnonzero(take)
+            if every_row:
+                # np.take along the rows is faster than fancy indexing
+                new_block = np.take(block, take, axis=1)
+            else:
+                new_block = np.empty((len(rows), take.shape[0]), dtype=block.dtype)
+                for i, row in enumerate(rows):
+                    np.take(block[row], take, out=new_block[i])
+
+        gathered = []
+        for i, column in enumerate(columns):
+            err = column.err
+            if err is not None:
+                err = err[index]
+            gathered.append(column._like(new_block[i], err))
+
+        res = DataSet(gathered[:len(parameters)], gathered[len(parameters):])
+        res._set_block(new_block)
+        return res
+
+    def sort(self,parameter=None,measurements=None,unique=False,view=False):
         """
         Sorts the parameter in growing order and sorts
-        the measurements accordingly
+        the measurements accordingly, if view is True
+        every column shares its buffer with self and
+        a single index map
         """
         if parameter is None:
             parameter = self.parameters[0]
         if measurements is None:
             measurements = self.measurements
 
+        if view is False and self._valid_block() is not None:
+            if unique is True:
+                index_array = np.unique(parameter.data,True)[1]
+            else:
+                index_array = np.argsort(parameter.data)
+            res = self._block_gather([parameter],measurements,index_array)
+            if res is not None:
+                return res
+
         if unique is True:
-            param_sort, index_array = parameter.sort_unique()
-            measurements_sort = [i.subset(index_array) for i in measurements]
+            param_sort, index_array = parameter.sort_unique(view=view)
+            measurements_sort = [i.subset(index_array,view=view) for i in measurements]
         else:
-            param_sort, index_array = parameter.sort(Index=True)
-            measurements_sort = [i.subset(index_array) for i in measurements]
+            param_sort, index_array = parameter.sort(Index=True,view=view)
+            measurements_sort = [i.subset(index_array,view=view) for i in measurements]
 
         return DataSet(param_sort,measurements_sort)
 
-    def min(self,parameter,measurement,start=None,stop=None):
+    def _interval(self, param, meas, start=None, stop=None):
         """
-        Returns the minimum value of a measurement
-        within an interval of the parameter from
-        start to stop
+        Returns the slice of meas going from the index
+        of start to the index of stop in param
         """
 
-        param = self.parameters[parameter]
-        meas = self.measurements[measurement]
-
         if start is not None:
             start = param.where(start)
 
@@ -381,14 +941,21 @@ class DataSet():
         else:
             stop = meas.data.shape[0]
 
-        Slice = slice(start,stop)
-        res = meas.min(Slice)
+        return slice(start,stop)
 
-        return res
+    def intervals(self, parameter, starts, stops):
+        """
+        Vectorized lookup of many intervals of a parameter,
+        returns the arrays of start and stop indices
+        (-1 where a value is above every point)
+        """
 
-    def argmin(self,parameter,measurement,start=None,stop=None):
+        param = self.parameters[parameter]
+        return param.where_array(starts), param.where_array(stops)
+
+    def min(self,parameter,measurement,start=None,stop=None):
         """
-        Returns the minimum's index  of a measurement
+        Returns the minimum value of a measurement
         within an interval of the parameter from
         start to stop
         """
@@ -396,33 +963,22 @@ class DataSet():
         param = self.parameters[parameter]
         meas = self.measurements[measurement]
 
-        if start is not None:
-            start = param.where(start)
+        Slice = self._interval(param, meas, start, stop)
+        res = meas.min(Slice)
 
-            if type(start) is np.ndarray:
-                if start.shape[0] is not None:
-                    start = start[0]
-                else:
-                    raise ValueError("Start value not in array")
-            else:
-                start = start
-        else:
-            start = 0
+        return res
 
-        if stop is not None:
-            stop = param.where(stop)
+    def argmin(self,parameter,measurement,start=None,stop=None):
+        """
+        Returns the minimum's index  of a measurement
+        within an interval of the parameter from
+        start to stop
+        """
 
-            if type(stop) is np.ndarray:
-                if stop.shape[0] is not None:
-                    stop = stop[0]
-                else:
-                    raise ValueError("Stop value not in array")
-            else:
-                stop = stop
-        else:
-            stop = meas.data.shape[0]
+        param = self.parameters[parameter]
+        meas = self.measurements[measurement]
 
-        Slice = slice(start,stop)
+        Slice = self._interval(param, meas, start, stop)
         res = meas.argmin(Slice)
 
         return res
@@ -438,36 +994,7 @@ class DataSet():
         param = self.parameters[parameter]
         meas = self.measurements[measurement]
 
-        if start is not None:
-            start = param.where(start)
-
-            if type(start) is np.ndarray:
-                if start.shape[0] is not None:
-                    start = start[0]
-                else:
-                    raise ValueError("Start value not in array")
-            else:
-                start = start
-        else:
-            start = 0
-
-        if stop is not None:
-            stop = param.where(stop)
-
-            if type(stop) is np.ndarray:
-                if stop.shape[0] is not None:
-                    stop = stop[0]
-                else:
-                    raise ValueError("Stop value not in array")
-            else:
-                stop = stop
-        else:
-            stop = meas.data.shape[0]
-
-        Slice = slice(start,stop)
-        res = meas.argmax(Slice)
-
-        Slice = slice(start,stop)
+        Slice = self._interval(param, meas, start, stop)
         res = meas.max(Slice)
 
         return res
@@ -482,38 +1009,12 @@ class DataSet():
         param = self.parameters[parameter]
         meas = self.measurements[measurement]
 
-        if start is not None:
-            start = param.where(start)
-
-            if type(start) is np.ndarray:
-                if start.shape[0] is not None:
-                    start = start[0]
-                else:
-                    raise ValueError("Start value not in array")
-            else:
-                start = start
-        else:
-            start = 0
-
-        if stop is not None:
-            stop = param.where(stop)
-
-            if type(stop) is np.ndarray:
-                if stop.shape[0] is not None:
-                    stop = stop[0]
-                else:
-                    raise ValueError("Stop value not in array")
-            else:
-                stop = stop
-        else:
-            stop = meas.data.shape[0]
-
-        Slice = slice(start,stop)
+        Slice = self._interval(param, meas, start, stop)
         res = meas.argmax(Slice)
 
         return res
 
-    def subset(self,start,stop,step,parameters=None,measurements=None):
+    def subset(self,start,stop,step,parameters=None,measurements=None,view=False):
         """
         Returns a subset of the DataSet
         """
@@ -527,30 +1028,106 @@ class DataSet():
         else:
             measurements = [self.measurements[measurements]]
 
-        param_sub = [param.subset(start,stop,step) for param in parameters]
-        meas_sub = [meas.subset(start,stop,step) for meas in measurements]
+        if view is False:
+            index = start if type(start) is np.ndarray else slice(start,stop,step)
+            res = self._block_gather(parameters,measurements,index)
+            if res is not None:
+                return res
+
+        param_sub = [param.subset(start,stop,step,view=view) for param in parameters]
+        meas_sub = [meas.subset(start,stop,step,view=view) for meas in measurements]
 
         return DataSet(param_sub,meas_sub)
 
 
-    def derive(self,parameter=0,measurement=0,name=None,unit=None,label=None):
+    def derive(self,parameter=0,measurement=0,name=None,unit=None,label=None,out=None,order=1,window=None,polyorder=None):
         """
-        Uses np.gradient to derive numericaly the data
+        Derives numericaly the measurements with respect to the
+        parameter, with np.gradient or Savitzky-Golay local
+        polynomials (see Analysis.Experiment.differentiate).
+        A list of measurements is derived in one vectorized call,
+        memory-mapped data is derived chunk by chunk
+
+        Parameters:
+        ---------------------------------------------------------
+        measurement:    Int or list of Int, None for all of them
+        name, unit, label:  str (or list of str for a list of
+                        measurements), by default built from the
+                        names and units of the data
+        out:            None, np.ndarray or str
+                        Where to write the derivative, a str is the
+                        filename of a new np.memmap
+        order:          Int, order of the derivative
+        window:         Int, odd number of points of the local
+                        polynomial fits, None uses np.gradient
+        polyorder:      Int, degree of the local polynomials,
+                        by default order+1
+
+        Returns:
+        ---------------------------------------------------------
+        Measurement, or a list of Measurement for a list
         """
 
+        single = measurement is not None and np.ndim(measurement) == 0
+        if measurement is None:
+            measurement = range(len(self.measurements))
+        elif single:
+            measurement = [measurement]
         parameter = self.parameters[parameter]
-        measurement = self.measurements[measurement]
+        measurements = [self.measurements[i] for i in measurement]
+
+        if out is not None and type(out) is not str and out.ndim == 1:
+            out = out.reshape(1, -1)
+        data = D.differentiate(parameter.data, [meas.data for meas in measurements], order, window, polyorder, out)
 
-        data_x = parameter.data
-        data_y = measurement.data
+        names, units, labels = [], [], []
+        for i, meas in enumerate(measurements):
+            if order == 1:
+                default = ("d%s/d%s" % (meas.name, parameter.name), "%s/%s" % (meas.unit, parameter.unit))
+            else:
+                default = ("d%i%s/d%s%i" % (order, meas.name, parameter.name, order),
+                           "%s/%s^%i" % (meas.unit, parameter.unit, order))
+            names.append(default[0] if name is None else (name if single else name[i]))
+            units.append(default[1] if unit is None else (unit if single else unit[i]))
+            labels.append(label if single or label is None else label[i])
+
+        derivatives = [Measurement(data[i],names[i],units[i],None,labels[i]) for i in range(len(measurements))]
+        if single:
+            return derivatives[0]
+        return derivatives
+
+    def bin(self,parameter=0,edges_or_width=None,measurements=None,empty=False):
+        """
+        Averages the measurements in bins of the parameter, all the
+        measurements are reduced together in one pass over the data
+        (see Analysis.Experiment.binning.BinAccumulator)
 
-        data = np.gradient(data_y,data_x)
+        Parameters:
+        ---------------------------------------------------------
+        edges_or_width: np.ndarray of the edges of the bins or
+                        the width of the bins (float)
+        measurements:   list of Int, None for all of them
+        empty:          Keeps the empty bins (with nan statistics)
+
+        Returns:
+        ---------------------------------------------------------
+        DataSet with the centers of the bins as parameter and for
+        every measurement its mean (err is the standard error),
+        "name_min" and "name_max", then the "count" of each bin
+        """
 
-        derivative = Measurement(data,name,unit,None,label)
+        from Analysis.Experiment.binning import BinAccumulator, bin_edges
 
-        return derivative
+        assert edges_or_width is not None, "The edges or the width of the bins must be given"
+        if np.ndim(edges_or_width) == 0:
+            data = self.parameters[parameter].data
+            finite = data[np.isfinite(data)]
+            edges_or_width = bin_edges(edges_or_width, (finite.min(), finite.max()))
+        acc = BinAccumulator(edges_or_width)
+        acc.add(self, parameter, measurements)
+        return acc.dataset(empty)
 
-    def delete(self,start,stop,step,parameters=None,measurements=None):
+    def delete(self,start,stop,step,parameters=None,measurements=None,view=False):
         """
         Returns a subset of the DataSet
         """
@@ -560,13 +1137,69 @@ class DataSet():
         if measurements is None:
             measurements = self.measurements
 
-        param_del = [param.delete(start,stop,step) for param in parameters]
-        meas_del = [meas.delete(start,stop,step) for meas in measurements]
+        if view is False and self._valid_block() is not None:
+            keep = np.delete(np.arange(parameters[0].data.shape[0]),slice(start,stop,step))
+            res = self._block_gather(parameters,measurements,keep)
+            if res is not None:
+                return res
+
+        if view is True:
+            # A single index map shared by every column
+            keep = np.delete(np.arange(parameters[0].data.shape[0]),slice(start,stop,step))
+            param_del = [param.subset(keep,view=True) for param in parameters]
+            meas_del = [meas.subset(keep,view=True) for meas in measurements]
+        else:
+            param_del = [param.delete(start,stop,step) for param in parameters]
+            meas_del = [meas.delete(start,stop,step) for meas in measurements]
 
         return DataSet(param_del,meas_del)
 
 
-    def plot_1D(self, parameter=0, measurement=0, Fit=None, Graph=None, draw=True, **kwargs):
+    def fit_all(self, model, parameter=0, measurements=None, p0=None, bounds=(-np.inf, np.inf),
+                workers=None, chunksize=None, executor="process"):
+        """
+        Fits model to every measurement against one parameter
+        on a pool of workers, see Analysis.Fit.fit_many
+
+        Parameters:
+        -----------------------------------------------------
+        model:      str or callable
+                    A function of Analysis.Functions or its name
+        parameter:  Int or instance of Parameter
+        measurements:   list of Int or Measurement, all by default
+        p0:         Initial parameters, shared or one row per measurement,
+                    estimated for every measurement when None
+        workers, chunksize, executor:   See Analysis.Fit.fit_many
+
+        Returns:
+        -----------------------------------------------------
+        table:      np.ndarray structured with the fields "name",
+                    "params", "err", "converged" and "message", one row per measurement.
+                    The errors of the measurements are used as sigma
+                    when every measurement has them.
+        """
+
+        if type(model) is str:
+            assert callable(F.__dict__.get(model)), "%s not a fit function" % (model)
+            model = F.__dict__[model]
+        if type(parameter) is int:
+            parameter = self.parameters[parameter]
+        if measurements is None:
+            measurements = self.measurements
+        if type(measurements) is not list:
+            measurements = [measurements]
+        measurements = [self.measurements[i] if type(i) is int else i for i in measurements]
+
+        x = parameter.data
+        Y = np.stack([meas.data for meas in measurements])
+        sigma = None
+        if all(meas.err is not None for meas in measurements):
+            sigma = np.stack([np.broadcast_to(meas.err, meas.data.shape) for meas in measurements])
+
+        return fit_many(model, x, Y, p0=p0, sigma=sigma, bounds=bounds, names=[meas.name for meas in measurements],
+                        workers=workers, chunksize=chunksize, executor=executor)
+
+    def plot_1D(self, parameter=0, measurement=0, Fit=None, Graph=None, draw=True, Figure=None, cache=False, **kwargs):
         """
         This function is a wrapper for Analysis.Plot.Plot_1D
 
@@ -579,10 +1212,15 @@ class DataSet():
                 but a parameter object can be passed manually
 
         measurement:    See parameter
+
+        Figure:     A matplotlib Figure to draw on, see Analysis.Plot.Plot_1D
+        cache:      If True the fit is memoized, see Analysis.Fit.fit,
+                    so that drawing the same fit again does not refit
         """
 
         if Fit is not None:
             kwargs["Fit"] = Fit
+            kwargs["cache"] = cache
 
         # If Index are passed we get the data from the set
         if type(parameter) is int:
@@ -604,7 +1242,7 @@ class DataSet():
             measurement, Measurement), "Measurement must be int or Measurement instance"
 
         # We pass the arguments
-        self.Graph = P.Plot_1D(parameter, measurement, Graph)
+        self.Graph = P.Plot_1D(parameter, measurement, Graph, Figure)
 
         # We draw if needed
         if draw is True:
@@ -617,9 +1255,32 @@ class DataSet():
 
         return fig, ax, fit, err
 
-    def plots_1D(self, parameters=0, measurements=0, Fit=None, draw=True, Graph=None, colors=None, **kwargs):
+    def plot_2D(self, parameters=(0, 1), measurement=0, draw=True, Figure=None, **kwargs):
         """
-        A wrapper for plot_1D for multiple curves
+        This function is a wrapper for Analysis.Plot.Plot2D, the
+        measurement is shown as a color map of two parameters
+
+        Parameters:
+        -----------------------------------------------------
+
+        parameters: tuple(Int, Int)
+                    Index of the parameters on the x and y axes
+        measurement: Int
+        Figure:     A matplotlib Figure to draw on
+        kwargs:     Passed to Plot2D.draw (Ex. bins, Decimate, cmap)
+        """
+
+        self.Graph = P.Plot2D(self, parameters, measurement, Figure)
+
+        if draw is True:
+            return self.Graph.draw(**kwargs)
+        return self.Graph
+
+    def plots_1D(self, parameters=0, measurements=0, Fit=None, draw=True, Graph=None, colors=None, cache=False,
+                 **kwargs):
+        """
+        A wrapper for plot_1D for multiple curves, cache
+        memoizes the fits like in plot_1D
         """
 
         if type(parameters) is not list:
@@ -655,36 +1316,55 @@ class DataSet():
             # First instance
             if i == 0:
                 fig, ax, fit[i], err[i] = self.plot_1D(parameters[i], measurements[i],
-                                                       Fit[i], Graph, True, color=colors[i],**kwargs)
+                                                       Fit[i], Graph, True, cache=cache, color=colors[i],**kwargs)
             # Other instances
             else:
                 fig, ax, fit[i], err[i] = self.plot_1D(parameters[i], measurements[i],
-                                                       Fit[i], self.Graph, True, color=colors[i],**kwargs)
+                                                       Fit[i], self.Graph, True, cache=cache, color=colors[i],**kwargs)
 
         return fig, ax, fit, err
 
+    def save(self,filename,compression=None,level=None,chunk_rows=None):
+        """
+        Writes the DataSet (with names, units, labels and err)
+        to a binary file, read back with Analysis.Experiment.load
+
+        Parameters:
+        ---------------------------------------------------------
+        filename:       str
+        compression:    None, "zlib" or "lzma", columns are then
+                        compressed by chunks of chunk_rows rows
+        level:          Int, the compression level
+        """
+
+        from Analysis.Experiment import container
+
+        if chunk_rows is None:
+            chunk_rows = container.CHUNK_ROWS
+        container.save(self, filename, compression, level, chunk_rows)
+        return
+
     def add_measurements(self,measurements):
         if type(measurements) is not list:
             measurements = [measurements]
         self.measurements = self.measurements+measurements
+        # The new columns are not in the block
+        self.block = None
         return
 
     def add_parameters(self,parameters):
         if type(parameters) is not list:
             parameterss = [parameters]
         self.parameters = self.parameters+parameters
+        self.block = None
         return
 
 
 
-def readfile(filename, parameter_name_unit, measurement_names_units, measurement_labels=None, delimiter=None,Out="DataSet"):
+def _check_names(parameter_name_unit, measurement_names_units):
     """
-    Used to generate a DataSet from a file using np.genfromtxt
-
-    Parameters:
-    ---------------------------------------------------------
-    parameter_name_unit:    tuple("name","unit")
-    measurement_names_units:    list(tuple("name","unit") for number of measurements)
+    Validates the names and units given to readfile and
+    returns measurement_names_units as a list of tuples
     """
 
     assert type(parameter_name_unit) is tuple, "parameter_name_unit must be a tuple"
@@ -697,7 +1377,26 @@ def readfile(filename, parameter_name_unit, measurement_names_units, measurement
     else:
         assert type(measurement_names_units[0]) is tuple, "measurement_names_units must be a list of tuples or a single tuple"
 
-    raw_data = np.genfromtxt(filename, delimiter=delimiter).T
+    return measurement_names_units
+
+
+def _from_columns(raw_data, parameter_name_unit, measurement_names_units, measurement_labels=None, Out="DataSet"):
+    """
+    Builds the readfile output from an array of shape (columns, rows)
+    """
+
+    # As before the block storage, names beyond the columns of the file are ignored
+    n_measurements = raw_data.shape[0]-1
+    if len(measurement_names_units) < n_measurements:
+        raise ValueError("The file has %i measurement columns but %i names were given"
+                         % (n_measurements, len(measurement_names_units)))
+    measurement_names_units = measurement_names_units[:n_measurements]
+    if measurement_labels is not None:
+        measurement_labels = measurement_labels[:n_measurements]
+
+    if Out == "DataSet":
+        return DataSet.from_block(raw_data, parameter_name_unit, measurement_names_units, measurement_labels)
+
     shape = raw_data.shape[0]
 
     parameter = Parameter(raw_data[0],*parameter_name_unit)
@@ -710,9 +1409,7 @@ def readfile(filename, parameter_name_unit, measurement_names_units, measurement
     for i in range(shape):
         measurements.append(Measurement(raw_data[i+1],*measurement_names_units[i],label=measurement_labels[i]))
 
-    if Out == "DataSet":
-        res = DataSet(parameter,measurements)
-    elif Out == "Measurements":
+    if Out == "Measurements":
         res = measurements
     elif Out == "Parameter":
         res =  parameter
@@ -720,10 +1417,31 @@ def readfile(filename, parameter_name_unit, measurement_names_units, measurement
     return res
 
 
+def readfile(filename, parameter_name_unit, measurement_names_units, measurement_labels=None, delimiter=None,Out="DataSet",workers=None,cache=False):
+    """
+    Used to generate a DataSet from a file using the
+    parser Analysis.Experiment.parse_columns
 
+    Parameters:
+    ---------------------------------------------------------
+    parameter_name_unit:    tuple("name","unit")
+    measurement_names_units:    list(tuple("name","unit") for number of measurements)
+    workers:    Number of parsing threads, defaults to 1 (see parse_columns)
+    cache:      If True the parsed columns are written to a binary sidecar
+                in Analysis.Experiment.cache.CACHE_DIR and memory-mapped
+                on later calls while the file is unchanged
+    """
 
+    measurement_names_units = _check_names(parameter_name_unit, measurement_names_units)
 
+    raw_data = None
+    if cache is True:
+        raw_data = C.load(filename, delimiter)
+    if raw_data is None:
+        raw_data = parse_columns(filename, delimiter=delimiter, workers=workers)
+        if cache is True:
+            C.store(filename, raw_data, delimiter)
 
+    res = _from_columns(raw_data, parameter_name_unit, measurement_names_units, measurement_labels, Out)
 
-
-
+    return res
@@ -0,0 +1,282 @@
+import numpy as np
+from Analysis.Experiment.experiment import Parameter, Measurement, DataSet, _check_names
+
+
+class LiveDataSet(DataSet):
+    """
+    DataSet that grows by appending rows during an acquisition.
+    The columns are views of one block whose capacity doubles when
+    it is full, so appending costs O(1) amortized whatever the
+    length of the run, and the mean, variance, minimum and maximum
+    (with their indices) of every column are updated with each
+    row instead of being recomputed. Non finite values are not
+    counted in these running statistics, nor by min, max, argmin
+    and argmax over an interval.
+
+    Appending only writes into the block, the columns are pointed
+    at the rows filled so far when parameters, measurements or the
+    block are next accessed, so a row costs O(1) whatever the
+    number of columns. Every other DataSet method works on the
+    rows appended so far.
+
+    Usage:
+        live = LiveDataSet(("V","V"),[("I","A")])
+        for v in np.linspace(0,1,1001):
+            live.append([v, measure(v)])
+        live.mean(0), live.max(0,0)
+    """
+
+    def __init__(self, parameter_names_units, measurement_names_units, measurement_labels=None, capacity=1024,
+                 dtype=np.float64):
+        """
+        Parameters:
+        ---------------------------------------------------------
+        parameter_names_units:  tuple("name","unit") or a list of them
+        measurement_names_units:    list(tuple("name","unit") for number of measurements)
+        measurement_labels:     list of str
+        capacity:   Int, number of rows allocated at first
+        """
+
+        if type(parameter_names_units) is tuple:
+            parameter_names_units = [parameter_names_units]
+        measurement_names_units = _check_names(parameter_names_units[0], measurement_names_units)
+        if measurement_labels is None:
+            measurement_labels = [None for i in measurement_names_units]
+        n_parameters = len(parameter_names_units)
+
+        self._buffer = np.empty((n_parameters+len(measurement_names_units), max(int(capacity), 1)), dtype=dtype)
+        self.n = 0
+        self._published = 0
+        empty = self._buffer[:, :0]
+        parameters = [Parameter(empty[i], *parameter_names_units[i]) for i in range(n_parameters)]
+        measurements = [Measurement(empty[n_parameters+i], *measurement_names_units[i], label=measurement_labels[i])
+                        for i in range(len(measurement_names_units))]
+        super(LiveDataSet, self).__init__(parameters, measurements)
+
+        c = self._buffer.shape[0]
+        self._count = np.zeros(c, dtype=np.int64)
+        self._mean = np.zeros(c)
+        self._m2 = np.zeros(c)
+        self._min = np.full(c, np.inf)
+        self._max = np.full(c, -np.inf)
+        self._argmin = np.full(c, -1, dtype=np.int64)
+        self._argmax = np.full(c, -1, dtype=np.int64)
+        self._set_block(empty)
+        return
+
+    def _reserve(self, rows):
+        """
+        Doubles the capacity until rows more rows fit
+        """
+
+        capacity = self._buffer.shape[1]
+        if self.n+rows <= capacity:
+            return
+        while capacity < self.n+rows:
+            capacity *= 2
+        buffer = np.empty((self._buffer.shape[0], capacity), dtype=self._buffer.dtype)
+        buffer[:, :self.n] = self._buffer[:, :self.n]
+        self._buffer = buffer
+        return
+
+    def _publish(self):
+        """
+        Points every column at the rows filled so far, if rows
+        were appended since the last time
+        """
+
+        if self._published == self.n:
+            return
+        block = self._buffer[:, :self.n]
+        for i, column in enumerate(self._parameters+self._measurements):
+            column.data = block[i]
+        self._published = self.n
+        self._set_block(block)
+        return
+
+    # The columns and the block are published when accessed
+    @property
+    def parameters(self):
+        self._publish()
+        return self._parameters
+
+    @parameters.setter
+    def parameters(self, parameters):
+        self._parameters = parameters
+        return
+
+    @property
+    def measurements(self):
+        self._publish()
+        return self._measurements
+
+    @measurements.setter
+    def measurements(self, measurements):
+        self._measurements = measurements
+        return
+
+    @property
+    def block(self):
+        self._publish()
+        return self._block
+
+    @block.setter
+    def block(self, block):
+        self._block = block
+        return
+
+    def append(self, row):
+        """
+        Appends one row, the parameters then the measurements
+        """
+
+        row = np.asarray(row, dtype=self._buffer.dtype)
+        assert row.shape == (self._buffer.shape[0],), "A row has one value per parameter and measurement"
+        self._reserve(1)
+        self._buffer[:, self.n] = row
+
+        # Welford update of the columns with a finite value
+        valid = np.isfinite(row)
+        values = np.where(valid, row, 0)
+        self._count += valid
+        delta = np.where(valid, values-self._mean, 0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self._mean += np.where(valid, delta/self._count, 0)
+        self._m2 += delta*np.where(valid, values-self._mean, 0)
+        lower = valid & (row < self._min)
+        higher = valid & (row > self._max)
+        self._min[lower], self._argmin[lower] = row[lower], self.n
+        self._max[higher], self._argmax[higher] = row[higher], self.n
+
+        self.n += 1
+        return
+
+    def extend(self, rows):
+        """
+        Appends a block of rows, np.ndarray of shape (rows, columns)
+        """
+
+        rows = np.asarray(rows, dtype=self._buffer.dtype)
+        if rows.ndim == 1:
+            rows = rows[None, :]
+        assert rows.ndim == 2 and rows.shape[1] == self._buffer.shape[0], \
+            "A row has one value per parameter and measurement"
+        k = rows.shape[0]
+        if k == 0:
+            return
+        self._reserve(k)
+        block = rows.T
+        self._buffer[:, self.n:self.n+k] = block
+
+        # Statistics of the block, merged with the pairwise update of Chan et al.
+        valid = np.isfinite(block)
+        counts = valid.sum(axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean = np.where(valid, block, 0).sum(axis=1)/counts
+            deviation = np.where(valid, block-mean[:, None], 0)
+            m2 = (deviation*deviation).sum(axis=1)
+            total = self._count+counts
+            delta = np.where(counts > 0, mean-self._mean, 0)
+            self._mean += np.where(counts > 0, delta*counts/total, 0)
+            self._m2 += np.where(counts > 0, m2+delta*delta*self._count*counts/total, 0)
+        self._count = total
+
+        lowest = np.argmin(np.where(valid, block, np.inf), axis=1)
+        highest = np.argmax(np.where(valid, block, -np.inf), axis=1)
+        columns = np.arange(block.shape[0])
+        low, high = block[columns, lowest], block[columns, highest]
+        lower = (counts > 0) & (low < self._min)
+        higher = (counts > 0) & (high > self._max)
+        self._min[lower], self._argmin[lower] = low[lower], self.n+lowest[lower]
+        self._max[higher], self._argmax[higher] = high[higher], self.n+highest[higher]
+
+        self.n += k
+        return
+
+    def __len__(self):
+        return self.n
+
+    def _column(self, measurement):
+        return len(self._parameters)+measurement
+
+    def mean(self, measurement=0):
+        """
+        Running mean of a measurement
+        """
+
+        i = self._column(measurement)
+        return self._mean[i] if self._count[i] > 0 else np.nan
+
+    def var(self, measurement=0, ddof=1):
+        """
+        Running variance of a measurement
+        """
+
+        i = self._column(measurement)
+        return self._m2[i]/(self._count[i]-ddof) if self._count[i] > ddof else np.nan
+
+    def std(self, measurement=0, ddof=1):
+        """
+        Running standard deviation of a measurement
+        """
+
+        return np.sqrt(self.var(measurement, ddof))
+
+    def count(self, measurement=0):
+        """
+        Number of finite values of a measurement
+        """
+
+        return int(self._count[self._column(measurement)])
+
+    def _running(self, values, parameter, measurement, start, stop, method):
+        if start is None and stop is None:
+            i = self._column(measurement)
+            return values[i] if self._count[i] > 0 else None
+
+        # Within an interval, skip the non finite values like the
+        # running statistics (DataSet.min would return nan)
+        param, meas = self.parameters[parameter], self.measurements[measurement]
+        Slice = self._interval(param, meas, start, stop)
+        data = meas.data[Slice]
+        finite = np.isfinite(data)
+        if not np.any(finite):
+            return None
+        if method in ("min", "argmin"):
+            i = int(np.argmin(np.where(finite, data, np.inf)))
+        else:
+            i = int(np.argmax(np.where(finite, data, -np.inf)))
+        if method.startswith("arg"):
+            return Slice.start+i
+        return data[i]
+
+    def min(self, parameter=0, measurement=0, start=None, stop=None):
+        """
+        Minimum of a measurement, the running value in O(1) over the
+        whole run, else within an interval like DataSet.min
+        """
+        return self._running(self._min, parameter, measurement, start, stop, "min")
+
+    def argmin(self, parameter=0, measurement=0, start=None, stop=None):
+        """
+        Index of the minimum of a measurement, see min
+        """
+        return self._running(self._argmin, parameter, measurement, start, stop, "argmin")
+
+    def max(self, parameter=0, measurement=0, start=None, stop=None):
+        """
+        Maximum of a measurement, see min
+        """
+        return self._running(self._max, parameter, measurement, start, stop, "max")
+
+    def argmax(self, parameter=0, measurement=0, start=None, stop=None):
+        """
+        Index of the maximum of a measurement, see min
+        """
+        return self._running(self._argmax, parameter, measurement, start, stop, "argmax")
+
+    def add_measurements(self, measurements):
+        raise TypeError("Columns can not be added to a LiveDataSet, create it with every measurement")
+
+    def add_parameters(self, parameters):
+        raise TypeError("Columns can not be added to a LiveDataSet, create it with every parameter")
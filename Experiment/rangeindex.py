@@ -0,0 +1,131 @@
+import numpy as np
+
+
+class RangeIndex():
+    """
+    Block-decomposed sparse table answering min/max/argmin/argmax
+    over any [start, stop) of a 1D array.
+
+    The array is cut in blocks of block_size values. The argmin and
+    argmax of every block are stored in a sparse table so that a run
+    of whole blocks is answered with two lookups, the partial blocks
+    at both ends are scanned directly. A query therefore costs
+    O(block_size) and the index uses O(n/block_size*log(n)) memory.
+    Ties are resolved to the first index like np.argmin.
+    """
+
+    def __init__(self, data, block_size=64):
+        """
+        Parameters:
+        -----------------------------
+        data:       np.ndarray (1d)
+                    The values, an interval containing nan
+                    gives nan (and its index) like np.min
+        block_size: Int
+                    Number of values per block
+        """
+
+        data = np.asarray(data)
+        assert data.ndim == 1, "data must be a 1D array"
+        self.data = data
+        self._nan = np.flatnonzero(np.isnan(data))
+        self.block_size = block_size
+        self.n = data.shape[0]
+
+        n_blocks = -(-self.n//block_size)
+        padded = np.empty(n_blocks*block_size, dtype=np.float64)
+        padded[:self.n] = data
+
+        padded[self.n:] = np.inf
+        blocks = padded.reshape(n_blocks, block_size)
+        argmin = np.argmin(blocks, axis=1)+np.arange(n_blocks)*block_size
+        padded[self.n:] = -np.inf
+        argmax = np.argmax(blocks, axis=1)+np.arange(n_blocks)*block_size
+
+        self._argmin = self._sparse_table(argmin, np.less_equal, n_blocks)
+        self._argmax = self._sparse_table(argmax, np.greater_equal, n_blocks)
+
+        return
+
+    def _sparse_table(self, level, keep_left, n_blocks):
+        """
+        Level k holds for every block i the index of the
+        extremum of blocks i to i+2**k-1, for every 2**k
+        up to n_blocks
+        """
+
+        table = [level]
+        width = 1
+        while 2*width <= n_blocks:
+            left = level[:-width]
+            right = level[width:]
+            level = np.where(keep_left(self.data[left], self.data[right]), left, right)
+            table.append(level)
+            width *= 2
+        return table
+
+    def _query(self, start, stop, table, reduce, better):
+        if start is None:
+            start = 0
+        if stop is None:
+            stop = self.n
+        start, stop, step = slice(start, stop).indices(self.n)
+        if start >= stop:
+            raise ValueError("Empty interval [%s, %s)" % (start, stop))
+
+        # Like np.argmin, the first nan of the interval wins
+        if self._nan.shape[0] > 0:
+            first_nan = np.searchsorted(self._nan, start)
+            if first_nan < self._nan.shape[0] and self._nan[first_nan] < stop:
+                return self._nan[first_nan]
+
+        B = self.block_size
+        first_block = -(-start//B)
+        last_block = stop//B
+        if first_block >= last_block:
+            return start+reduce(self.data[start:stop])
+
+        candidates = []
+        if start < first_block*B:
+            candidates.append(start+reduce(self.data[start:first_block*B]))
+
+        k = int(last_block-first_block).bit_length()-1
+        left = table[k][first_block]
+        right = table[k][last_block-2**k]
+        candidates.append(left)
+        if right != left:
+            candidates.append(right)
+
+        if last_block*B < stop:
+            candidates.append(last_block*B+reduce(self.data[last_block*B:stop]))
+
+        # Candidates are in increasing index order so ties keep the first one
+        res = candidates[0]
+        for index in candidates[1:]:
+            if better(self.data[index], self.data[res]):
+                res = index
+        return res
+
+    def argmin(self, start=None, stop=None):
+        """
+        Returns the index of the minimum of data[start:stop]
+        """
+        return self._query(start, stop, self._argmin, np.argmin, np.less)
+
+    def argmax(self, start=None, stop=None):
+        """
+        Returns the index of the maximum of data[start:stop]
+        """
+        return self._query(start, stop, self._argmax, np.argmax, np.greater)
+
+    def min(self, start=None, stop=None):
+        """
+        Returns the minimum of data[start:stop]
+        """
+        return self.data[self.argmin(start, stop)]
+
+    def max(self, start=None, stop=None):
+        """
+        Returns the maximum of data[start:stop]
+        """
+        return self.data[self.argmax(start, stop)]
@@ -0,0 +1,191 @@
+import numpy as np
+from Analysis.Experiment.parser import _parse_block
+from Analysis.Experiment.experiment import _check_names, _from_columns
+
+
+def _row_blocks(filename, delimiter=None, blocksize=1 << 24):
+    """
+    Reads filename blocksize bytes at a time and yields
+    the parsed complete lines as arrays of shape (rows, columns)
+    """
+
+    with open(filename, "rb") as f:
+        remainder = b""
+        while True:
+            block = f.read(blocksize)
+            if not block:
+                break
+            block = remainder+block
+            end = block.rfind(b"\n")+1
+            remainder = block[end:]
+            if end != 0:
+                rows = _parse_block(block[:end], delimiter)
+                if rows.shape[0] != 0:
+                    yield rows
+        if remainder.strip():
+            yield _parse_block(remainder, delimiter)
+    return
+
+
+def readfile_chunks(filename, parameter_name_unit, measurement_names_units, measurement_labels=None,
+                    delimiter=None, chunk_rows=100000, blocksize=1 << 24):
+    """
+    Streaming version of readfile, yields DataSets of chunk_rows
+    rows (the last one can be shorter) so that only one chunk
+    of the file is in memory at a time
+
+    Parameters:
+    ---------------------------------------------------------
+    parameter_name_unit:    tuple("name","unit")
+    measurement_names_units:    list(tuple("name","unit") for number of measurements)
+    chunk_rows:     Int
+                    Number of rows in each DataSet
+    blocksize:      Int
+                    Number of bytes read from the file at a time
+
+    Usage:
+        for chunk in readfile_chunks("sweep.txt",("V","V"),[("I","A")]):
+            ...
+    """
+
+    measurement_names_units = _check_names(parameter_name_unit, measurement_names_units)
+    assert chunk_rows > 0, "chunk_rows must be positive"
+
+    pending = []
+    n_pending = 0
+    for rows in _row_blocks(filename, delimiter, blocksize):
+        pending.append(rows)
+        n_pending += rows.shape[0]
+        if n_pending < chunk_rows:
+            continue
+
+        rows = np.concatenate(pending) if len(pending) > 1 else pending[0]
+        n_full = (rows.shape[0]//chunk_rows)*chunk_rows
+        for start in range(0, n_full, chunk_rows):
+            columns = np.ascontiguousarray(rows[start:start+chunk_rows].T)
+            yield _from_columns(columns, parameter_name_unit, measurement_names_units, measurement_labels)
+        pending = [rows[n_full:]]
+        n_pending = rows.shape[0]-n_full
+
+    if n_pending != 0:
+        rows = np.concatenate(pending)
+        columns = np.ascontiguousarray(rows.T)
+        yield _from_columns(columns, parameter_name_unit, measurement_names_units, measurement_labels)
+
+    return
+
+
+def _columns(chunks, measurement):
+    """
+    Yields the data of a measurement for every DataSet
+    of chunks, measurement=None gives the parameter
+    """
+
+    for chunk in chunks:
+        if measurement is None:
+            yield chunk.parameters[0].data
+        else:
+            yield chunk.measurements[measurement].data
+    return
+
+
+def _stream_extremum(chunks, measurement, reduce, compare):
+    best, best_index = None, None
+    offset = 0
+    for data in _columns(chunks, measurement):
+        if data.shape[0] != 0:
+            index = reduce(data)
+            if best is None or compare(data[index], best):
+                best, best_index = data[index], index+offset
+        offset += data.shape[0]
+    return best, best_index
+
+
+def stream_min(chunks, measurement=0):
+    """
+    Returns the minimum of a measurement over every
+    DataSet yielded by chunks (e.g. readfile_chunks),
+    measurement=None uses the parameter
+    """
+
+    return _stream_extremum(chunks, measurement, np.argmin, np.less)[0]
+
+
+def stream_argmin(chunks, measurement=0):
+    """
+    Returns the index of the minimum of a measurement
+    counted from the first row of the first chunk
+    """
+
+    return _stream_extremum(chunks, measurement, np.argmin, np.less)[1]
+
+
+def stream_max(chunks, measurement=0):
+    """
+    Returns the maximum of a measurement over every
+    DataSet yielded by chunks (e.g. readfile_chunks),
+    measurement=None uses the parameter
+    """
+
+    return _stream_extremum(chunks, measurement, np.argmax, np.greater)[0]
+
+
+def stream_argmax(chunks, measurement=0):
+    """
+    Returns the index of the maximum of a measurement
+    counted from the first row of the first chunk
+    """
+
+    return _stream_extremum(chunks, measurement, np.argmax, np.greater)[1]
+
+
+def stream_mean(chunks, measurement=0):
+    """
+    Returns the mean of a measurement over every
+    DataSet yielded by chunks
+    """
+
+    total, count = 0., 0
+    for data in _columns(chunks, measurement):
+        total += data.sum()
+        count += data.shape[0]
+
+    if count == 0:
+        return np.nan
+    return total/count
+
+
+def stream_histogram(chunks, measurement=0, bins=10, range=None):
+    """
+    Same as np.histogram but accumulated over every DataSet
+    yielded by chunks. Since the data is only seen once the
+    edges must be known in advance: bins is either an array
+    of edges or a number of bins over range=(min, max)
+    """
+
+    if np.ndim(bins) == 0:
+        assert range is not None, "range must be given when bins is a number of bins"
+        edges = np.histogram_bin_edges([], bins, range)
+    else:
+        edges = np.asarray(bins, dtype=np.float64)
+
+    hist = np.zeros(edges.shape[0]-1, dtype=np.int64)
+    for data in _columns(chunks, measurement):
+        hist += np.histogram(data, edges)[0]
+
+    return hist, edges
+
+
+def stream_bin(chunks, parameter=0, bins=None, range=None, measurements=None, empty=False):
+    """
+    Same as DataSet.bin but accumulated over every DataSet yielded
+    by chunks, bins is an array of edges or the width of the bins
+    over range=(min, max) since the data is only seen once
+    """
+
+    from Analysis.Experiment.binning import BinAccumulator, bin_edges
+
+    acc = BinAccumulator(bin_edges(bins, range))
+    for chunk in chunks:
+        acc.add(chunk, parameter, measurements)
+    return acc.dataset(empty)
@@ -0,0 +1,122 @@
+import numpy as np
+
+
+# Monte Carlo draws are made on blocks of at most this many values
+MC_CHUNK_SIZE = 1 << 22
+
+
+DERIVATIVES = {
+    np.exp: np.exp,
+    np.log: lambda x: 1/x,
+    np.log10: lambda x: 1/(x*np.log(10)),
+    np.log2: lambda x: 1/(x*np.log(2)),
+    np.sqrt: lambda x: 0.5/np.sqrt(x),
+    np.square: lambda x: 2*x,
+    np.reciprocal: lambda x: -1/x**2,
+    np.sin: np.cos,
+    np.cos: lambda x: -np.sin(x),
+    np.tan: lambda x: 1/np.cos(x)**2,
+    np.arcsin: lambda x: 1/np.sqrt(1-x**2),
+    np.arccos: lambda x: -1/np.sqrt(1-x**2),
+    np.arctan: lambda x: 1/(1+x**2),
+    np.sinh: np.cosh,
+    np.cosh: np.sinh,
+    np.tanh: lambda x: 1/np.cosh(x)**2,
+    np.abs: np.sign,
+}
+
+
+def register_derivative(function, derivative):
+    """
+    Registers the derivative of an elementwise function so that
+    propagate uses it instead of finite differences
+
+    Parameters:
+    --------------------------------
+    function:   f(x,*args)
+    derivative: df/dx(x,*args)
+    """
+
+    assert callable(function) and callable(derivative), "function and derivative must be callable"
+    DERIVATIVES[function] = derivative
+    return
+
+
+def derivative(function, x, *args, dfdx=None):
+    """
+    Derivative of the elementwise function at every point of x, from
+    dfdx or the registered derivative if any, else central differences
+    computed with two evaluations over the whole array
+    """
+
+    if dfdx is None:
+        dfdx = DERIVATIVES.get(function)
+        if dfdx is not None and len(args) > 0:
+            dfdx = None
+    if dfdx is not None:
+        return dfdx(x, *args)
+
+    x = np.asarray(x, dtype=np.float64)
+    # Optimal step of a central difference for a smooth function
+    h = np.cbrt(np.finfo(np.float64).eps)*np.maximum(np.abs(x), 1)
+    up, down = x+h, x-h
+    return (function(up, *args)-function(down, *args))/(up-down)
+
+
+def _monte_carlo(function, x, err, *args, samples=1000, seed=None):
+    """
+    Standard deviation of function(x+err*N(0,1)) for every point,
+    drawn in chunks of at most MC_CHUNK_SIZE values
+    """
+
+    rng = np.random.default_rng(seed)
+    x = np.asarray(x, dtype=np.float64)
+    err = np.broadcast_to(np.asarray(err, dtype=np.float64), x.shape)
+    out = np.empty(x.shape)
+    block = max(MC_CHUNK_SIZE//samples, 1)
+    for start in range(0, x.shape[0], block):
+        stop = min(start+block, x.shape[0])
+        draws = x[start:stop]+err[start:stop]*rng.standard_normal((samples, stop-start))
+        out[start:stop] = np.std(function(draws, *args), axis=0, ddof=1)
+    return out
+
+
+def propagate(function, x, err, *args, method="linear", dfdx=None, samples=1000, seed=None):
+    """
+    Uncertainty of function(x,*args) for uncorrelated uncertainties
+    err on x
+
+    Parameters:
+    ---------------------------------------------------------
+    function:   callable
+                An elementwise function f(x,*args)
+    method:     str
+                "linear" propagates to first order, |df/dx|*err,
+                "montecarlo" takes the standard deviation of f over
+                samples normal draws of every point, for strongly
+                nonlinear functions
+    dfdx:       callable
+                The derivative df/dx(x,*args), see derivative
+    samples:    Int
+                Number of Monte Carlo draws per point
+    seed:       Seed of the Monte Carlo generator
+    """
+
+    assert method in ("linear", "montecarlo"), "method must be 'linear' or 'montecarlo'"
+    if err is None:
+        return None
+    if method == "montecarlo":
+        return _monte_carlo(function, x, err, *args, samples=samples, seed=seed)
+    return np.abs(derivative(function, x, *args, dfdx=dfdx))*err
+
+
+def combine(*terms):
+    """
+    Quadrature sum of the (partial derivative * uncertainty)
+    terms, None terms are uncertainties that are not known
+    """
+
+    terms = [term for term in terms if term is not None]
+    if len(terms) == 0:
+        return None
+    return np.sqrt(sum([np.square(term) for term in terms]))
@@ -1 +1,4 @@
 from Analysis.Fit.fit import *
+from Analysis.Fit.batch import *
+from Analysis.Fit.cache import set_cache, cache_stats, clear_cache
+from Analysis.Fit.parallel import fit_many
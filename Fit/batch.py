@@ -0,0 +1,142 @@
+import numpy as np
+import Analysis.Functions as F
+
+
+def _evaluate(function, x, P):
+    """
+    Evaluates function for every row of the parameters P (m,p),
+    each parameter is passed as a (m,1) column so that it
+    broadcasts against x and gives an array of shape (m,n)
+    """
+    return function(x, *[np.array(P[:, j:j+1]) for j in range(P.shape[1])])
+
+
+def _jacobian(function, x, P, f0):
+    """
+    Jacobian of shape (m,n,p), the registered analytic one if
+    any, else forward differences with one vectorized
+    evaluation per parameter
+    """
+
+    m, p = P.shape
+    jacobian = F.jacobians.get_jacobian(function, p)
+    if jacobian is not None:
+        J = jacobian(x, *[np.array(P[:, j:j+1]) for j in range(p)])
+        return np.broadcast_to(J, f0.shape+(p,))
+
+    J = np.empty(f0.shape+(p,))
+    for j in range(p):
+        h = np.sqrt(np.finfo(np.float64).eps)*np.maximum(np.abs(P[:, j]), 1)
+        Ph = P.copy()
+        Ph[:, j] += h
+        J[..., j] = (_evaluate(function, x, Ph)-f0)/h[:, None]
+    return J
+
+
+def batch_fit(function, x, Y, p0=None, sigma=None, maxiter=200, ftol=1.49012e-8, xtol=1.49012e-8):
+    """
+    Fits the same model to many curves at once with a
+    vectorized Levenberg-Marquardt, every step is computed
+    for all the curves with numpy broadcasting.
+
+    Parameters:
+    ---------------------------------------------------------
+    function:   callable
+                The model, f(x,*params), it must broadcast
+                parameters of shape (m,1) against x
+                (all the models of Analysis.Functions do)
+    x:          np.ndarray (1d or 2d)
+                The x-axis values, shared (n) or per curve (m,n)
+    Y:          np.ndarray (2d)
+                The curves, shape (m,n), nan values are ignored
+    p0:         np.ndarray (1d or 2d)
+                Initial parameters, shared (p) or per curve (m,p).
+                If None they are estimated for every curve with
+                the estimator registered in Analysis.Functions
+    sigma:      np.ndarray (1d or 2d)
+                The uncertainty on Y, same meaning as in curve_fit
+
+    Returns:
+    ---------------------------------------------------------
+    params:     np.ndarray (m,p)
+    err:        np.ndarray (m,p)
+                Standard errors, scaled by the reduced chi square
+                like curve_fit does by default
+    converged:  np.ndarray (m) of bool
+    """
+
+    Y = np.atleast_2d(np.asarray(Y, dtype=np.float64))
+    x = np.asarray(x, dtype=np.float64)
+    m, n = Y.shape
+    if p0 is None:
+        p0 = np.array([F.guesses.guess(function, x[i] if x.ndim == 2 else x, Y[i]) for i in range(m)])
+    P = np.array(np.broadcast_to(np.asarray(p0, dtype=np.float64), (m, np.shape(p0)[-1])))
+    p = P.shape[1]
+
+    valid = np.isfinite(Y)
+    if sigma is None:
+        weight = valid.astype(np.float64)
+    else:
+        weight = np.where(valid, 1/np.broadcast_to(sigma, Y.shape), 0)
+    Y = np.where(valid, Y, 0)
+
+    def rows(array, index):
+        return array[index] if np.ndim(array) == 2 else array
+
+    def residuals(index, P):
+        return (Y[index]-_evaluate(function, rows(x, index), P))*weight[index]
+
+    r = residuals(slice(None), P)
+    cost = np.einsum("ij,ij->i", r, r)
+    lam = np.full(m, 1e-3)
+    converged = np.zeros(m, dtype=bool)
+    active = np.arange(m)
+
+    for iteration in range(maxiter):
+        if active.shape[0] == 0:
+            break
+        xa = rows(x, active)
+        Pa = P[active]
+        f0 = _evaluate(function, xa, Pa)
+        J = _jacobian(function, xa, Pa, f0)*weight[active][:, :, None]
+        ra = (Y[active]-f0)*weight[active]
+
+        Jt = J.transpose(0, 2, 1)
+        A = Jt@J
+        g = (Jt@ra[:, :, None])[..., 0]
+        diag = np.einsum("mii->mi", A)
+        diag = np.maximum(diag, 1e-12*diag.max(axis=1, keepdims=True)+1e-300)
+
+        step = np.linalg.solve(A+lam[active, None, None]*diag[:, :, None]*np.eye(p), g[:, :, None])[..., 0]
+        P_new = Pa+step
+        r_new = residuals(active, P_new)
+        cost_new = np.einsum("ij,ij->i", r_new, r_new)
+
+        better = np.isfinite(cost_new) & (cost_new <= cost[active])
+        accepted = active[better]
+        small_step = np.all(np.abs(step) <= xtol*(np.abs(Pa)+xtol), axis=1)
+        small_gain = (cost[active]-cost_new) <= ftol*cost[active]
+
+        P[accepted] = P_new[better]
+        cost[accepted] = cost_new[better]
+        lam[accepted] = np.maximum(lam[accepted]/10, 1e-15)
+        lam[active[~better]] *= 10
+
+        done = (better & (small_gain | small_step)) | (~better & small_step) | (lam[active] > 1e15)
+        converged[active[done & (lam[active] <= 1e15)]] = True
+        active = active[~done]
+
+    # Covariance at the solution, scaled like curve_fit(absolute_sigma=False)
+    f0 = _evaluate(function, x, P)
+    J = _jacobian(function, x, P, f0)*weight[:, :, None]
+    A = J.transpose(0, 2, 1)@J
+    dof = valid.sum(axis=1)-p
+    cov = np.full((m, p, p), np.inf)
+    invertible = np.linalg.matrix_rank(A) == p
+    if invertible.any():
+        cov[invertible] = np.linalg.inv(A[invertible])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cov *= np.where(dof > 0, cost/dof, np.inf)[:, None, None]
+    err = np.sqrt(np.abs(np.einsum("mii->mi", cov)))
+
+    return P, err, converged
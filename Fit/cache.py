@@ -0,0 +1,286 @@
+import os
+import types
+import hashlib
+import threading
+from collections import OrderedDict
+import numpy as np
+
+
+# Number of results kept in memory, and the optional on-disk tier
+MEMORY_SIZE = 1024
+DISK_CACHE = False
+CACHE_DIR = os.path.join(os.environ.get("ANALYSIS_CACHE_DIR",
+                                        os.path.join(os.path.expanduser("~"), ".cache", "Analysis")), "fits")
+CACHE_MAX_SIZE = 64*1024**2
+
+_memory = OrderedDict()
+_stats = {"hits": 0, "disk_hits": 0, "misses": 0}
+# Guards _memory and _stats, fits can run on a thread pool
+_lock = threading.Lock()
+
+
+def set_cache(size=None, disk=None, directory=None, max_size=None):
+    """
+    Changes the fit cache settings
+
+    Parameters:
+    ---------------------------------------------------------
+    size:       int
+                The number of fit results kept in memory,
+                0 disables the memory tier
+    disk:       bool
+                Whether results are also written to directory
+                and looked up there on a memory miss
+    directory:  str
+                The directory of the on-disk tier
+    max_size:   int
+                The maximum size of the on-disk tier in bytes,
+                least recently used results are evicted past it
+    """
+
+    global MEMORY_SIZE, DISK_CACHE, CACHE_DIR, CACHE_MAX_SIZE
+    if size is not None:
+        MEMORY_SIZE = int(size)
+    if disk is not None:
+        DISK_CACHE = bool(disk)
+    if directory is not None:
+        CACHE_DIR = directory
+    if max_size is not None:
+        CACHE_MAX_SIZE = int(max_size)
+    with _lock:
+        while len(_memory) > MEMORY_SIZE:
+            _memory.popitem(last=False)
+    if DISK_CACHE:
+        _evict()
+    return
+
+
+def cache_stats():
+    """
+    Returns the number of memory hits, disk hits and
+    misses of the fit cache and its current size
+    """
+
+    with _lock:
+        stats = dict(_stats)
+        stats["size"] = len(_memory)
+    return stats
+
+
+def clear_cache(disk=False):
+    """
+    Empties the memory tier of the fit cache, and the
+    on-disk tier too if disk is True
+    """
+
+    with _lock:
+        _memory.clear()
+        for k in _stats:
+            _stats[k] = 0
+    if disk:
+        _evict(0)
+    return
+
+
+class Uncacheable(Exception):
+    """
+    Raised by _model_key when a model depends on a value that
+    can not be hashed by content (Ex. an object or an open file)
+    """
+
+
+# Values hashed by their repr, containers are walked recursively
+_PLAIN = (int, float, complex, str, bytes, bool, type(None), np.number)
+
+
+def _value_key(value, seen):
+    if isinstance(value, _PLAIN):
+        return value
+    if isinstance(value, np.ndarray):
+        h = hashlib.blake2b(digest_size=20)
+        _update(h, value)
+        return h.hexdigest()
+    if isinstance(value, (list, tuple)):
+        return (type(value).__name__, [_value_key(item, seen) for item in value])
+    if isinstance(value, dict):
+        return ("dict", [(_value_key(k, seen), _value_key(v, seen)) for k, v in value.items()])
+    if isinstance(value, types.ModuleType):
+        return ("module", value.__name__)
+    if isinstance(value, (types.FunctionType, types.CodeType)):
+        return _code_key(value, seen)
+    if isinstance(value, (types.BuiltinFunctionType, np.ufunc)):
+        return ("builtin", getattr(value, "__module__", None), value.__name__)
+    raise Uncacheable("Cannot hash a %s by content" % type(value).__name__)
+
+
+def _code_key(function, seen):
+    """
+    Content of a function: its code (nested code objects included,
+    without their memory addresses), defaults, closure and the
+    globals it refers to, walked recursively
+    """
+
+    if isinstance(function, types.CodeType):
+        code, function = function, None
+    else:
+        if id(function) in seen:
+            return ("recursive", function.__qualname__)
+        seen.add(id(function))
+        code = function.__code__
+
+    parts = [code.co_code, code.co_names, [_value_key(const, seen) for const in code.co_consts]]
+    if function is not None:
+        parts += [getattr(function, "__module__", None), function.__qualname__,
+                  _value_key(function.__defaults__, seen),
+                  [_value_key(cell.cell_contents, seen) for cell in function.__closure__ or ()]]
+        names = [name for name in code.co_names if name in function.__globals__]
+        parts.append([(name, _value_key(function.__globals__[name], seen)) for name in names])
+    return parts
+
+
+def _model_key(function):
+    """
+    Identifies a model by its name and content rather than its id
+    so that keys stay valid across sessions and redefinitions
+    of the same function (Ex. re-running a notebook cell), and
+    change when a value it depends on changes. Raises
+    Uncacheable if one of those values can not be hashed.
+    """
+
+    if isinstance(function, types.FunctionType):
+        return repr(_code_key(function, set())).encode()
+    return repr(_value_key(function, set())).encode()
+
+
+def _update(h, array):
+    if array is None:
+        h.update(b"None")
+        return
+    array = np.ascontiguousarray(array)
+    h.update(("%s%r" % (array.dtype.str, array.shape)).encode())
+    h.update(memoryview(array).cast("B"))
+    return
+
+
+def key(function, x, y, p0, sigma, bounds, jac):
+    """
+    Hash of everything that determines the result of a fit,
+    None if the model can not be hashed (see _model_key)
+    """
+
+    h = hashlib.blake2b(digest_size=20)
+    try:
+        h.update(_model_key(function))
+        h.update(b"None" if jac is None else _model_key(jac))
+    except (Uncacheable, RecursionError):
+        return None
+    for array in (x, y, sigma, p0):
+        _update(h, None if array is None else np.asarray(array, dtype=np.float64))
+    for bound in bounds:
+        _update(h, np.asarray(bound, dtype=np.float64))
+    return h.hexdigest()
+
+
+def _path(key):
+    return os.path.join(CACHE_DIR, key+".npz")
+
+
+def lookup(key):
+    """
+    Returns a copy of the cached (params, err) or None
+    """
+
+    with _lock:
+        result = _memory.get(key)
+        if result is not None:
+            _memory.move_to_end(key)
+            _stats["hits"] += 1
+    if result is not None:
+        return result[0].copy(), result[1].copy()
+
+    if DISK_CACHE:
+        path = _path(key)
+        try:
+            with np.load(path) as f:
+                result = f["params"], f["err"]
+            # The file's mtime is the last access used for eviction
+            os.utime(path)
+        except (OSError, ValueError, KeyError):
+            result = None
+        if result is not None:
+            with _lock:
+                _stats["disk_hits"] += 1
+            _remember(key, result)
+            return result[0].copy(), result[1].copy()
+
+    with _lock:
+        _stats["misses"] += 1
+    return None
+
+
+def _remember(key, result):
+    if MEMORY_SIZE <= 0:
+        return
+    with _lock:
+        _memory[key] = result
+        _memory.move_to_end(key)
+        while len(_memory) > MEMORY_SIZE:
+            _memory.popitem(last=False)
+    return
+
+
+def store(key, params, err):
+    """
+    Stores the result of a fit in memory and on disk if enabled
+    """
+
+    result = (np.array(params, dtype=np.float64), np.array(err, dtype=np.float64))
+    _remember(key, result)
+
+    if DISK_CACHE:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        path = _path(key)
+        # Write then rename so concurrent readers never see partial files
+        tmp = "%s.%i.tmp" % (path, os.getpid())
+        with open(tmp, "wb") as f:
+            np.savez(f, params=result[0], err=result[1])
+        os.replace(tmp, path)
+        _evict()
+    return
+
+
+def _evict(max_size=None):
+    """
+    Removes the least recently used results from the on-disk
+    tier until it is smaller than max_size (CACHE_MAX_SIZE by default)
+    """
+
+    if max_size is None:
+        max_size = CACHE_MAX_SIZE
+    if not os.path.isdir(CACHE_DIR):
+        return
+
+    entries = []
+    total = 0
+    for name in os.listdir(CACHE_DIR):
+        if not name.endswith(".npz"):
+            continue
+        path = os.path.join(CACHE_DIR, name)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+        total += stat.st_size
+
+    entries.sort()
+    for last_access, size, path in entries:
+        if total <= max_size:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        total -= size
+
+    return
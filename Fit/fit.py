@@ -1,23 +1,210 @@
+import inspect
 import numpy as np
-from scipy.optimize import curve_fit as CF
 import Analysis.Functions as F
+from Analysis.Fit import cache as C
 
 
-def fit(function,x,y,p0,sigma=None,bounds=(-np.inf,np.inf)):
-    fit, err = CF(function,x,y,p0=p0,sigma=sigma,bounds=bounds)
+def _lstsq(A, y, sigma=None):
+    """
+    Weighted linear least squares of y = A@params, the
+    covariance is scaled by the reduced chi square like
+    curve_fit does with absolute_sigma=False
+    """
+
+    if sigma is not None:
+        A = A/sigma[:, None]
+        y = y/sigma
+    params, rss, rank, sv = np.linalg.lstsq(A, y, rcond=None)
+
+    n, p = A.shape
+    if rank < p or n <= p:
+        cov = np.full((p, p), np.inf)
+    else:
+        res = y-A@params
+        cov = np.linalg.inv(A.T@A)*(res@res)/(n-p)
+
+    return params, cov
+
+
+def _line(x, y, sigma=None):
+    """
+    Weighted least squares line y = a*x+b computed around the
+    weighted mean of x, which keeps it accurate for large
+    offsets (Ex. frequencies in Hz) without an SVD
+    """
+
+    n = x.shape[0]
+    w = np.ones_like(x) if sigma is None else 1/sigma**2
+    sw = w.sum()
+    xm = (w@x)/sw
+    xc = x-xm
+    sxx = w@(xc*xc)
+    a = (w@(xc*y))/sxx
+    ym = (w@y)/sw
+    b = ym-a*xm
+
+    if n <= 2 or sxx == 0:
+        return np.array([a, b]), np.full((2, 2), np.inf)
+    res = y-a*x-b
+    scale = (w@(res*res))/(n-2)
+    cov = np.array([[1/sxx, -xm/sxx], [-xm/sxx, 1/sw+xm*xm/sxx]])*scale
+
+    return np.array([a, b]), cov
+
+
+def _in_bounds(params, bounds):
+    lower, upper = bounds
+    return bool(np.all(params >= lower) and np.all(params <= upper))
+
+
+def _linear_model_fit(function, x, y, p0=None, sigma=None):
+    """
+    Direct solution for the models of Analysis.Functions
+    that are linear in their parameters, returns None
+    for any other model.
+
+    The model of F.quadratic, a*(x**2+b)+c, is degenerate: the
+    data only determine a and a*b+c. b is held at p0[1] (0
+    without p0), c is solved for that b and the error of b is
+    inf, curve_fit would not constrain it either.
+
+    Like curve_fit, non finite x, y or sigma raise a ValueError.
+    A p0 with fewer values than the model has parameters fits only
+    the first ones, which curve_fit does, so None is returned.
+    """
+
+    if function is F.linear:
+        n_params = 2
+    elif function is F.quadratic:
+        n_params = 3
+    else:
+        return None
+    if p0 is not None and np.size(p0) != n_params:
+        return None
+    for values in (x, y) if sigma is None else (x, y, sigma):
+        if not np.all(np.isfinite(values)):
+            raise ValueError("array must not contain infs or NaNs")
+
+    if function is F.linear:
+        return _line(x, y, sigma)
+
+    # a*(x**2+b)+c only determines a and a*b+c, b is kept
+    # at its initial value and c is solved for that b
+    b = 0. if p0 is None else float(p0[1])
+    A = np.stack([x**2, np.ones_like(x)], axis=1)
+    (a, d), cov = _lstsq(A, y, sigma)
+    params = np.array([a, b, d-a*b])
+    J = np.array([[1, 0], [0, 0], [-b, 1]])
+    cov = J@cov@J.T
+    cov[1, :] = cov[:, 1] = np.inf
+    return params, cov
+
+
+def _n_params(function, p0):
+    """
+    Number of fitted parameters, found like curve_fit does
+    except that flags (parameters with a bool default like
+    rad of sinus) are not counted
+    """
+    if p0 is not None:
+        return np.size(p0)
+    parameters = list(inspect.signature(function).parameters.values())[1:]
+    return len([parameter for parameter in parameters if type(parameter.default) is not bool])
+
+
+def fit(function,x,y,p0,sigma=None,bounds=(-np.inf,np.inf),jac=None,cache=False,full_output=False):
+    """
+    Wrapper around scipy.optimize.curve_fit returning the
+    parameters and their standard errors.
+
+    linear and quadratic from Analysis.Functions are solved
+    directly with weighted least squares, b of quadratic is not
+    determined by the data and stays at p0[1] with an infinite
+    error (see _linear_model_fit). If their solution is outside
+    bounds, curve_fit starts from it clipped to the bounds rather
+    than from p0. When p0 is None the
+    initial parameters come from the estimator registered with
+    Analysis.Functions.guesses.register_guess if any.
+
+    jac is the Jacobian of function, by default the one registered
+    with Analysis.Functions.jacobians.register_jacobian if any, else
+    curve_fit uses finite differences.
+
+    With cache=True the result is memoized on a hash of the model
+    (its code and every value it refers to), the data, p0 and
+    bounds, see Analysis.Fit.set_cache. Models depending on values
+    that can not be hashed by content (Ex. objects) are not cached.
+
+    With full_output the optimizer status is also returned:
+    params, err, converged (bool) and the optimizer message,
+    such calls are not cached.
+    """
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    if sigma is not None:
+        sigma = np.asarray(sigma, dtype=np.float64)
+
+    if full_output:
+        return _fit(function, x, y, p0, sigma, bounds, jac, full_output=True)
+
+    key = C.key(function, x, y, p0, sigma, bounds, jac) if cache else None
+    if key is not None:
+        result = C.lookup(key)
+        if result is not None:
+            return result
+
+    fit, err = _fit(function, x, y, p0, sigma, bounds, jac)
+
+    if key is not None:
+        C.store(key, fit, err)
+    return fit, err
+
+
+def _fit(function, x, y, p0, sigma, bounds, jac, full_output=False):
+    res = None
+    if sigma is None or sigma.ndim == 1:
+        res = _linear_model_fit(function, x, y, p0, sigma)
+    if res is not None:
+        params, cov = res
+        if _in_bounds(params, bounds):
+            if full_output:
+                return params, np.sqrt(np.abs(np.diag(cov))), True, "Solved by linear least squares"
+            return params, np.sqrt(np.abs(np.diag(cov)))
+        # The exact solution clipped to the bounds is a better
+        # start than any p0
+        p0 = np.clip(params, *bounds)
+    elif p0 is None:
+        p0 = F.guesses.guess(function, x, y)
+        if p0 is not None:
+            p0 = np.clip(p0, *bounds)
+    if p0 is None:
+        # curve_fit's default, without the flags of the model
+        p0 = np.ones(_n_params(function, None))
+
+    # scipy is only imported once a model needs an iterative fit
+    from scipy.optimize import curve_fit as CF
+
+    if jac is None:
+        jac = F.jacobians.get_jacobian(function, _n_params(function, p0))
+
+    fit, err, info, message, ier = CF(function,x,y,p0=p0,sigma=sigma,bounds=bounds,jac=jac,full_output=True)
     err = np.sqrt(np.abs(np.diag(err)))
+    if full_output:
+        # 1 to 4 are the success statuses of both leastsq and least_squares
+        return fit, err, ier in (1, 2, 3, 4), message
     return fit, err
 
+
 def linear_fit(x, y, p0=None, sigma=None,bounds=(-np.inf,np.inf)):
     """
     A simple Linear fit with limited options
     for more functionality use curve_fit
     manually
     """
-    fit, err = CF(F.linear, x, y, p0=p0, sigma=sigma,bounds=bounds)
-    err = np.sqrt(np.diag(err))
+    fit_params, err = fit(F.linear, x, y, p0=p0, sigma=sigma,bounds=bounds)
 
-    return fit, err
+    return fit_params, err
 
 
 def exponential_fit(x, y, p0=None, sigma=None,bounds=(-np.inf,np.inf)):
@@ -27,10 +214,9 @@ def exponential_fit(x, y, p0=None, sigma=None,bounds=(-np.inf,np.inf)):
     use curve_fit manually
     """
 
-    fit, err = CF(F.exponential, x, y, p0=p0, sigma=sigma,bounds=bounds)
-    err = np.sqrt(np.diag(err))
+    fit_params, err = fit(F.exponential, x, y, p0=p0, sigma=sigma,bounds=bounds)
 
-    return fit, err
+    return fit_params, err
 
 def power_law_fit(x, y, p0=None, sigma=None,bounds=(-np.inf,np.inf)):
     """
@@ -38,7 +224,6 @@ def power_law_fit(x, y, p0=None, sigma=None,bounds=(-np.inf,np.inf)):
     for more functionality use curve_fit
     manually
     """
-    fit, err = CF(F.power_law, x, y, p0=p0, sigma=sigma,bounds=bounds)
-    err = np.sqrt(np.diag(err))
+    fit_params, err = fit(F.power_law, x, y, p0=p0, sigma=sigma,bounds=bounds)
 
-    return fit, err
+    return fit_params, err
@@ -0,0 +1,183 @@
+import os
+import pickle
+import warnings
+import numpy as np
+from multiprocessing import shared_memory
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from Analysis.Fit.fit import fit, _n_params
+
+
+def _share(arrays):
+    """
+    Copies arrays into one shared memory block, returns the
+    block and the (offset, shape) of every array in it
+    """
+
+    layout = []
+    offset = 0
+    for array in arrays:
+        if array is None:
+            layout.append(None)
+            continue
+        layout.append((offset, array.shape))
+        offset += array.size*8
+    block = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+    for array, position in zip(arrays, layout):
+        if position is not None:
+            np.ndarray(position[1], np.float64, block.buf, position[0])[...] = array
+    return block, layout
+
+
+def _attach(block, layout):
+    return [None if position is None else np.ndarray(position[1], np.float64, block.buf, position[0])
+            for position in layout]
+
+
+def _fit_row(function, x, y, sigma, p0, bounds):
+    """
+    Fits one curve ignoring the nan points, returns
+    (params, err, converged, message), params and err
+    are None if the fit raised
+    """
+
+    keep = np.isfinite(x) & np.isfinite(y)
+    if sigma is not None:
+        keep &= np.isfinite(sigma)
+        sigma = sigma[keep]
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            return fit(function, x[keep], y[keep], p0, sigma=sigma, bounds=bounds, full_output=True)
+    except (RuntimeError, ValueError, TypeError, np.linalg.LinAlgError) as e:
+        return None, None, False, "%s: %s" % (type(e).__name__, e)
+
+
+def _fit_rows(function, arrays, p0, bounds, start, stop):
+    x, Y, sigma = arrays
+    results = []
+    for i in range(start, stop):
+        results.append(_fit_row(function, x[i] if x.ndim == 2 else x, Y[i],
+                                None if sigma is None else (sigma[i] if sigma.ndim == 2 else sigma),
+                                p0 if p0 is None or np.ndim(p0) == 1 else p0[i], bounds))
+    return results
+
+
+def _fit_shared(args):
+    """
+    Process pool job, the arrays are read from shared memory
+    """
+
+    name, layout, function, p0, bounds, start, stop = args
+    block = shared_memory.SharedMemory(name=name)
+    try:
+        results = _fit_rows(function, _attach(block, layout), p0, bounds, start, stop)
+    finally:
+        block.close()
+    return results
+
+
+def _picklable(function):
+    try:
+        pickle.dumps(function)
+    except Exception:
+        return False
+    return True
+
+
+def fit_many(function, x, Y, p0=None, sigma=None, bounds=(-np.inf, np.inf), names=None,
+             workers=None, chunksize=None, executor="process"):
+    """
+    Fits the same model to every curve of Y on a pool of
+    workers, each curve is an independent Analysis.Fit.fit.
+    With processes the arrays are placed once in shared memory
+    instead of being pickled for every job.
+
+    Parameters:
+    ---------------------------------------------------------
+    function:   callable
+                The model f(x,*params), it must be picklable (defined
+                at module level) for processes, else threads are used
+    x:          np.ndarray (1d or 2d)
+                The x-axis values, shared (n) or per curve (m,n)
+    Y:          np.ndarray (2d)
+                The curves, shape (m,n), nan values are ignored
+    p0:         np.ndarray (1d or 2d)
+                Initial parameters, shared (p) or per curve (m,p),
+                estimated for every curve when None
+    sigma:      np.ndarray (1d or 2d)
+                The uncertainty on Y, shared (n) or per curve (m,n)
+    names:      list of str
+                Adds a "name" field to the result
+    workers:    Int
+                Size of the pool, defaults to os.cpu_count(),
+                1 fits in the current thread
+    chunksize:  Int
+                Number of curves per job, by default the curves
+                are split in about 4 jobs per worker
+    executor:   "process" or "thread"
+
+    Returns:
+    ---------------------------------------------------------
+    table:      np.ndarray (m) structured with the fields
+                "params" (p), "err" (p), "converged" (the
+                optimizer status) and "message" (the optimizer
+                message or the error), fits that raised have
+                nan parameters
+    """
+
+    assert executor in ("process", "thread"), "executor must be 'process' or 'thread'"
+
+    Y = np.atleast_2d(np.asarray(Y, dtype=np.float64))
+    x = np.asarray(x, dtype=np.float64)
+    if sigma is not None:
+        sigma = np.asarray(sigma, dtype=np.float64)
+    if p0 is not None:
+        p0 = np.asarray(p0, dtype=np.float64)
+    m = Y.shape[0]
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(min(workers, m), 1)
+    if chunksize is None:
+        chunksize = max(-(-m//(4*workers)), 1)
+    jobs = [(start, min(start+chunksize, m)) for start in range(0, m, chunksize)]
+
+    if workers == 1:
+        results = _fit_rows(function, (x, Y, sigma), p0, bounds, 0, m)
+    elif executor == "process" and _picklable(function):
+        block, layout = _share((x, Y, sigma))
+        try:
+            with ProcessPoolExecutor(workers) as pool:
+                parts = pool.map(_fit_shared, [(block.name, layout, function, p0, bounds, start, stop)
+                                               for start, stop in jobs])
+                results = [result for part in parts for result in part]
+        finally:
+            block.close()
+            block.unlink()
+    else:
+        with ThreadPoolExecutor(workers) as pool:
+            parts = pool.map(lambda job: _fit_rows(function, (x, Y, sigma), p0, bounds, *job), jobs)
+            results = [result for part in parts for result in part]
+
+    sizes = [result[0].shape[0] for result in results if result[0] is not None]
+    if sizes:
+        p = max(sizes)
+    else:
+        p = _n_params(function, None) if p0 is None else p0.shape[-1]
+
+    fields = [("params", np.float64, (p,)), ("err", np.float64, (p,)), ("converged", bool), ("message", object)]
+    if names is not None:
+        fields = [("name", "U%i" % max(max([len(str(i)) for i in names], default=1), 1))]+fields
+    table = np.zeros(m, dtype=fields)
+    table["params"] = np.nan
+    table["err"] = np.nan
+    if names is not None:
+        table["name"] = names
+    for i, (params, err, converged, message) in enumerate(results):
+        if params is not None:
+            table["params"][i] = params
+            table["err"][i] = err
+        table["converged"][i] = converged
+        table["message"][i] = message
+
+    return table
@@ -1 +1,6 @@
 from Analysis.Functions.base_functions import *
+# Every callable of this namespace is taken as a fit model (Ex. by
+# Plot_1D and fit_all), the Jacobian and initial parameter registries
+# are kept in their modules: Analysis.Functions.jacobians.register_jacobian
+# and Analysis.Functions.guesses.register_guess
+from Analysis.Functions import jacobians, guesses
@@ -0,0 +1,176 @@
+import numpy as np
+from Analysis.Functions.base_functions import linear, quadratic, exponential, sinus, cosinus, power_law
+
+
+def _line(x, y):
+    """
+    Least squares slope and intercept of y = a*x+b
+    """
+    xm = x.mean()
+    xc = x-xm
+    a = (xc@(y-y.mean()))/(xc@xc)
+    return a, y.mean()-a*xm
+
+
+def _sorted(x, y):
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    keep = np.isfinite(x) & np.isfinite(y)
+    x, y = x[keep], y[keep]
+    order = np.argsort(x, kind="stable")
+    return x[order], y[order]
+
+
+def linear_guess(x, y):
+    """
+    Initial a and b of linear from a least squares line
+    """
+    x, y = _sorted(x, y)
+    return np.array(_line(x, y))
+
+
+def quadratic_guess(x, y):
+    """
+    Initial a, b and c of quadratic, b is left at 0
+    """
+    x, y = _sorted(x, y)
+    a, c = _line(x**2, y)
+    return np.array([a, 0., c])
+
+
+def exponential_guess(x, y):
+    """
+    Initial a and b of exponential from a
+    linear fit of log|y|
+    """
+
+    x, y = _sorted(x, y)
+    sign = 1. if np.sum(y > 0) >= np.sum(y < 0) else -1.
+    keep = sign*y > 0
+    if keep.sum() < 2:
+        return np.array([1., 1.])
+    b, log_a = _line(x[keep], np.log(sign*y[keep]))
+    return np.array([sign*np.exp(log_a), b])
+
+
+def sinus_guess(t, y):
+    """
+    Initial a, w, phi and b of sinus. The angular frequency
+    comes from the peak of the FFT of the data (resampled on a
+    uniform grid if needed) refined by parabolic interpolation,
+    or from the zero crossings when the FFT has no peak. The
+    amplitude, phase and offset are then a linear fit of
+    A*sin(w*t)+B*cos(w*t)+b.
+    """
+
+    t, y = _sorted(t, y)
+    n = t.shape[0]
+    span = t[-1]-t[0]
+    if n < 4 or span <= 0:
+        return np.array([np.std(y)*np.sqrt(2), 1., 0., np.mean(y)])
+
+    # Resample on a uniform grid for the FFT
+    grid = np.linspace(t[0], t[-1], n)
+    dt = grid[1]-grid[0]
+    yc = np.interp(grid, t, y)
+    yc = yc-yc.mean()
+
+    spectrum = np.abs(np.fft.rfft(yc*np.hanning(n)))
+    k = np.argmax(spectrum[1:])+1 if spectrum.shape[0] > 1 else 0
+    if 0 < k < spectrum.shape[0]-1:
+        left, center, right = np.log(spectrum[k-1:k+2]+1e-300)
+        denominator = left-2*center+right
+        shift = 0.5*(left-right)/denominator if denominator != 0 else 0.
+        w = 2*np.pi*(k+shift)/(n*dt)
+    else:
+        crossings = np.count_nonzero(np.diff(np.signbit(yc)))
+        w = np.pi*max(crossings, 1)/span
+
+    A = np.stack([np.sin(w*t), np.cos(w*t), np.ones_like(t)], axis=1)
+    (s, c, b), *rest = np.linalg.lstsq(A, y, rcond=None)
+
+    return np.array([np.hypot(s, c), w, np.arctan2(c, s), b])
+
+
+def cosinus_guess(t, y):
+    """
+    Initial a, w, phi and b of cosinus, see sinus_guess
+    """
+    a, w, phi, b = sinus_guess(t, y)
+    return np.array([a, w, phi-np.pi/2, b])
+
+
+def power_law_guess(x, y, n_candidates=200):
+    """
+    Initial a, b and c of power_law. For a grid of critical
+    points b on both sides of the data, log|y| is fitted
+    linearly against log(1-x/b) (vectorized over all the
+    candidates) and the b with the smallest residual is kept.
+    """
+
+    x, y = _sorted(x, y)
+    sign = 1. if np.sum(y > 0) >= np.sum(y < 0) else -1.
+    keep = sign*y > 0
+    x, y = x[keep], np.log(sign*y[keep])
+    if x.shape[0] < 3:
+        return np.array([sign, 2*np.max(np.abs(x), initial=1.), 1.])
+
+    span = max(x[-1]-x[0], np.finfo(np.float64).tiny)
+    gaps = span*np.logspace(-4, 2, n_candidates//2)
+    B = np.concatenate([x[-1]+gaps, x[0]-gaps])
+    B = B[B != 0]
+
+    U = 1-x[None, :]/B[:, None]
+    valid = np.all(U > 0, axis=1)
+    B, L = B[valid], np.log(U[valid])
+    if B.shape[0] == 0:
+        return np.array([sign, 2*np.max(np.abs(x)), 1.])
+
+    Lm = L.mean(axis=1, keepdims=True)
+    Lc = L-Lm
+    ym = y.mean()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        c = (Lc@(y-ym))/np.einsum("ij,ij->i", Lc, Lc)
+    log_a = ym-c*Lm[:, 0]
+    rss = np.sum((y[None, :]-log_a[:, None]-c[:, None]*L)**2, axis=1)
+    best = np.nanargmin(rss)
+
+    return np.array([sign*np.exp(log_a[best]), B[best], c[best]])
+
+
+GUESSES = {
+    linear: linear_guess,
+    quadratic: quadratic_guess,
+    exponential: exponential_guess,
+    sinus: sinus_guess,
+    cosinus: cosinus_guess,
+    power_law: power_law_guess,
+}
+
+
+def register_guess(function, guesser):
+    """
+    Registers an initial parameter estimator for a model,
+    used by Analysis.Fit when p0 is None
+
+    Parameters:
+    --------------------------------
+    function:   The model f(x,*params)
+    guesser:    A function g(x,y) returning the initial parameters
+    """
+
+    assert callable(function) and callable(guesser), "function and guesser must be callable"
+    GUESSES[function] = guesser
+    return
+
+
+def guess(function, x, y):
+    """
+    Returns the initial parameters of function estimated from
+    the data, or None if no estimator is registered
+    """
+
+    guesser = GUESSES.get(function)
+    if guesser is None:
+        return None
+    return guesser(x, y)
@@ -0,0 +1,111 @@
+import numpy as np
+from Analysis.Functions.base_functions import linear, quadratic, exponential, sinus, cosinus, power_law
+
+
+def _stack(*columns):
+    """
+    Broadcasts the derivatives against each other and stacks
+    them on a last axis, giving (n,p) for scalar parameters
+    and (m,n,p) for parameters of shape (m,1)
+    """
+    return np.stack(np.broadcast_arrays(*columns), axis=-1).astype(np.float64)
+
+
+def linear_jacobian(x, a=1, b=0):
+    """
+    Derivatives of linear with respect to a and b
+    """
+    return _stack(x, np.ones_like(x)*np.ones_like(a*b))
+
+
+def quadratic_jacobian(x, a=1, b=0, c=0):
+    """
+    Derivatives of quadratic with respect to a, b and c
+    """
+    return _stack(x**2+b, a*np.ones_like(x), np.ones_like(x)*np.ones_like(a*b*c))
+
+
+def exponential_jacobian(x, a=1, b=1):
+    """
+    Derivatives of exponential with respect to a and b
+    """
+    e = np.exp(b*x)
+    return _stack(e, a*x*e)
+
+
+def sinus_jacobian(t, a=1, w=1, phi=0, b=0, rad=True):
+    """
+    Derivatives of sinus with respect to a, w, phi and b
+    """
+    scale = 1 if rad else np.pi/180
+    arg = w*scale*t+phi*scale
+    s = np.sin(arg)
+    c = a*np.cos(arg)
+    return _stack(s, c*t*scale, c*scale, np.ones_like(s))
+
+
+def cosinus_jacobian(t, a=1, w=1, phi=0, b=0, rad=True):
+    """
+    Derivatives of cosinus with respect to a, w, phi and b
+    """
+    return sinus_jacobian(t, a, w, phi+np.pi/2, b, rad)
+
+
+def power_law_jacobian(x, a, b, c):
+    """
+    Derivatives of power_law with respect to a, b and c
+    """
+    u = 1-x/b
+    uc = u**c
+    return _stack(uc, a*c*u**(c-1)*x/b**2, a*uc*np.log(u))
+
+
+JACOBIANS = {
+    linear: linear_jacobian,
+    quadratic: quadratic_jacobian,
+    exponential: exponential_jacobian,
+    sinus: sinus_jacobian,
+    cosinus: cosinus_jacobian,
+    power_law: power_law_jacobian,
+}
+
+
+def register_jacobian(function, jacobian):
+    """
+    Registers the analytic Jacobian of a model so that
+    Analysis.Fit uses it instead of finite differences
+
+    Parameters:
+    --------------------------------
+    function:   The model f(x,*params)
+    jacobian:   A function jac(x,*params) returning the
+                derivatives with respect to every parameter
+                stacked on the last axis, shape (n,p).
+                It should broadcast like the model.
+    """
+
+    assert callable(function) and callable(jacobian), "function and jacobian must be callable"
+    JACOBIANS[function] = jacobian
+    return
+
+
+def get_jacobian(function, n_params=None):
+    """
+    Returns the registered Jacobian of function or None.
+    If n_params is given the result is trimmed (or padded with
+    zeros) to that many parameters, like curve_fit expects when
+    only part of the parameters of a model are fitted.
+    """
+
+    jacobian = JACOBIANS.get(function)
+    if jacobian is None or n_params is None:
+        return jacobian
+
+    def jac(x, *params):
+        J = jacobian(x, *params)
+        if J.shape[-1] >= n_params:
+            return J[..., :n_params]
+        pad = np.zeros(J.shape[:-1]+(n_params-J.shape[-1],))
+        return np.concatenate([J, pad], axis=-1)
+
+    return jac
@@ -1,12 +1,13 @@
-from Analysis import Experiment as E
 from Analysis import Functions as F
 from Analysis import Fit as Fit
 
-from matplotlib import pyplot as plt
-import matplotlib.ticker as ticker
 import numpy as np
-import scipy as sp
-from cycler import cycler
+from Analysis.Plot import decimate as D
+from Analysis.Plot import grid as G
+from Analysis.Plot import export as T
+
+# matplotlib is imported when something is drawn so that
+# importing Analysis stays cheap for headless scripts
 
 
 class Plot_1D():
@@ -14,7 +15,7 @@ class Plot_1D():
     Plots a simple x,y graph
     """
 
-    def __init__(self, parameter, measurement, graph=None):
+    def __init__(self, parameter, measurement, graph=None, figure=None):
         """
         A Simple 1D Plot
 
@@ -25,11 +26,14 @@ class Plot_1D():
         measurement: An instance of Analysis.Experiment.Measurement
         graph:  An instance of Plot_1D if present used to add curves
                 to the same figure
+        figure: A matplotlib Figure, cleared and drawn on instead of
+                creating a new pyplot figure (Ex. to render without pyplot)
         """
         self.parameter = parameter
         self.measurement = measurement
 
         self.graph = graph
+        self.figure = figure
         self.fit_functions = {
             func.__name__: func for func in F.__dict__.values() if callable(func)}
         return
@@ -37,8 +41,22 @@ class Plot_1D():
     def draw(self, **kwargs):
         """
         Draws the plot, kwargs are ax.plots() execept Fit
-        which is used to determine how to fit the data
+        which is used to determine how to fit the data (with
+        bounds, p0, sigma and cache, see Analysis.Fit.fit, so that
+        cache=True redraws without fitting again) and
+        Decimate which controls how long curves are drawn:
+        None decimates above Analysis.Plot.decimate.DECIMATE_THRESHOLD
+        points, True or "minmax" and "lttb" always decimate and
+        False draws every point. Decimated lines are recomputed
+        when the x limits change, the fit always uses every point.
+        Curves with error bars are decimated once when drawn, their
+        error bars are not recomputed on zoom (use Decimate=False
+        to see every error bar of a zoomed region).
         """
+        from matplotlib import pyplot as plt
+        import matplotlib.ticker as ticker
+        from cycler import cycler
+
         # Define the data and the labels
         data = np.array([self.parameter.data, self.measurement.data])
 
@@ -54,6 +72,11 @@ class Plot_1D():
 
         data_label = self.measurement.label
 
+        decimate = kwargs.pop("Decimate", None)
+        cache = kwargs.pop("cache", False)
+        if decimate is None:
+            decimate = data.shape[1] > D.DECIMATE_THRESHOLD
+
         # Determine if a fit is wanted
         try:
             fit = kwargs.pop("Fit")
@@ -77,12 +100,16 @@ class Plot_1D():
                 sigma = None
 
             fit_params, fit_err = Fit.fit(
-                fit_function, data[0], data[1], p0=p0, sigma=sigma, bounds=bounds)
+                fit_function, data[0], data[1], p0=p0, sigma=sigma, bounds=bounds, cache=cache)
         except KeyError:
             fit = None
 
         if self.graph is None:
-            self.fig, self.ax = plt.subplots()
+            if self.figure is None:
+                self.fig, self.ax = plt.subplots()
+            else:
+                self.figure.clear()
+                self.fig, self.ax = self.figure, self.figure.add_subplot()
             self.ax2 = None
         else:
             assert isinstance(
@@ -109,31 +136,42 @@ class Plot_1D():
                 cc = cycler(color=colors)
                 self.ax.set_prop_cycle(cc)
 
+        # Only the drawn points are decimated, errors follow their points
+        xerr, yerr = self.parameter.err, self.measurement.err
+        if decimate is not False:
+            decimator = D.Decimator(data[0], data[1], "minmax" if decimate is True else decimate)
+            index = decimator.index(pixels=self.ax.bbox.width)
+            plot_x, plot_y = decimator.x[index], decimator.y[index]
+            xerr, yerr = [err if np.ndim(err) == 0 else np.asarray(err)[decimator.order[index]]
+                          for err in (xerr, yerr)]
+        else:
+            plot_x, plot_y = data[0], data[1]
+
         if fit is not None:
             if self.parameter.err is not None or self.measurement.err is not None:
-                xerr = self.parameter.err
-                yerr = self.measurement.err
-                self.ax.errorbar(data[0], data[1], yerr,
+                self.ax.errorbar(plot_x, plot_y, yerr,
                                  xerr, label=data_label, **kwargs)
-                self.ax.plot(data[0], fit_function(
-                    data[0], *fit_params), label=fit_label)
+                self.ax.plot(plot_x, fit_function(
+                    plot_x, *fit_params), label=fit_label)
             else:
-                self.ax.plot(*data, label=data_label, **kwargs)
-                self.ax.plot(data[0], fit_function(
-                    data[0], *fit_params), label=fit_label)
+                line, = self.ax.plot(plot_x, plot_y, label=data_label, **kwargs)
+                fit_line, = self.ax.plot(plot_x, fit_function(
+                    plot_x, *fit_params), label=fit_label)
+                if decimate is not False:
+                    decimator.connect(self.ax, line, fit_line, fit_function, fit_params)
             self.ax.legend()
             self.ax.set_xlabel(xlabel)
             self.ax.set_ylabel(ylabel)
 
         else:
             if self.parameter.err is not None or self.measurement.err is not None:
-                xerr = self.parameter.err
-                yerr = self.measurement.err
-                self.ax.errorbar(data[0], data[1], yerr,
+                self.ax.errorbar(plot_x, plot_y, yerr,
                                  xerr, label=data_label, **kwargs)
 
             else:
-                self.ax.plot(*data, label=data_label, **kwargs)
+                line, = self.ax.plot(plot_x, plot_y, label=data_label, **kwargs)
+                if decimate is not False:
+                    decimator.connect(self.ax, line)
                 if data_label is not None:
                     self.ax.legend()
 
@@ -180,6 +218,7 @@ def table(measurements,rowLabels=None):
     """
     Generates a table using matplotlib.pyplot.table
     """
+    from matplotlib import pyplot as plt
 
     if type(measurements) is not list:
         measurements = [measurements]
@@ -191,22 +230,8 @@ def table(measurements,rowLabels=None):
     data = []
     colLabels = []
     for meas in measurements:
-        if meas.err is None:
-            data_str = [("{0:.%if}"%2).format(i) if type(i) is not np.int64 else "%i"%i  for i in meas.data]
-        else:
-            err = meas.err
-            fmt = ["%i"%(int(("%1.2e"%i).split("e")[1])) for i in err]
-            fmt2 = [abs(int(i)) if int(i)<0 else 0 for i in fmt]
-            err_str = [("{0:.%if}"%fmt2[i]).format(err.data[i]) for i in range(err.data.shape[0])]
-            meas_str = [("{0:.%if}"%fmt2[i]).format(meas.data[i]) for i in range(meas.data.shape[0])]
-            data_str = [r"%s $\pm$ %s"%(meas_str[i],err_str[i]) for i in range(len(meas_str))]
-
-        if meas.unit != "":
-            colLabel=r"%s (%s)"%(meas.name,meas.unit)
-        else:
-            colLabel=meas.name
-        data.append(data_str)
-        colLabels.append(colLabel)
+        data.append(T.format_column(meas.data, meas.err, T.PM["matplotlib"]))
+        colLabels.append(T.column_label(meas))
 
     data = (np.array(data).T).tolist()
 
@@ -221,7 +246,96 @@ def table(measurements,rowLabels=None):
     return fig, ax, table
 
 
+class Plot2D():
+    """
+    Plots a measurement as a color map of two parameters
+    """
+
+    def __init__(self, dataset, parameters=(0, 1), measurement=0, figure=None):
+        """
+        A 2D color map
+
+        Parameters:
+        --------------------------------------
+
+        dataset:    An instance of Analysis.Experiment.DataSet with
+                    at least two parameters of the same length as the measurement
+        parameters: tuple(Int, Int)
+                    Index of the parameters on the x and y axes
+        measurement: Int
+                    Index of the measurement shown in color
+        figure: A matplotlib Figure, cleared and drawn on instead of
+                creating a new pyplot figure
+        """
+
+        assert len(dataset.parameters) >= 2, "Plot2D needs a DataSet with two parameters"
+        self.x = dataset.parameters[parameters[0]]
+        self.y = dataset.parameters[parameters[1]]
+        self.measurement = dataset.measurements[measurement]
+        assert self.x.data.shape == self.y.data.shape == self.measurement.data.shape, \
+            "The parameters and the measurement must have the same length"
 
-def Plot2D():
+        self.figure = figure
+        return
+
+    def map(self, bins=None):
+        """
+        Returns the axes and the map (ny,nx) of the measurement.
+        Points on a regular grid are reshaped without copy,
+        scattered points are averaged on bins (Int or (nx,ny),
+        sqrt of the number of points by default) cells.
+        """
+
+        x, y, z = self.x.data, self.y.data, self.measurement.data
+        grid = G.detect_grid(x, y) if bins is None else None
+        if grid is not None:
+            return G.reshape_grid(x, y, z, grid)
+
+        if bins is None:
+            bins = max(int(np.sqrt(x.shape[0])), 1)
+        return G.bin_scattered(x, y, z, bins)
+
+    def draw(self, bins=None, Decimate=None, colorbar=True, **kwargs):
+        """
+        Draws the map, with imshow if both axes are equally spaced
+        and pcolormesh otherwise, kwargs are passed to them.
+
+        Maps with more cells than the axes have pixels are reduced
+        by averaging blocks of cells unless Decimate is False.
+
+        Returns fig, ax and the image
+        """
+        from matplotlib import pyplot as plt
+
+        xs, ys, Z = self.map(bins)
+
+        if self.figure is None:
+            self.fig, self.ax = plt.subplots()
+        else:
+            self.figure.clear()
+            self.fig, self.ax = self.figure, self.figure.add_subplot()
+
+        if Decimate is not False:
+            xs, ys, Z = D.block_mean(xs, ys, Z, (self.ax.bbox.height, self.ax.bbox.width))
+
+        if G.uniform(xs) and G.uniform(ys):
+            dx = (xs[-1]-xs[0])/(xs.shape[0]-1) if xs.shape[0] > 1 else 1
+            dy = (ys[-1]-ys[0])/(ys.shape[0]-1) if ys.shape[0] > 1 else 1
+            extent = (xs[0]-dx/2, xs[-1]+dx/2, ys[0]-dy/2, ys[-1]+dy/2)
+            kwargs.setdefault("interpolation", "nearest")
+            self.image = self.ax.imshow(Z, origin="lower", extent=extent, aspect="auto", **kwargs)
+        else:
+            self.image = self.ax.pcolormesh(G.edges(xs), G.edges(ys), Z, **kwargs)
+
+        labels = []
+        for variable in (self.x, self.y, self.measurement):
+            if variable.unit is not None and variable.unit != "":
+                labels.append("%s (%s)" % (variable.name, variable.unit))
+            else:
+                labels.append("%s" % (variable.name))
+        self.ax.set_xlabel(labels[0])
+        self.ax.set_ylabel(labels[1])
+        if colorbar is True:
+            self.colorbar = self.fig.colorbar(self.image, ax=self.ax, label=labels[2])
 
-    return
+        return self.fig, self.ax, self.image
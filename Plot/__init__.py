@@ -1 +1,3 @@
 from Analysis.Plot.Plot import *
+from Analysis.Plot.render import render
+from Analysis.Plot.export import format_column, export_table
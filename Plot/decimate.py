@@ -0,0 +1,186 @@
+import numpy as np
+
+
+# Plot_1D decimates the curves with more points than this
+DECIMATE_THRESHOLD = 100000
+
+
+def minmax(x, y, buckets):
+    """
+    Indices of the first and last points and of the minimum and
+    maximum of y in each of buckets equal intervals of x, so that
+    every peak is still drawn (2 points per pixel column)
+
+    Parameters:
+    --------------------------------
+    x:          np.ndarray sorted in growing order
+    y:          np.ndarray without nan
+    buckets:    Int, usually the width of the axes in pixels
+    """
+
+    n = x.shape[0]
+    if n <= 2*buckets+2:
+        return np.arange(n)
+
+    edges = np.linspace(x[0], x[-1], buckets+1)
+    starts = np.unique(np.searchsorted(x, edges[:-1], side="left"))
+    starts = starts[starts < n]
+    counts = np.diff(np.append(starts, n))
+
+    index = [[0, n-1]]
+    for reduce in (np.minimum, np.maximum):
+        extrema = reduce.reduceat(y, starts)
+        # First point of every bucket equal to its extremum
+        hits = np.flatnonzero(y == np.repeat(extrema, counts))
+        index.append(hits[np.searchsorted(hits, starts)])
+
+    return np.unique(np.concatenate(index))
+
+
+def lttb(x, y, n_out):
+    """
+    Indices of the points kept by the Largest-Triangle-Three-Buckets
+    algorithm, which keeps the visual shape with n_out points
+
+    Parameters:
+    --------------------------------
+    x:          np.ndarray sorted in growing order
+    y:          np.ndarray without nan
+    n_out:      Int, number of points kept
+    """
+
+    n = x.shape[0]
+    if n <= n_out or n_out < 3:
+        return np.arange(n)
+
+    # Buckets of equal number of points between the fixed end points
+    edges = np.linspace(1, n-1, n_out-1).astype(np.int64)
+    index = np.empty(n_out, dtype=np.int64)
+    index[0], index[-1] = 0, n-1
+
+    a = 0
+    for i in range(n_out-2):
+        start, stop = edges[i], edges[i+1]
+        following = slice(stop, edges[i+2] if i+2 < n_out-1 else n)
+        cx, cy = x[following].mean(), y[following].mean()
+        area = np.abs((x[a]-cx)*(y[start:stop]-y[a])-(x[a]-x[start:stop])*(cy-y[a]))
+        a = start+np.argmax(area)
+        index[i+1] = a
+
+    return index
+
+
+METHODS = {"minmax": minmax, "lttb": lttb}
+
+
+class Decimator():
+    """
+    Keeps a copy of a curve and returns the points to draw for a
+    range of x and a number of pixels, used by Plot_1D to
+    re-decimate on zoom and pan. Only the display goes through
+    it, the data itself is not modified.
+
+    A monotonic x is kept in growing order (reversed if it is
+    decreasing) and bucketed along x. Any other sweep (Ex. up and
+    down hysteresis loops or repeated scans) is kept and bucketed
+    in acquisition order, so the drawn curve keeps its shape.
+    """
+
+    def __init__(self, x, y, method="minmax"):
+        """
+        Parameters:
+        --------------------------------
+        x, y:       np.ndarray (1d), non finite points are not drawn
+        method:     "minmax" or "lttb"
+        """
+
+        assert method in METHODS, "method must be one of %s" % (list(METHODS))
+        self.method = METHODS[method]
+
+        valid = np.flatnonzero(np.isfinite(x) & np.isfinite(y))
+        steps = np.diff(x[valid])
+        self.monotonic = True
+        if np.all(steps >= 0):
+            self.order = valid
+        elif np.all(steps <= 0):
+            self.order = valid[::-1]
+        else:
+            self.monotonic = False
+            self.order = valid
+        self.x = x[self.order]
+        self.y = y[self.order]
+        return
+
+    def index(self, xlim=None, pixels=1000):
+        """
+        Positions in self.x and self.y of the points to draw
+        between xlim (plus one point on each side so that the
+        line reaches the edges of the axes when x is monotonic),
+        self.order[index] gives their indices in the original arrays
+        """
+
+        pixels = max(int(pixels), 1)
+        n_out = 2*pixels if self.method is lttb else pixels
+
+        if not self.monotonic:
+            # Buckets of consecutive points in acquisition order
+            if xlim is None:
+                positions = np.arange(self.x.shape[0])
+            else:
+                positions = np.flatnonzero((self.x >= min(xlim)) & (self.x <= max(xlim)))
+            if positions.shape[0] == 0:
+                return positions
+            return positions[self.method(positions.astype(np.float64), self.y[positions], n_out)]
+
+        start, stop = 0, self.x.shape[0]
+        if xlim is not None:
+            low, high = min(xlim), max(xlim)
+            start = max(np.searchsorted(self.x, low, side="left")-1, 0)
+            stop = min(np.searchsorted(self.x, high, side="right")+1, stop)
+        if stop-start <= 0:
+            return np.arange(0)
+
+        return start+self.method(self.x[start:stop], self.y[start:stop], n_out)
+
+    def connect(self, ax, line, fit_line=None, function=None, params=None):
+        """
+        Re-decimates line (and evaluates the fit on the kept
+        points for fit_line) every time the x limits of ax change
+        """
+
+        def update(ax):
+            index = self.index(ax.get_xlim(), ax.bbox.width)
+            line.set_data(self.x[index], self.y[index])
+            if fit_line is not None:
+                fit_line.set_data(self.x[index], function(self.x[index], *params))
+            return
+
+        # A plain function is kept alive by the callback registry
+        ax.callbacks.connect("xlim_changed", update)
+        return
+
+
+def block_mean(xs, ys, Z, shape):
+    """
+    Reduces a map Z (ny,nx) to at most shape (rows, columns) by
+    averaging blocks of cells (ignoring nan), the cells that do
+    not fill a block at the end of an axis are dropped
+
+    Returns the block centers along x and y and the reduced map
+    """
+
+    rows, columns = max(int(shape[0]), 1), max(int(shape[1]), 1)
+    ky, kx = -(-Z.shape[0]//rows), -(-Z.shape[1]//columns)
+    if ky == 1 and kx == 1:
+        return xs, ys, Z
+
+    ny, nx = Z.shape[0]//ky, Z.shape[1]//kx
+    blocks = Z[:ny*ky, :nx*kx].reshape(ny, ky, nx, kx)
+    if np.isnan(Z).any():
+        with np.errstate(invalid="ignore"):
+            valid = ~np.isnan(blocks)
+            Z = np.where(valid, blocks, 0).sum(axis=(1, 3))/valid.sum(axis=(1, 3))
+    else:
+        Z = blocks.mean(axis=(1, 3))
+
+    return xs[:nx*kx].reshape(nx, kx).mean(axis=1), ys[:ny*ky].reshape(ny, ky).mean(axis=1), Z
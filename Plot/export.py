@@ -0,0 +1,170 @@
+import os
+import numpy as np
+
+
+# Separator between a value and its uncertainty for each format
+PM = {"matplotlib": r" $\pm$ ", "latex": r" $\pm$ ", "csv": " ± ", "markdown": " ± "}
+EXTENSIONS = {".csv": "csv", ".tex": "latex", ".md": "markdown"}
+
+
+def decimals(err):
+    """
+    Number of decimals to show a value with uncertainty err, that
+    is minus the exponent of err written with 3 significant digits
+    ("%1.2e") if it is negative and 0 otherwise, for whole arrays
+    """
+
+    err = np.abs(np.asarray(err, dtype=np.float64))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        exponent = np.floor(np.log10(err))
+        exponent = np.where(np.isfinite(exponent), exponent, 0)
+        # The mantissa can round up to 10.00 (Ex. 9.996 -> 1.00e+01)
+        exponent += np.round(err/10**exponent, 2) >= 10
+    return np.where(exponent < 0, -exponent, 0).astype(np.int64)
+
+
+def _format(fmt, *columns):
+    """
+    Applies fmt to every row of columns with a single % operation
+    on a repeated format string, which is several times faster
+    than formatting element by element
+    """
+
+    n = columns[0].shape[0]
+    if n == 0:
+        return []
+    values = np.stack(columns, axis=1).ravel().tolist()
+    return (((fmt+"\n")*n) % tuple(values)).split("\n")[:-1]
+
+
+def format_column(data, err=None, pm=" ± "):
+    """
+    Formats a column of values as strings, with two decimals (or
+    as integers) without err, else as "value pm err" where both
+    have the number of decimals given by decimals(err)
+
+    Parameters:
+    --------------------------------
+    data:   np.ndarray (1d)
+    err:    np.ndarray (1d) or scalar or None
+    pm:     str placed between the value and its uncertainty
+    """
+
+    data = np.asarray(data)
+    if err is None:
+        if np.issubdtype(data.dtype, np.integer):
+            return np.array(_format("%i", data), dtype=str)
+        return np.array(_format("%.2f", data), dtype=str)
+
+    err = np.broadcast_to(np.asarray(err, dtype=np.float64), data.shape)
+    digits = decimals(err)
+    out = np.empty(data.shape, dtype=object)
+    pm = pm.replace("%", "%%")
+    # One format operation per distinct number of decimals
+    for d in np.unique(digits):
+        mask = digits == d
+        out[mask] = _format("%%.%if%s%%.%if" % (d, pm, d), data[mask], err[mask])
+    return out.astype(str)
+
+
+def column_label(measurement):
+    if measurement.unit is not None and measurement.unit != "":
+        return "%s (%s)" % (measurement.name, measurement.unit)
+    return "%s" % (measurement.name)
+
+
+def _csv_cell(cell):
+    if any(c in cell for c in ',"\n'):
+        return '"%s"' % cell.replace('"', '""')
+    return cell
+
+
+def _latex_cell(cell):
+    # The separator is already LaTeX, only text needs escaping
+    for c in "&%#_":
+        cell = cell.replace(c, "\\"+c)
+    return cell
+
+
+def _row_writer(fmt):
+    """
+    Returns (header, row, footer) functions for a format
+    """
+
+    if fmt == "csv":
+        def row(cells):
+            return ",".join([_csv_cell(c) for c in cells])+"\n"
+        return row, row, None
+
+    if fmt == "markdown":
+        def row(cells):
+            return "| %s |\n" % " | ".join([c.replace("|", "\\|") for c in cells])
+
+        def header(cells):
+            return row(cells)+"|%s\n" % ("---|"*len(cells))
+        return header, row, None
+
+    def row(cells):
+        return " & ".join(cells)+" \\\\\n"
+
+    def header(cells):
+        return "\\begin{tabular}{%s}\n\\hline\n" % ("c"*len(cells))+row([_latex_cell(c) for c in cells])+"\\hline\n"
+
+    def footer():
+        return "\\hline\n\\end{tabular}\n"
+    return header, row, footer
+
+
+def export_table(measurements, filename, fmt=None, rowLabels=None, chunk_rows=10000):
+    """
+    Writes the table of Analysis.Plot.table (values with their
+    uncertainty) to a CSV, LaTeX (tabular) or Markdown file. The
+    rows are formatted and written chunk_rows at a time so
+    long or memory-mapped measurements are streamed.
+
+    Parameters:
+    ---------------------------------------------------------
+    measurements:   list of Measurement of the same length
+    filename:       str
+    fmt:            "csv", "latex" or "markdown", by default
+                    from the extension (.csv, .tex, .md)
+    rowLabels:      list of str, written as a first column
+    chunk_rows:     Int
+    """
+
+    if type(measurements) is not list:
+        measurements = [measurements]
+    if fmt is None:
+        fmt = EXTENSIONS.get(os.path.splitext(filename)[1].lower())
+    assert fmt in ("csv", "latex", "markdown"), "fmt must be csv, latex or markdown"
+
+    n = measurements[0].data.shape[0]
+    for meas in measurements:
+        assert meas.data.shape[0] == n, "Measurements must have the same length"
+    if rowLabels is not None:
+        assert len(rowLabels) == n, "There must be one row label per row"
+
+    header, row, footer = _row_writer(fmt)
+    pm = PM[fmt]
+    labels = [column_label(meas) for meas in measurements]
+    if rowLabels is not None:
+        labels = [""]+labels
+
+    with open(filename, "w", encoding="utf-8", newline="") as f:
+        f.write(header(labels))
+        for start in range(0, n, chunk_rows):
+            stop = min(start+chunk_rows, n)
+            columns = []
+            if rowLabels is not None:
+                cells = [str(label) for label in rowLabels[start:stop]]
+                columns.append([_latex_cell(c) for c in cells] if fmt == "latex" else cells)
+            for meas in measurements:
+                err = meas.err
+                if err is not None and np.ndim(err) > 0:
+                    err = err[start:stop]
+                columns.append(format_column(meas.data[start:stop], err, pm).tolist())
+            f.writelines([row(cells) for cells in zip(*columns)])
+        if footer is not None:
+            f.write(footer())
+
+    return
@@ -0,0 +1,116 @@
+import numpy as np
+
+
+def uniform(values, rtol=1e-3):
+    """
+    True if values are equally spaced
+    """
+    if values.shape[0] < 3:
+        return True
+    step = (values[-1]-values[0])/(values.shape[0]-1)
+    return bool(np.all(np.abs(np.diff(values)-step) <= rtol*abs(step)))
+
+
+def _same_rows(values, first, rtol=1e-9):
+    """
+    True if every row of values (2d) is equal to first,
+    exactly or within rtol of the span of first
+    """
+    if np.array_equal(values, np.broadcast_to(first, values.shape)):
+        return True
+    span = np.abs(first[-1]-first[0])
+    return bool(np.all(np.abs(values-first) <= rtol*span))
+
+
+def detect_grid(x, y):
+    """
+    Detects if the points (x,y) of a sweep lie on a regular grid,
+    scanned row by row with either x or y as the fast axis.
+
+    Returns None for scattered points, else (fast, nx, ny) where
+    fast is "x" or "y" and nx, ny are the number of distinct values
+    of x and y. The data of z is then z.reshape(ny,nx) if fast
+    is "x" and z.reshape(nx,ny).T if fast is "y", both views.
+    """
+
+    n = x.shape[0]
+    for fast, slow, name in ((x, y, "x"), (y, x, "y")):
+        if n < 4 or fast.shape[0] != n:
+            continue
+        # The first row ends where the slow parameter first changes
+        changes = np.flatnonzero(slow != slow[0])
+        if changes.shape[0] == 0:
+            continue
+        n_fast = int(changes[0])
+        if n_fast < 2 or n % n_fast != 0:
+            continue
+        n_slow = n//n_fast
+        rows_fast = fast.reshape(n_slow, n_fast)
+        rows_slow = slow.reshape(n_slow, n_fast)
+        if not np.all(rows_slow == rows_slow[:, :1]):
+            continue
+        if not _same_rows(rows_fast, rows_fast[0]):
+            continue
+        if name == "x":
+            return "x", n_fast, n_slow
+        return "y", n_slow, n_fast
+
+    return None
+
+
+def reshape_grid(x, y, z, grid):
+    """
+    Returns the axes and the (ny,nx) map of a gridded sweep as
+    views of x, y and z, in growing order along both axes
+    """
+
+    fast, nx, ny = grid
+    if fast == "x":
+        Z = z.reshape(ny, nx)
+        xs, ys = x[:nx], y[::nx]
+    else:
+        Z = z.reshape(nx, ny).T
+        xs, ys = x[::ny], y[:ny]
+
+    if xs.shape[0] > 1 and xs[0] > xs[-1]:
+        xs, Z = xs[::-1], Z[:, ::-1]
+    if ys.shape[0] > 1 and ys[0] > ys[-1]:
+        ys, Z = ys[::-1], Z[::-1, :]
+
+    return xs, ys, Z
+
+
+def bin_scattered(x, y, z, bins):
+    """
+    Averages scattered points (x,y,z) on a regular grid of
+    bins (Int or (nx,ny)) with one bincount, empty cells are nan
+
+    Returns the centers of the cells along x and y and the (ny,nx) map
+    """
+
+    nx, ny = (bins, bins) if np.ndim(bins) == 0 else bins
+    valid = np.isfinite(x) & np.isfinite(y) & np.isfinite(z)
+    x, y, z = x[valid], y[valid], z[valid]
+
+    x_edges = np.linspace(x.min(), x.max(), nx+1)
+    y_edges = np.linspace(y.min(), y.max(), ny+1)
+    ix = np.clip(np.searchsorted(x_edges, x, side="right")-1, 0, nx-1)
+    iy = np.clip(np.searchsorted(y_edges, y, side="right")-1, 0, ny-1)
+    cell = iy*nx+ix
+
+    sums = np.bincount(cell, weights=z, minlength=nx*ny)
+    counts = np.bincount(cell, minlength=nx*ny)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        Z = (sums/counts).reshape(ny, nx)
+
+    return (x_edges[1:]+x_edges[:-1])/2, (y_edges[1:]+y_edges[:-1])/2, Z
+
+
+def edges(centers):
+    """
+    Cell edges around centers, for pcolormesh
+    """
+    if centers.shape[0] == 1:
+        return np.array([centers[0]-0.5, centers[0]+0.5])
+    middle = (centers[1:]+centers[:-1])/2
+    return np.concatenate([[2*centers[0]-middle[0]], middle, [2*centers[-1]-middle[-1]]])
@@ -0,0 +1,126 @@
+import os
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+
+# The figure reused by every job of a process
+_FIGURE = None
+
+
+def _use_agg():
+    """
+    Pool initializer, forces the non-interactive Agg backend
+    """
+    import matplotlib
+    matplotlib.use("Agg", force=True)
+    return
+
+
+def _figure(figsize=None, dpi=None):
+    """
+    Returns the figure of this process, created once on an Agg
+    canvas outside of pyplot so that it is never registered
+    with a GUI and its memory is reused from job to job
+    """
+
+    global _FIGURE
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    if _FIGURE is None:
+        _FIGURE = Figure()
+        FigureCanvasAgg(_FIGURE)
+    if figsize is not None:
+        _FIGURE.set_size_inches(figsize)
+    if dpi is not None:
+        _FIGURE.set_dpi(dpi)
+    return _FIGURE
+
+
+def _render_one(job, filename, figsize=None, dpi=None, kwargs={}):
+    """
+    Draws one job and saves it, returns the
+    elapsed time and the error message if any
+    """
+
+    dataset, parameter, measurement, fit = job
+    t0 = time.perf_counter()
+    try:
+        figure = _figure(figsize, dpi)
+        dataset.plot_1D(parameter, measurement, Fit=fit, Figure=figure, **kwargs)
+        figure.savefig(filename)
+        error = ""
+    except Exception as e:
+        error = "%s: %s" % (type(e).__name__, e)
+    finally:
+        # Drops the artists (and the data they reference) right away
+        if _FIGURE is not None:
+            _FIGURE.clear()
+        dataset.Graph = None
+    return time.perf_counter()-t0, error
+
+
+def _render_chunk(args):
+    jobs, filenames, figsize, dpi, kwargs = args
+    return [_render_one(job, filename, figsize, dpi, kwargs) for job, filename in zip(jobs, filenames)]
+
+
+def render(jobs, filenames, workers=None, chunksize=None, figsize=None, dpi=None, **kwargs):
+    """
+    Renders many DataSet.plot_1D figures to files with the
+    Agg backend, on a process pool. Each process draws every
+    job on the same figure, cleared after each save, so memory
+    does not grow with the number of figures and pyplot is
+    never involved.
+
+    Parameters:
+    ---------------------------------------------------------
+    jobs:       list of tuple(DataSet, parameter, measurement)
+                or tuple(DataSet, parameter, measurement, Fit)
+                with the arguments of DataSet.plot_1D
+    filenames:  list of str
+                One output file per job, the format is given by
+                the extension (Ex. .png, .pdf)
+    workers:    Int
+                Number of processes, defaults to os.cpu_count(),
+                1 renders in the current process
+    chunksize:  Int
+                Number of jobs sent to a process at once, by
+                default about 4 chunks per worker
+    figsize, dpi:   Passed to the figure
+    kwargs:     Passed to DataSet.plot_1D (Ex. color, marker)
+
+    Returns:
+    ---------------------------------------------------------
+    report:     np.ndarray structured with the fields "filename",
+                "time" (s) and "error" (empty if the figure was saved)
+    """
+
+    jobs = [tuple(job)+(None,)*(4-len(job)) for job in jobs]
+    filenames = [os.fspath(filename) for filename in filenames]
+    assert len(jobs) == len(filenames), "There must be one filename per job"
+
+    n = len(jobs)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(min(workers, n), 1)
+    if chunksize is None:
+        chunksize = max(-(-n//(4*workers)), 1)
+
+    if workers == 1:
+        results = _render_chunk((jobs, filenames, figsize, dpi, kwargs))
+    else:
+        chunks = [(jobs[i:i+chunksize], filenames[i:i+chunksize], figsize, dpi, kwargs)
+                  for i in range(0, n, chunksize)]
+        with ProcessPoolExecutor(workers, initializer=_use_agg) as pool:
+            results = [result for part in pool.map(_render_chunk, chunks) for result in part]
+
+    width = max([len(filename) for filename in filenames], default=1)
+    report = np.zeros(n, dtype=[("filename", "U%i" % max(width, 1)), ("time", np.float64), ("error", object)])
+    report["filename"] = filenames
+    for i, (elapsed, error) in enumerate(results):
+        report["time"][i] = elapsed
+        report["error"][i] = error
+
+    return report
@@ -1,4 +1,18 @@
-import Analysis.Functions
-import Analysis.Fit
-import Analysis.Experiment
-import Analysis.Strings
+"""
+The subpackages are imported when first accessed
+(Ex. Analysis.Experiment) so that import Analysis is cheap
+"""
+import importlib
+
+
+SUBPACKAGES = ("Functions", "Fit", "Experiment", "Strings", "Plot")
+
+
+def __getattr__(name):
+    if name in SUBPACKAGES:
+        return importlib.import_module("%s.%s" % (__name__, name))
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+
+def __dir__():
+    return sorted(list(globals())+list(SUBPACKAGES))
@@ -0,0 +1,49 @@
+"""
+Compares Analysis.Fit.batch_fit to a loop over Analysis.Fit.fit
+
+Usage:
+    python -m Analysis.benchmarks.bench_batch_fit [curves] [points]
+"""
+import sys
+import time
+import warnings
+import numpy as np
+from Analysis import Fit
+from Analysis import Functions as F
+
+
+# model: (true parameters, initial guess)
+MODELS = {
+    "linear": (F.linear, [2., 1.], [1., 0.]),
+    "exponential": (F.exponential, [1.5, 0.5], [1., 0.3]),
+    "power_law": (F.power_law, [2., 5., 0.5], [1.5, 6., 0.7]),
+    "sinus": (F.sinus, [1., 3., 0.5, 0.2], [1.1, 2.9, 0.4, 0.]),
+}
+
+
+def main(curves=1000, points=200):
+    rng = np.random.default_rng(0)
+    x = np.linspace(0, 4, points)
+    print("%12s %12s %12s %10s %14s" % ("model", "loop (s)", "batch (s)", "speedup", "median |dp|/|p|"))
+    for name, (function, p_true, p0) in MODELS.items():
+        P = np.array(p_true)*(1+0.05*rng.standard_normal((curves, len(p_true))))
+        Y = function(x, *[P[:, j:j+1] for j in range(P.shape[1])])
+        Y += rng.normal(0, 0.05, Y.shape)
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            t0 = time.perf_counter()
+            ref = np.array([Fit.fit(function, x, y, p0)[0] for y in Y])
+            t_loop = time.perf_counter()-t0
+
+            t0 = time.perf_counter()
+            params, err, converged = Fit.batch_fit(function, x, Y, p0)
+            t_batch = time.perf_counter()-t0
+
+        diff = np.median(np.max(np.abs(params-ref)/np.abs(ref), axis=1))
+        print("%12s %12.3f %12.3f %9.1fx %14.2e" % (name, t_loop, t_batch, t_loop/t_batch, diff))
+    return
+
+
+if __name__ == "__main__":
+    main(*[int(float(i)) for i in sys.argv[1:]])
@@ -0,0 +1,43 @@
+"""
+Times DataSet.derive on every measurement of a sweep: one
+np.gradient call per measurement against one batched call, and
+the Savitzky-Golay derivative on uniform and non-uniform grids
+(the kernels of uniform grids are cached after the first call)
+
+Usage:
+    python -m Analysis.benchmarks.bench_derive [points] [measurements] [window]
+"""
+import sys
+import time
+import numpy as np
+from Analysis.Experiment import DataSet, Parameter, Measurement
+from Analysis.Experiment import differentiate as D
+
+
+def timed(function, *args, **kwargs):
+    t0 = time.perf_counter()
+    function(*args, **kwargs)
+    return time.perf_counter()-t0
+
+
+def main(points=1000000, measurements=8, window=21):
+    rng = np.random.default_rng(0)
+    for grid in ("uniform", "non-uniform"):
+        if grid == "uniform":
+            x = np.linspace(0, 1, points)
+        else:
+            x = np.sort(rng.uniform(0, 1, points))
+        ds = DataSet([Parameter(x, "x", "")],
+                     [Measurement(np.sin(5*x)+rng.normal(0, 1e-3, points), "m%i" % i, "") for i in range(measurements)])
+        D.clear_weights()
+        print("%s grid, %i points, %i measurements" % (grid, points, measurements))
+        print("%30s %10.3f s" % ("np.gradient per measurement",
+                                 timed(lambda: [ds.derive(0, i) for i in range(measurements)])))
+        print("%30s %10.3f s" % ("np.gradient batched", timed(ds.derive, 0, None)))
+        print("%30s %10.3f s" % ("savgol (first call)", timed(ds.derive, 0, None, window=window, polyorder=3)))
+        print("%30s %10.3f s" % ("savgol (second call)", timed(ds.derive, 0, None, window=window, polyorder=3)))
+    return
+
+
+if __name__ == "__main__":
+    main(*[int(float(i)) for i in sys.argv[1:]])
@@ -0,0 +1,43 @@
+"""
+Times DataSet.fit_all with one worker, a thread pool and
+a process pool against a plain loop over Fit.fit
+
+Usage:
+    python -m Analysis.benchmarks.bench_fit_all [measurements] [points] [workers]
+"""
+import os
+import sys
+import time
+import warnings
+import numpy as np
+from Analysis import Functions as F
+from Analysis import Fit
+from Analysis.Experiment import Parameter, Measurement, DataSet
+
+
+def main(measurements=200, points=1000, workers=None):
+    if workers is None:
+        workers = os.cpu_count() or 1
+    rng = np.random.default_rng(0)
+    t = np.linspace(0, 10, points)
+    ds = DataSet(Parameter(t, "t", "s"),
+                 [Measurement(F.sinus(t, 1, w, 0.3, 0)+rng.normal(0, 0.05, points), "m%i" % i, "V")
+                  for i, w in enumerate(rng.uniform(1, 10, measurements))])
+
+    t0 = time.perf_counter()
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        for meas in ds.measurements:
+            Fit.fit(F.sinus, t, meas.data, None, cache=False)
+    print("%24s %10.3f s" % ("loop", time.perf_counter()-t0))
+
+    for executor, n in (("process", 1), ("thread", workers), ("process", workers)):
+        t0 = time.perf_counter()
+        table = ds.fit_all(F.sinus, workers=n, executor=executor)
+        print("%24s %10.3f s  (%i/%i converged)" % ("%s, %i workers" % (executor, n), time.perf_counter()-t0,
+                                                    table["converged"].sum(), measurements))
+    return
+
+
+if __name__ == "__main__":
+    main(*[int(float(i)) for i in sys.argv[1:]])
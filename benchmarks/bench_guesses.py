@@ -0,0 +1,73 @@
+"""
+Compares curve_fit started from its default p0 (all ones) with
+curve_fit started from the estimators of Analysis.Functions on
+random sinus, cosinus and power_law curves: success rate, mean
+number of model evaluations and wall time
+
+Usage:
+    python -m Analysis.benchmarks.bench_guesses [curves] [points]
+"""
+import sys
+import time
+import warnings
+import numpy as np
+from scipy.optimize import curve_fit
+from Analysis import Functions as F
+
+
+def sinusoid(function, rng, points):
+    t = np.sort(rng.uniform(0, 10, points))
+    p = np.array([rng.uniform(0.5, 3), rng.uniform(0.5, 20), rng.uniform(-3, 3), rng.uniform(-2, 2)])
+    return t, function(t, *p)+rng.normal(0, 0.1, points), p, 1
+
+
+def critical(function, rng, points):
+    b = rng.uniform(1, 5)
+    x = np.linspace(0, 0.95*b, points)
+    p = np.array([rng.uniform(1, 5), b, rng.uniform(-2, -0.3)])
+    return x, function(x, *p)*(1+rng.normal(0, 0.01, points)), p, 2
+
+
+MODELS = {
+    "sinus": (F.sinus, sinusoid),
+    "cosinus": (F.cosinus, sinusoid),
+    "power_law": (F.power_law, critical),
+}
+
+
+def run(function, x, y, p0):
+    """
+    Returns (nfev, parameters) or (nfev, None) on failure
+    """
+    try:
+        popt, pcov, info, msg, ier = curve_fit(function, x, y, p0=p0, full_output=True, maxfev=5000)
+        return info["nfev"], popt
+    except RuntimeError:
+        return 5000, None
+
+
+def main(curves=50, points=400):
+    rng = np.random.default_rng(0)
+    print("%12s %10s %10s %10s %10s %10s %10s" % ("model", "ok (1)", "ok (est)", "nfev (1)", "nfev (est)", "1 (ms)", "est (ms)"))
+    for name, (function, generate) in MODELS.items():
+        ok = np.zeros(2, dtype=int)
+        nfev = np.zeros(2)
+        elapsed = np.zeros(2)
+        for i in range(curves):
+            x, y, p, check = generate(function, rng, points)
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                for j in range(2):
+                    t0 = time.perf_counter()
+                    p0 = None if j == 0 else F.guesses.guess(function, x, y)
+                    n, popt = run(function, x, y, p0)
+                    elapsed[j] += time.perf_counter()-t0
+                    nfev[j] += n
+                    ok[j] += popt is not None and abs(popt[check]-p[check]) <= 1e-2*abs(p[check])
+        print("%12s %10i %10i %10.1f %10.1f %10.2f %10.2f" % (name, ok[0], ok[1], nfev[0]/curves,
+                                                            nfev[1]/curves, 1e3*elapsed[0]/curves, 1e3*elapsed[1]/curves))
+    return
+
+
+if __name__ == "__main__":
+    main(*[int(float(i)) for i in sys.argv[1:]])
@@ -0,0 +1,71 @@
+"""
+Measures the import time of Analysis with python -X importtime
+in a fresh interpreter for a few typical entry points, and checks
+that the headless ones do not load matplotlib or scipy.
+
+Exits with status 1 if an entry point takes longer than max_ms
+or loads a module it should not, so it can guard against
+regressions in a CI job.
+
+Usage:
+    python -m Analysis.benchmarks.bench_import [max_ms] [repeats]
+"""
+import os
+import sys
+import subprocess
+
+
+# statement: modules that must not be imported by it
+ENTRY_POINTS = {
+    "import Analysis": ("matplotlib", "scipy"),
+    "from Analysis.Experiment import readfile": ("matplotlib", "scipy"),
+    "from Analysis.Fit import fit, batch_fit": ("matplotlib", "scipy"),
+    "from Analysis.Plot import Plot_1D": ("matplotlib",),
+}
+
+
+def importtime(statement):
+    """
+    Returns the cumulative import time in ms of every module
+    imported directly by statement (not by another module) and
+    the names of all the modules imported
+    """
+
+    # The parent of the package must be on the path
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([root, os.environ.get("PYTHONPATH", "")]))
+    res = subprocess.run([sys.executable, "-X", "importtime", "-c", statement],
+                         env=env, capture_output=True, text=True, check=True)
+
+    times = {}
+    modules = set()
+    for line in res.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative, name = line[len("import time:"):].split("|")
+        modules.add(name.strip())
+        # Nested imports are indented, their time is in their parent's
+        if name.startswith("  "):
+            continue
+        name = name.strip()
+        times[name] = times.get(name, 0)+int(cumulative)/1e3
+    return times, modules
+
+
+def main(max_ms=1000, repeats=5):
+    failed = False
+    print("%45s %10s %10s %s" % ("statement", "best (ms)", "Analysis", "forbidden modules loaded"))
+    for statement, forbidden in ENTRY_POINTS.items():
+        runs = [importtime(statement) for i in range(repeats)]
+        total = min(sum(times.values()) for times, modules in runs)
+        own = min(sum(t for name, t in times.items() if name.split(".")[0] == "Analysis") for times, modules in runs)
+        loaded = [name for name in forbidden if any(name in modules for times, modules in runs)]
+        print("%45s %10.1f %10.1f %s" % (statement, total, own, ", ".join(loaded) or "-"))
+        failed |= total > max_ms or len(loaded) > 0
+    if failed:
+        sys.exit(1)
+    return
+
+
+if __name__ == "__main__":
+    main(*[int(float(i)) for i in sys.argv[1:]])
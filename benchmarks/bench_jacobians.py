@@ -0,0 +1,50 @@
+"""
+Reports the number of model evaluations and the wall time of
+curve_fit with finite differences and with the analytic
+Jacobians of Analysis.Functions
+
+Usage:
+    python -m Analysis.benchmarks.bench_jacobians [repeats] [points]
+"""
+import sys
+import time
+import warnings
+import numpy as np
+from scipy.optimize import curve_fit
+from Analysis import Functions as F
+
+
+# model: (true parameters, initial guess)
+MODELS = {
+    "linear": (F.linear, [2., 1.], [1., 0.]),
+    "quadratic": (F.quadratic, [2., 0.5, 1.], [1., 0., 0.]),
+    "exponential": (F.exponential, [1.5, 0.5], [1., 0.3]),
+    "sinus": (F.sinus, [1., 3., 0.5, 0.2], [1.1, 2.9, 0.4, 0.]),
+    "cosinus": (F.cosinus, [1., 3., 0.5, 0.2], [1.1, 2.9, 0.4, 0.]),
+    "power_law": (F.power_law, [2., 5., 0.5], [1.5, 6., 0.7]),
+}
+
+
+def run(function, x, y, p0, jac, repeats):
+    t0 = time.perf_counter()
+    for i in range(repeats):
+        popt, pcov, info, msg, ier = curve_fit(function, x, y, p0=p0, jac=jac, full_output=True)
+    return info["nfev"], info.get("njev", 0), (time.perf_counter()-t0)/repeats
+
+
+def main(repeats=200, points=1000):
+    rng = np.random.default_rng(0)
+    x = np.linspace(0, 4, points)
+    print("%12s %10s %10s %10s %12s %12s" % ("model", "nfev (fd)", "nfev (jac)", "njev", "fd (ms)", "jac (ms)"))
+    for name, (function, p_true, p0) in MODELS.items():
+        y = function(x, *p_true)+rng.normal(0, 0.05, points)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            nfev_fd, njev_fd, t_fd = run(function, x, y, p0, None, repeats)
+            nfev_jac, njev, t_jac = run(function, x, y, p0, F.jacobians.get_jacobian(function, len(p0)), repeats)
+        print("%12s %10i %10i %10i %12.3f %12.3f" % (name, nfev_fd, nfev_jac, njev, 1e3*t_fd, 1e3*t_jac))
+    return
+
+
+if __name__ == "__main__":
+    main(*[int(float(i)) for i in sys.argv[1:]])
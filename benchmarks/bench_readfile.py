@@ -0,0 +1,60 @@
+"""
+Compares Analysis.Experiment.readfile to the former
+np.genfromtxt(...).T path, and its single threaded
+parse to a thread pool of os.cpu_count() workers
+
+Usage:
+    python -m Analysis.benchmarks.bench_readfile [rows ...]
+"""
+import os
+import sys
+import time
+import tempfile
+import numpy as np
+from Analysis import Experiment as E
+
+
+def write_file(filename, rows, columns=3):
+    """
+    Writes a sweep like file of random data in blocks
+    """
+
+    block = 10**5
+    with open(filename, "w") as f:
+        for start in range(0, rows, block):
+            n = min(block, rows-start)
+            data = np.random.rand(n, columns)
+            data[:, 0] = np.arange(start, start+n)
+            np.savetxt(f, data, fmt="%.10e")
+    return
+
+
+def timeit(function, *args, **kwargs):
+    t0 = time.perf_counter()
+    function(*args, **kwargs)
+    return time.perf_counter()-t0
+
+
+def main(sizes):
+    workers = os.cpu_count() or 1
+    print("%10s %14s %14s %10s %14s" % ("rows", "genfromtxt (s)", "readfile (s)", "speedup",
+                                        "%i threads (s)" % workers))
+    for rows in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            filename = os.path.join(tmp, "sweep.txt")
+            write_file(filename, rows)
+
+            t_ref = timeit(lambda: np.genfromtxt(filename).T)
+            t_new = timeit(E.readfile, filename, ("V", "V"), [("I", "A"), ("R", "ohm")])
+            t_threads = timeit(E.readfile, filename, ("V", "V"), [("I", "A"), ("R", "ohm")], workers=workers)
+
+        print("%10i %14.3f %14.3f %9.1fx %14.3f" % (rows, t_ref, t_new, t_ref/t_new, t_threads))
+    return
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        sizes = [int(float(i)) for i in sys.argv[1:]]
+    else:
+        sizes = [10**5, 10**6, 10**7]
+    main(sizes)
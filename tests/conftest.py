@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The repository is the Analysis package, its parent must be importable
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+import Analysis.Functions as F
+from Analysis.Fit import batch_fit
+
+curve_fit = pytest.importorskip("scipy.optimize").curve_fit
+
+
+@pytest.fixture
+def curves():
+    x = np.linspace(0, 5, 100)
+    rng = np.random.default_rng(0)
+    P = np.array([[1, -0.5], [2, -1.], [0.5, 0.3]])
+    Y = np.stack([F.exponential(x, *p) for p in P])+rng.normal(0, 0.01, (3, 100))
+    return x, Y
+
+
+def test_matches_curve_fit(curves):
+    x, Y = curves
+    p0 = np.array([1, -0.1])
+    params, err, converged = batch_fit(F.exponential, x, Y, p0)
+    assert np.all(converged)
+    for i in range(Y.shape[0]):
+        ref, cov = curve_fit(F.exponential, x, Y[i], p0)
+        assert np.allclose(params[i], ref, rtol=1e-5)
+        assert np.allclose(err[i], np.sqrt(np.diag(cov)), rtol=1e-3)
+
+
+def test_sigma_and_nan_match_curve_fit(curves):
+    x, Y = curves
+    Y = Y.copy()
+    Y[1, 10:20] = np.nan
+    sigma = np.linspace(0.01, 0.02, x.shape[0])
+    params, err, converged = batch_fit(F.exponential, x, Y, [1, -0.1], sigma=sigma)
+    keep = np.isfinite(Y[1])
+    ref, cov = curve_fit(F.exponential, x[keep], Y[1, keep], [1, -0.1], sigma=sigma[keep])
+    assert np.allclose(params[1], ref, rtol=1e-5)
+    assert np.allclose(err[1], np.sqrt(np.diag(cov)), rtol=1e-3)
+
+
+def test_divergent_curve_is_not_converged(curves):
+    x, Y = curves
+    # exp(1000*x) overflows, no step can lower the cost of the second curve
+    p0 = np.array([[1, -0.1], [1, 1000.], [1, -0.1]])
+    with np.errstate(over="ignore", invalid="ignore"):
+        params, err, converged = batch_fit(F.exponential, x, Y, p0)
+    assert list(converged) == [True, False, True]
+    assert np.array_equal(params[1], p0[1]) and np.all(np.isinf(err[1]))
+    ref = curve_fit(F.exponential, x, Y[0], p0[0])[0]
+    assert np.allclose(params[0], ref, rtol=1e-5)
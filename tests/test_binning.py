@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+from Analysis.Experiment import DataSet, BinAccumulator, bin_edges
+
+
+@pytest.fixture
+def sweep():
+    rng = np.random.default_rng(0)
+    x = rng.uniform(0, 1, 2000)
+    x[:3] = [0., 1., np.nan]
+    Y = np.stack([np.sin(5*x)+rng.normal(0, 0.1, x.shape[0]), rng.normal(100, 1, x.shape[0])])
+    return x, Y
+
+
+def reference(x, y, edges):
+    # np.histogram puts the right edge in the last bin
+    index = np.digitize(x, edges[1:-1])
+    keep = np.isfinite(x) & (x >= edges[0]) & (x <= edges[-1])
+    groups = [y[keep & (index == i)] for i in range(edges.shape[0]-1)]
+    return groups, np.histogram(x[np.isfinite(x)], edges)[0]
+
+
+@pytest.mark.parametrize("edges", [bin_edges(0.05, (0, 1)), np.array([0., 0.1, 0.15, 0.5, 0.9, 1.])])
+def test_statistics_match_numpy(sweep, edges):
+    x, Y = sweep
+    acc = BinAccumulator(edges)
+    # Chunks merged with the pairwise update give the one pass result
+    for start in range(0, x.shape[0], 333):
+        acc.add_arrays(x[start:start+333], Y[:, start:start+333])
+    for m in range(Y.shape[0]):
+        groups, counts = reference(x, Y[m], edges)
+        assert np.array_equal(acc.count, counts)
+        assert np.allclose(acc.mean[m], [group.mean() for group in groups])
+        assert np.allclose(acc.std()[m], [group.std(ddof=1) for group in groups])
+        assert np.array_equal(acc.min[m], [group.min() for group in groups])
+        assert np.array_equal(acc.max[m], [group.max() for group in groups])
+
+
+def test_dataset_bin(sweep):
+    x, Y = sweep
+    ds = DataSet.from_block(np.vstack([x, Y]), ("V", "V"), [("I", "A"), ("R", "ohm")])
+    binned = ds.bin(0, np.array([0., 0.2, 0.21, 0.22, 1.]), empty=True)
+    names = [meas.name for meas in binned.measurements]
+    assert names == ["I", "I_min", "I_max", "R", "R_min", "R_max", "count"]
+    groups, counts = reference(x, Y[0], np.array([0., 0.2, 0.21, 0.22, 1.]))
+    assert np.array_equal(binned.measurements[-1].data, counts)
+    assert np.allclose(binned.parameters[0].data, [0.1, 0.205, 0.215, 0.61])
+    assert np.allclose(binned.measurements[0].data, [group.mean() for group in groups], equal_nan=True)
+    sem = [group.std(ddof=1)/np.sqrt(group.shape[0]) for group in groups]
+    assert np.allclose(binned.measurements[0].err, sem, equal_nan=True)
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+import Analysis.Functions as F
+from Analysis import Fit
+from Analysis.Experiment import DataSet
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    Fit.set_cache(disk=False)
+    Fit.clear_cache()
+    yield
+    Fit.clear_cache()
+
+
+@pytest.fixture
+def sweep():
+    t = np.linspace(0, 10, 200)
+    y = F.sinus(t, 2, 1.3, 0.4, 0.5)+np.random.default_rng(0).normal(0, 0.05, t.shape[0])
+    return t, y
+
+
+def test_fit_is_cached_only_on_request(sweep):
+    t, y = sweep
+    Fit.fit(F.sinus, t, y, None)
+    assert Fit.cache_stats()["size"] == 0
+    first = Fit.fit(F.sinus, t, y, None, cache=True)
+    second = Fit.fit(F.sinus, t, y, None, cache=True)
+    stats = Fit.cache_stats()
+    assert stats["misses"] == 1 and stats["hits"] == 1
+    assert np.array_equal(first[0], second[0]) and np.array_equal(first[1], second[1])
+
+
+def test_closures_are_keyed_by_value(sweep):
+    t, y = sweep
+
+    def model(scale):
+        return lambda x, a, b: scale*F.linear(x, a, b)
+
+    Fit.fit(model(1.), t, y, [1., 0.], cache=True)
+    Fit.fit(model(2.), t, y, [1., 0.], cache=True)
+    assert Fit.cache_stats()["hits"] == 0
+
+
+def test_plot_1D_redraw_hits_the_cache(sweep):
+    matplotlib = pytest.importorskip("matplotlib")
+    matplotlib.use("Agg")
+    from matplotlib import pyplot as plt
+    t, y = sweep
+    ds = DataSet.from_block(np.stack([t, y]), ("t", "s"), [("y", "V")])
+    first = ds.plot_1D(0, 0, Fit="sinus", cache=True)
+    second = ds.plot_1D(0, 0, Fit="sinus", cache=True)
+    plt.close("all")
+    assert Fit.cache_stats()["hits"] == 1
+    assert np.array_equal(first[2], second[2])
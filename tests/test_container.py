@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+from Analysis.Experiment import Parameter, Measurement, Variable, DataSet, load, read_header
+
+
+N = 1000
+
+
+@pytest.fixture
+def dataset():
+    rng = np.random.default_rng(0)
+    x = Parameter(np.linspace(0, 1, N), "V", "V")
+    current = Measurement(rng.normal(size=N), "I", "A", err=rng.uniform(0.1, 0.2, N), label="current")
+    counts = Measurement(np.arange(N, dtype=np.int64), "n", "", err=0.5)
+    ds = DataSet([x], [current, counts])
+    ds.variables = [Variable(np.arange(3.), "T", "K")]
+    return ds
+
+
+@pytest.mark.parametrize("compression", [None, "zlib", "lzma"])
+@pytest.mark.parametrize("mmap", [True, False])
+def test_round_trip(tmp_path, dataset, compression, mmap):
+    path = str(tmp_path/"sweep.dat")
+    dataset.save(path, compression=compression, chunk_rows=300)
+    res = load(path, mmap=mmap)
+
+    for saved, loaded in zip(dataset.parameters+dataset.measurements, res.parameters+res.measurements):
+        assert (loaded.name, loaded.unit, loaded.label) == (saved.name, saved.unit, saved.label)
+        assert loaded.data.dtype == saved.data.dtype
+        assert np.array_equal(loaded.data, saved.data)
+    assert np.array_equal(res.measurements[0].err, dataset.measurements[0].err)
+    # A scalar err is stored as a number, not as a column
+    assert read_header(path)["measurements"][1]["err"] == 0.5
+    assert np.all(res.measurements[1].err == 0.5)
+    assert type(read_header(path)["measurements"][0]["err"]) is dict
+    assert res.parameters[0].err is None
+    assert res.variables[0].name == "T" and np.array_equal(res.variables[0].data, np.arange(3.))
+    assert read_header(path)["compression"] == compression
+
+
+@pytest.mark.parametrize("compression", [None, "zlib", "lzma"])
+def test_partial_reads(tmp_path, dataset, compression):
+    path = str(tmp_path/"sweep.dat")
+    dataset.save(path, compression=compression, chunk_rows=300)
+    # 250:650 starts in the first chunk and ends in the third
+    for start, stop in [(250, 650), (0, 300), (299, 301), (900, None), (None, 10), (500, 500)]:
+        res = load(path, measurements=["I"], start=start, stop=stop)
+        rows = slice(start, stop)
+        assert len(res.measurements) == 1
+        assert np.array_equal(res.parameters[0].data, dataset.parameters[0].data[rows])
+        assert np.array_equal(res.measurements[0].data, dataset.measurements[0].data[rows])
+        assert np.array_equal(res.measurements[0].err, dataset.measurements[0].err[rows])
+
+
+def test_selection_by_name_and_index(tmp_path, dataset):
+    path = str(tmp_path/"sweep.dat")
+    dataset.save(path)
+    assert [meas.name for meas in load(path, measurements=[1, "I"]).measurements] == ["n", "I"]
+    assert [meas.name for meas in load(path, measurements="n").measurements] == ["n"]
+    assert [param.name for param in load(path, parameters=0).parameters] == ["V"]
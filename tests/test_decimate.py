@@ -0,0 +1,73 @@
+import numpy as np
+from Analysis.Plot.decimate import minmax, lttb, Decimator, block_mean
+
+
+def curve(n=20000):
+    rng = np.random.default_rng(0)
+    x = np.sort(rng.uniform(0, 10, n))
+    y = np.sin(x)+rng.normal(0, 0.1, n)
+    y[1234] = 5.
+    return x, y
+
+
+def test_minmax_keeps_the_extrema_of_every_bucket():
+    x, y = curve()
+    index = minmax(x, y, 100)
+    assert index[0] == 0 and index[-1] == x.shape[0]-1 and np.all(np.diff(index) > 0)
+    bucket = np.minimum(((x-x[0])/(x[-1]-x[0])*100).astype(np.int64), 99)
+    for b in range(100):
+        points = np.flatnonzero(bucket == b)
+        kept = index[bucket[index] == b]
+        assert y[kept].min() == y[points].min() and y[kept].max() == y[points].max()
+    assert 1234 in index
+
+
+def reference_lttb(x, y, n_out):
+    # Direct transcription of Steinarsson's algorithm
+    n = x.shape[0]
+    edges = np.linspace(1, n-1, n_out-1).astype(np.int64)
+    index, a = [0], 0
+    for i in range(n_out-2):
+        stop = edges[i+2] if i+2 < n_out-1 else n
+        cx, cy = x[edges[i+1]:stop].mean(), y[edges[i+1]:stop].mean()
+        best, area = None, -1
+        for j in range(edges[i], edges[i+1]):
+            s = abs((x[a]-cx)*(y[j]-y[a])-(x[a]-x[j])*(cy-y[a]))
+            if s > area:
+                best, area = j, s
+        index.append(best)
+        a = best
+    return np.array(index+[n-1])
+
+
+def test_lttb_matches_the_reference():
+    x, y = curve(3000)
+    assert np.array_equal(lttb(x, y, 200), reference_lttb(x, y, 200))
+    assert np.array_equal(lttb(x, y, 5000), np.arange(3000))
+
+
+def test_decimator_orders():
+    x, y = curve(10000)
+    decreasing = Decimator(x[::-1], y[::-1])
+    assert decreasing.monotonic and np.array_equal(decreasing.x, x)
+    assert np.array_equal(decreasing.x[decreasing.index(pixels=50)], x[minmax(x, y, 50)])
+
+    # An up and down sweep keeps its acquisition order
+    loop = Decimator(np.concatenate([x, x[::-1]]), np.concatenate([y, -y[::-1]]))
+    index = loop.index(pixels=50)
+    assert not loop.monotonic and np.all(np.diff(index) > 0)
+    assert loop.y[index].max() == 5. and loop.y[index].min() == -5.
+    inside = loop.index((2, 3), pixels=50)
+    assert np.all((loop.x[inside] >= 2) & (loop.x[inside] <= 3))
+
+
+def test_block_mean_matches_nanmean():
+    rng = np.random.default_rng(1)
+    Z = rng.normal(size=(37, 53))
+    Z[3, 4] = np.nan
+    xs, ys = np.arange(53.), np.arange(37.)
+    bx, by, B = block_mean(xs, ys, Z, (10, 10))
+    ky, kx = 4, 6
+    ref = np.array([[np.nanmean(Z[i*ky:(i+1)*ky, j*kx:(j+1)*kx]) for j in range(53//kx)] for i in range(37//ky)])
+    assert np.allclose(B, ref)
+    assert np.allclose(bx, xs[:48].reshape(8, 6).mean(axis=1)) and np.allclose(by, ys[:36].reshape(9, 4).mean(axis=1))
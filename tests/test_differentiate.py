@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+from Analysis.Experiment.differentiate import differentiate, clear_weights
+from math import factorial
+
+
+@pytest.fixture
+def curves():
+    rng = np.random.default_rng(0)
+    x = np.linspace(0, 3, 301)
+    Y = np.stack([np.sin(2*x), x**3-x])+rng.normal(0, 1e-3, (2, x.shape[0]))
+    return x, Y
+
+
+def reference_savgol(x, y, window, order, polyorder):
+    # One np.polyfit per point over the same window as differentiate
+    n, half = x.shape[0], window//2
+    out = np.empty(n)
+    for i in range(n):
+        start = min(max(i-half, 0), n-window)
+        xs = x[start:start+window]-x[i]
+        coefficients = np.polyfit(xs, y[start:start+window], polyorder)
+        out[i] = factorial(order)*coefficients[polyorder-order]
+    return out
+
+
+def test_gradient_matches_numpy(curves):
+    x, Y = curves
+    assert np.allclose(differentiate(x, Y), np.gradient(Y, x, axis=1))
+    twice = np.gradient(np.gradient(Y, x, axis=1), x, axis=1)
+    assert np.allclose(differentiate(x, Y, order=2), twice)
+    assert np.allclose(differentiate(x, Y, order=2, chunk_size=17), twice)
+
+
+@pytest.mark.parametrize("order,window,polyorder", [(1, 11, 2), (2, 15, 3), (1, 7, 4)])
+def test_uniform_savgol_matches_scipy(curves, order, window, polyorder):
+    signal = pytest.importorskip("scipy.signal")
+    clear_weights()
+    x, Y = curves
+    h = x[1]-x[0]
+    ref = signal.savgol_filter(Y, window, polyorder, deriv=order, delta=h, mode="interp", axis=1)
+    result = differentiate(x, Y, order, window, polyorder)
+    assert np.allclose(result, ref, rtol=1e-6, atol=1e-6*np.abs(ref).max())
+    assert np.allclose(differentiate(x, Y, order, window, polyorder, chunk_size=50), result)
+
+
+def test_non_uniform_savgol_matches_polyfit(curves):
+    x, Y = curves
+    x = x+0.3*(x[1]-x[0])*np.sin(7*x)
+    result = differentiate(x, Y, 1, 9, 3)
+    for i in range(Y.shape[0]):
+        ref = reference_savgol(x, Y[i], 9, 1, 3)
+        assert np.allclose(result[i], ref, rtol=1e-6, atol=1e-6*np.abs(ref).max())
+    assert np.allclose(differentiate(x, Y, 1, 9, 3, chunk_size=40), result)
+
+
+def test_memmap_output(tmp_path, curves):
+    x, Y = curves
+    out = differentiate(x, Y, 1, 11, 2, out=str(tmp_path/"derivative.dat"), chunk_size=64)
+    assert isinstance(out, np.memmap)
+    assert np.allclose(out, differentiate(x, Y, 1, 11, 2))
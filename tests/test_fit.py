@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+import Analysis.Functions as F
+from Analysis.Fit import fit
+
+
+def test_linear_nan_raises():
+    x = np.linspace(0, 1, 20)
+    y = 2*x+1
+    y[3] = np.nan
+    with pytest.raises(ValueError):
+        fit(F.linear, x, y, None)
+
+
+def test_quadratic_holds_b():
+    x = np.linspace(-1, 1, 50)
+    y = F.quadratic(x, 2., 0.5, 1.)
+    params, err = fit(F.quadratic, x, y, [1., 0.25, 0.])
+    assert params[1] == 0.25 and err[1] == np.inf
+    assert np.allclose(F.quadratic(x, *params), y)
+
+
+def test_models_namespace():
+    models = [name for name, value in F.__dict__.items() if callable(value)]
+    assert sorted(models) == ["cosinus", "exponential", "linear", "power_law", "quadratic", "sinus"]
+
+
+def test_flags_are_not_parameters():
+    from Analysis.Fit.fit import _n_params
+    assert _n_params(F.sinus, None) == 4
+    assert _n_params(F.power_law, None) == 3
+
+
+def test_short_p0_fits_the_first_parameters():
+    x = np.linspace(0, 1, 20)
+    y = 2*x
+    params, err = fit(F.linear, x, y, [1.])
+    assert params.shape == (1,) and np.isclose(params[0], 2)
+    params, err = fit(F.quadratic, x, 3*x**2, [1.])
+    assert params.shape == (1,) and np.isclose(params[0], 3)
+
+
+def test_bounded_linear_fit_starts_from_the_solution():
+    x = np.linspace(0, 1, 20)
+    y = 2*x+1
+    params, err = fit(F.linear, x, y, [-5., 10.], bounds=([0, 0], [1.5, 10]))
+    assert np.isclose(params[0], 1.5)
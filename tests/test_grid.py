@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+from Analysis.Plot.grid import uniform, detect_grid, reshape_grid, bin_scattered, edges
+
+
+def surface(x, y):
+    return np.sin(x)*np.cos(2*y)+x*y
+
+
+@pytest.mark.parametrize("fast", ["x", "y"])
+@pytest.mark.parametrize("reverse", [False, True])
+def test_gridded_sweep_is_reshaped(fast, reverse):
+    xs, ys = np.linspace(0, 2, 7), np.linspace(-1, 1, 5)
+    if reverse:
+        ys = ys[::-1]
+    if fast == "x":
+        Y, X = np.meshgrid(ys, xs, indexing="ij")
+    else:
+        X, Y = np.meshgrid(xs, ys, indexing="ij")
+    x, y = X.ravel(), Y.ravel()
+    grid = detect_grid(x, y)
+    assert grid == (fast, 7, 5)
+    gx, gy, Z = reshape_grid(x, y, surface(x, y), grid)
+    assert np.array_equal(gx, np.sort(xs)) and np.array_equal(gy, np.sort(ys))
+    assert np.array_equal(Z, surface(*np.meshgrid(gx, gy)))
+    assert uniform(gx) and uniform(gy)
+
+
+def test_scattered_points_are_binned_like_scipy():
+    stats = pytest.importorskip("scipy.stats")
+    rng = np.random.default_rng(0)
+    x, y = rng.uniform(0, 1, 500), rng.uniform(-1, 1, 500)
+    z = surface(x, y)
+    assert detect_grid(x, y) is None
+    cx, cy, Z = bin_scattered(x, y, z, (8, 6))
+    ref = stats.binned_statistic_2d(x, y, z, "mean", [8, 6])
+    assert np.allclose(Z, ref.statistic.T, equal_nan=True)
+    assert np.allclose(cx, (ref.x_edge[1:]+ref.x_edge[:-1])/2)
+    assert np.allclose(cy, (ref.y_edge[1:]+ref.y_edge[:-1])/2)
+
+
+def test_edges_and_uniform():
+    centers = np.array([0., 1., 3.])
+    assert np.array_equal(edges(centers), [-0.5, 0.5, 2., 4.])
+    assert not uniform(centers) and uniform(np.arange(10.)*0.1)
@@ -0,0 +1,45 @@
+import numpy as np
+from Analysis.Experiment import LiveDataSet
+
+
+def filled():
+    rng = np.random.default_rng(0)
+    live = LiveDataSet(("V", "V"), [("I", "A"), ("R", "ohm")], capacity=4)
+    rows = np.stack([np.arange(50.), rng.normal(size=50), rng.normal(size=50)], axis=1)
+    rows[[3, 17, 30], 1] = np.nan
+    rows[20, 2] = np.nan
+    for row in rows[:10]:
+        live.append(row)
+    live.extend(rows[10:25])
+    live.append(rows[25])
+    live.extend(rows[26:])
+    return live
+
+
+def test_running_statistics_match_numpy():
+    live = filled()
+    assert len(live) == 50 and live.parameters[0].data.shape == (50,)
+    for i in range(2):
+        data = live.measurements[i].data
+        assert np.isclose(live.mean(i), np.nanmean(data))
+        assert np.isclose(live.var(i), np.nanvar(data, ddof=1))
+        assert live.count(i) == np.isfinite(data).sum()
+        assert live.min(0, i) == np.nanmin(data)
+        assert live.argmax(0, i) == np.nanargmax(data)
+
+
+def test_interval_extrema_skip_nan():
+    live = filled()
+    data = live.measurements[0].data
+    assert live.min(0, 0, 2., 20.) == np.nanmin(data[2:20])
+    assert live.argmax(0, 0, 2., 20.) == 2+np.nanargmax(data[2:20])
+
+
+def test_columns_follow_appends():
+    live = LiveDataSet(("V", "V"), [("I", "A")], capacity=1)
+    live.append([0., 1.])
+    first = live.measurements[0]
+    live.extend([[1., 2.], [2., 3.]])
+    assert live.measurements[0] is first
+    assert np.array_equal(first.data, [1., 2., 3.])
+    assert live.block.shape == (2, 3)
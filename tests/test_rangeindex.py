@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+from Analysis.Experiment.rangeindex import RangeIndex
+from Analysis.Experiment import DataSet, Parameter, Measurement
+
+
+@pytest.mark.parametrize("n,block_size", [(129, 6), (1400, 64), (5000, 64), (1000, 7), (64*22+5, 64)])
+def test_every_interval_matches_numpy(n, block_size):
+    rng = np.random.default_rng(n)
+    data = rng.normal(size=n)
+    index = RangeIndex(data, block_size)
+    starts = rng.integers(0, n, 300)
+    stops = rng.integers(1, n+1, 300)
+    for start, stop in zip(starts, stops):
+        if start >= stop:
+            continue
+        assert index.argmin(start, stop) == start+np.argmin(data[start:stop])
+        assert index.argmax(start, stop) == start+np.argmax(data[start:stop])
+    # Runs of whole blocks whose length is not a power of two
+    n_blocks = n//block_size
+    for blocks in range(1, n_blocks+1):
+        assert index.argmin(0, blocks*block_size) == np.argmin(data[:blocks*block_size])
+        assert index.argmax(0, blocks*block_size) == np.argmax(data[:blocks*block_size])
+
+
+@pytest.mark.parametrize("n", [1400, 5000])
+def test_dataset_max_with_range_index(n):
+    x = np.linspace(0, 1, n)
+    y = np.random.default_rng(0).random(n)
+    ds = DataSet([Parameter(x, "x", "")], [Measurement(y, "y", "")])
+    ds.measurements[0].build_range_index()
+    stop = ds.parameters[0].where(0.99)
+    assert ds.max(0, 0, 0.0, 0.99) == y[:stop].max()
+    assert ds.argmin(0, 0, 0.0, 0.99) == np.argmin(y[:stop])
+
+
+def test_nan_gives_nan_like_numpy():
+    data = np.random.default_rng(1).normal(size=129)
+    data[50] = np.nan
+    index = RangeIndex(data, 6)
+    assert np.isnan(index.min(0, 100))
+    assert index.argmax(0, 100) == np.argmax(data[:100])
+    assert index.min(60, 129) == data[60:].min()
+
+    meas = Measurement(data, "y", "")
+    meas.build_range_index()
+    assert np.isnan(meas.min(slice(0, 129)))
+    assert np.isnan(meas.max(slice(10, 60)))
@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+from Analysis.Experiment import readfile, readfile_chunks
+from Analysis.Experiment.parser import parse_columns, _parse_block
+
+
+@pytest.fixture
+def two_columns(tmp_path):
+    path = tmp_path/"sweep.txt"
+    np.savetxt(path, np.stack([np.arange(5.), np.arange(5.)**2], axis=1))
+    return str(path)
+
+
+def test_extra_names_are_ignored(two_columns):
+    ds = readfile(two_columns, ("a", "u"), [("b", "u"), ("c", "u")])
+    assert [meas.name for meas in ds.measurements] == ["b"]
+    assert np.array_equal(ds.measurements[0].data, np.arange(5.)**2)
+    measurements = readfile(two_columns, ("a", "u"), [("b", "u"), ("c", "u")], Out="Measurements")
+    assert len(measurements) == 1
+
+
+def test_extra_names_in_chunks(two_columns):
+    chunks = list(readfile_chunks(two_columns, ("a", "u"), [("b", "u"), ("c", "u")], chunk_rows=2))
+    assert [len(chunk.measurements) for chunk in chunks] == [1, 1, 1]
+
+
+def test_missing_names_raise(tmp_path):
+    path = tmp_path/"sweep.txt"
+    np.savetxt(path, np.ones((4, 3)))
+    with pytest.raises(ValueError):
+        readfile(str(path), ("a", "u"), [("b", "u")])
+
+
+def test_single_column_with_missing_values(tmp_path):
+    path = tmp_path/"column.txt"
+    path.write_text("1\n2\nnan\n\n4\n")
+    assert _parse_block(b"1\n2\n\n4\n").shape == (3, 1)
+    assert _parse_block(b"1 a 3\n").shape == (1, 3)
+    assert parse_columns(str(path)).shape == (1, 4)
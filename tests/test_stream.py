@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+from Analysis.Experiment import (readfile, readfile_chunks, stream_min, stream_argmin, stream_max, stream_argmax,
+                                 stream_mean, stream_histogram)
+
+NAMES = (("V", "V"), [("I", "A"), ("R", "ohm")])
+
+
+@pytest.fixture
+def sweep(tmp_path):
+    rng = np.random.default_rng(0)
+    data = np.stack([np.arange(1001.), rng.normal(size=1001), rng.uniform(size=1001)], axis=1)
+    path = tmp_path/"sweep.txt"
+    np.savetxt(path, data)
+    return str(path), data
+
+
+def chunks(path):
+    # Small blocks split lines across reads, chunks do not divide the rows
+    return readfile_chunks(path, *NAMES, chunk_rows=97, blocksize=4096)
+
+
+def test_chunks_concatenate_to_readfile(sweep):
+    path, data = sweep
+    parts = list(chunks(path))
+    assert [len(part.parameters[0].data) for part in parts] == [97]*10+[31]
+    whole = readfile(path, *NAMES)
+    for i, meas in enumerate(whole.measurements):
+        assert np.array_equal(np.concatenate([part.measurements[i].data for part in parts]), meas.data)
+
+
+def test_reductions_match_numpy(sweep):
+    path, data = sweep
+    y = data[:, 1]
+    assert stream_min(chunks(path)) == y.min()
+    assert stream_argmin(chunks(path)) == y.argmin()
+    assert stream_max(chunks(path), 1) == data[:, 2].max()
+    assert stream_argmax(chunks(path)) == y.argmax()
+    assert stream_min(chunks(path), None) == 0
+    assert np.isclose(stream_mean(chunks(path)), y.mean())
+    hist, edges = stream_histogram(chunks(path), 0, 20, (-3, 3))
+    ref, ref_edges = np.histogram(y, 20, (-3, 3))
+    assert np.array_equal(hist, ref) and np.allclose(edges, ref_edges)
@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+from Analysis.Experiment import Measurement, propagate, derivative
+from Analysis.Experiment.uncertainty import DERIVATIVES
+
+X = np.linspace(0.1, 0.9, 50)
+
+
+@pytest.mark.parametrize("function", list(DERIVATIVES))
+def test_registered_derivatives_match_finite_differences(function):
+    h = 1e-6
+    ref = (function(X+h)-function(X-h))/(2*h)
+    assert np.allclose(derivative(function, X), ref, rtol=1e-5, atol=1e-8)
+
+
+def test_linear_and_montecarlo_propagation():
+    err = np.full(X.shape, 1e-3)
+    linear = propagate(np.log, X, err)
+    assert np.allclose(linear, err/X)
+    # Unregistered functions use central differences
+    assert np.allclose(propagate(lambda x, a: a*x**3, X, err, 2.), 6*X**2*err)
+    montecarlo = propagate(np.log, X, err, method="montecarlo", samples=4000, seed=0)
+    assert np.allclose(montecarlo, linear, rtol=0.1)
+    assert propagate(np.log, X, None) is None
+
+
+def test_arithmetic_and_rescale():
+    a = Measurement(X, "a", "V", err=0.01)
+    b = Measurement(2*X+1, "b", "A", err=0.02*X)
+    ea, eb = a.err, b.err
+    product = a*b
+    assert np.allclose(product.data, X*(2*X+1)) and product.unit == "V*A"
+    assert np.allclose(product.err, np.hypot((2*X+1)*ea, X*eb))
+    assert np.allclose((a/b).err, np.hypot(ea/(2*X+1), X*eb/(2*X+1)**2))
+    assert np.allclose((a+2).err, ea) and np.allclose((3*a).err, 3*ea)
+    # An operation of a Variable with itself is fully correlated
+    assert np.allclose((a*a).err, 2*X*ea)
+    assert np.allclose((a-a).err, 0)
+    rescaled = a.rescale(np.sqrt, new_name="root")
+    assert rescaled.name == "root" and np.allclose(rescaled.err, 0.5*ea/np.sqrt(X))
@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+from Analysis.Experiment import Parameter, Measurement, DataSet
+
+
+@pytest.fixture
+def dataset():
+    rng = np.random.default_rng(0)
+    x = Parameter(rng.permutation(40).astype(np.float64), "V", "V")
+    y = Measurement(rng.normal(size=40), "I", "A", err=rng.uniform(0.1, 0.2, 40))
+    return DataSet([x], [y])
+
+
+def columns(ds):
+    return [(column.data, column.err) for column in ds.parameters+ds.measurements]
+
+
+def test_chained_views_match_eager(dataset):
+    eager = dataset.subset(3, 35, 2).sort().subset(np.array([0, 4, 2, 9]), None, 1)
+    lazy = dataset.subset(3, 35, 2, view=True).sort(view=True).subset(np.array([0, 4, 2, 9]), None, 1, view=True)
+    for (data, err), (ref, ref_err) in zip(columns(lazy), columns(eager)):
+        assert np.array_equal(data, ref)
+        assert (err is None and ref_err is None) or np.array_equal(err, ref_err)
+    # Every column still reads from the buffer of the original
+    for column, source in zip(lazy.parameters+lazy.measurements, dataset.parameters+dataset.measurements):
+        assert column.is_view() and column._data is source._data
+
+
+def test_materialize_owns_its_data(dataset):
+    view = dataset.measurements[0].subset(np.array([5, 1, 7]), view=True)
+    assert not view.data.flags.writeable
+    ref = dataset.measurements[0].data[[5, 1, 7]]
+    view.materialize()
+    assert not view.is_view()
+    assert view.data.flags.writeable and view.data.flags.owndata
+    assert view.err.flags.owndata
+    view.data[0] = 100
+    assert np.array_equal(dataset.measurements[0].data[[5, 1, 7]], ref)
+
+
+def test_gathered_view_is_stale_until_invalidated(dataset):
+    parent = dataset.measurements[0]
+    sliced = parent.subset(2, 10, 1, view=True)
+    gathered = parent.subset(np.array([2, 3]), view=True)
+    before = gathered.data.copy()
+    parent.data[2] = 42.
+    # Slices read through the buffer, index arrays keep their gather
+    assert sliced.data[0] == 42.
+    assert np.array_equal(gathered.data, before)
+    gathered.invalidate_index()
+    assert gathered.data[0] == 42.
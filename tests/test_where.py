@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+from Analysis.Experiment import Parameter
+
+
+def reference_where(data, value, closest=True):
+    # The former linear scan of Variable.where
+    index = np.where(data == value)[0]
+    if index.shape[0] != 0:
+        return index
+    if closest is not True:
+        return None
+    index = np.where(data >= value)[0]
+    return index[0] if index.shape[0] != 0 else None
+
+
+def same(res, ref):
+    if ref is None or res is None:
+        return res is None and ref is None
+    return np.array_equal(np.sort(np.atleast_1d(res)), np.atleast_1d(ref))
+
+
+@pytest.mark.parametrize("data", [
+    np.arange(20.)/2,
+    np.repeat(np.arange(10.), 3),
+    np.array([5., 1., 3., 3., 8., np.nan, 0., 3., 7., 2.]),
+    np.random.default_rng(0).integers(0, 15, 200).astype(np.float64),
+])
+def test_where_matches_linear_scan(data):
+    param = Parameter(data, "V", "V")
+    for value in [-1., 0., 1., 2.5, 3., 7., 8., 9.5, 14., 100.]:
+        for closest in (True, False):
+            assert same(param.where(value, closest), reference_where(data, value, closest))
+    values = np.array([-1., 0., 2.5, 3., 100.])
+    first = [reference_where(data, value) for value in values]
+    first = [-1 if ref is None else np.min(ref) for ref in first]
+    assert np.array_equal(param.where_array(values), first)
+
+
+def test_cached_index_follows_the_data():
+    param = Parameter(np.arange(10.), "V", "V")
+    assert param.is_monotonic() and param.where(4.)[0] == 4
+    param.data = np.arange(10.)[::-1].copy()
+    assert not param.is_monotonic() and param.where(4.)[0] == 5
+    param.data[:] = np.arange(10.)
+    param.invalidate_index()
+    assert param.is_monotonic() and param.where(4.)[0] == 4